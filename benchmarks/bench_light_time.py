@@ -0,0 +1,67 @@
+# Times the light-time correction of the objects seen in one pointing, for a chunk of
+# objects integrated together in one simulation, as PixelDict does for each pointing.
+# A plain two-body REBOUND simulation stands in for ASSIST, so this runs without the
+# ASSIST data files; with ASSIST the integrations themselves cost more.
+
+import argparse
+import time
+
+import numpy as np
+import rebound
+
+from sorcha.ephemeris.simulation_geometry import integrate_light_time_particles
+
+
+class TwoBodyExtras:
+    # Stands in for the ASSIST extras: moves the simulation to the requested time.
+    def __init__(self, sim):
+        self.sim = sim
+
+    def integrate_or_interpolate(self, t):
+        self.sim.integrate(t, exact_finish_time=1)
+
+
+def make_simulation(n_objects, rng):
+    sim = rebound.Simulation()
+    sim.G = 0.01720209895**2
+    sim.add(m=1.0)
+    sim.N_active = 1
+    sim.ri_ias15.adaptive_mode = 1
+    for a, e, inc, omega, Omega, M in zip(
+        rng.uniform(2.0, 3.5, n_objects),
+        rng.uniform(0.0, 0.2, n_objects),
+        rng.uniform(0.0, 0.3, n_objects),
+        rng.uniform(0.0, 2 * np.pi, n_objects),
+        rng.uniform(0.0, 2 * np.pi, n_objects),
+        rng.uniform(0.0, 2 * np.pi, n_objects),
+    ):
+        sim.add(primary=sim.particles[0], a=a, e=e, inc=inc, omega=omega, Omega=Omega, M=M)
+    return sim, TwoBodyExtras(sim)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Objects per chunk (size_serial_chunk).")
+    parser.add_argument("--in-field", type=int, default=20, help="Objects in the field of each pointing.")
+    parser.add_argument("--pointings", type=int, default=500, help="Number of pointings.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(2024)
+    sim, ex = make_simulation(args.chunk_size, rng)
+    r_obs = np.array([1.0, 0.0, 0.0])
+
+    # pointings 40 s apart, as during a night of observations
+    times = 100.0 + np.arange(args.pointings) * 40.0 / 86400.0
+    indices = [
+        np.sort(rng.choice(np.arange(1, args.chunk_size + 1), args.in_field, replace=False)) for _ in times
+    ]
+
+    start = time.perf_counter()
+    for t, in_field in zip(times, indices):
+        integrate_light_time_particles(sim, ex, t, r_obs, in_field, lt0=0.01)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{args.chunk_size} objects per chunk, {args.in_field} in the field: "
+        f"{1e3 * elapsed / args.pointings:.3f} ms per pointing"
+    )
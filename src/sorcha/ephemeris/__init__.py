@@ -10,22 +10,31 @@ from .simulation_data_files import (
     make_retriever,
 )
 from .simulation_geometry import (
+    ObservatoryEphemeris,
     barycentricObservatoryRates,
     ecliptic_to_equatorial,
     integrate_light_time,
+    integrate_light_time_batch,
+    integrate_light_time_particles,
     ra_dec2vec,
 )
 from .simulation_parsing import (
     mjd_tai_to_epoch,
+    mjd_tai_to_jd_tdb,
     Observatory,
     parse_orbit_row,
 )
 from .simulation_setup import (
     create_assist_ephemeris,
+    create_pointing_arrays,
     furnish_spiceypy,
     precompute_pointing_information,
+    prepare_pointings,
 )
 
+from .chebyshev_ephemeris import ChebyshevEphemeris
+from .chebyshev_store import ChebyshevEphemerisStore, build_chebyshev_store, write_chebyshev_store
+
 from .simulation_driver import create_ephemeris
 
 from .orbit_conversion_utilities import (
@@ -0,0 +1,366 @@
+import numpy as np
+
+from sorcha.ephemeris.simulation_constants import SPEED_OF_LIGHT
+from sorcha.ephemeris.simulation_geometry import get_particle_states_at
+
+# Default position tolerance (au) of the fitted polynomials, about 150 m
+DEFAULT_TOLERANCE = 1e-9
+
+# The segments can be lengthened by up to this factor when the tolerance allows it
+MAX_SEGMENT_FACTOR = 8
+
+
+def chebyshev_nodes(degree):
+    """
+    Chebyshev points of the first kind, where the orbits are sampled to fit each segment
+
+    Parameters
+    ----------
+    degree: int
+        Degree of the Chebyshev polynomials
+    Returns
+    -------
+    x: array (degree + 1 entries)
+        The nodes in [-1, 1], in increasing order
+    """
+    return -np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))
+
+
+def chebyshev_basis(x, degree):
+    """
+    Evaluates the Chebyshev polynomials T_0..T_degree and their derivatives
+
+    Parameters
+    ----------
+    x: array (N entries)
+        Abscissae in [-1, 1]
+    degree: int
+        Degree of the Chebyshev polynomials
+    Returns
+    -------
+    t: array (N, degree + 1)
+        The polynomials at x
+    dt: array (N, degree + 1)
+        The derivatives of the polynomials at x
+    """
+    x = np.asarray(x, dtype=float)
+    t = np.empty(x.shape + (degree + 1,))
+    dt = np.empty(x.shape + (degree + 1,))
+    t[..., 0], dt[..., 0] = 1.0, 0.0
+    if degree > 0:
+        t[..., 1], dt[..., 1] = x, 1.0
+    for j in range(2, degree + 1):
+        t[..., j] = 2 * x * t[..., j - 1] - t[..., j - 2]
+        dt[..., j] = 2 * t[..., j - 1] + 2 * x * dt[..., j - 1] - dt[..., j - 2]
+    return t, dt
+
+
+class ChebyshevEphemeris:
+    """
+    Barycentric positions of a set of objects, stored as piecewise Chebyshev polynomials.
+
+    The survey window is cut into segments of equal length, and the position of each object
+    over each segment is the Chebyshev interpolant of its positions at the Chebyshev nodes of
+    the segment. Velocities are the derivatives of the interpolants. The objects are referred
+    to by their index in `designations`, and the times are in the time frame of the
+    simulations (days from the reference time of the ASSIST ephemeris).
+    """
+
+    def __init__(self, designations, t_start, segment_length, coeffs):
+        """
+        Parameters
+        ----------
+        designations: array of str
+            Designations of the objects
+        t_start: float
+            Start of the first segment
+        segment_length: float
+            Length of the segments (days)
+        coeffs: array (N, n_segments, degree + 1, 3)
+            Chebyshev coefficients of the positions (au) of each object over each segment
+        """
+        self.designations = np.asarray(designations, dtype=object)
+        self.t_start = float(t_start)
+        self.segment_length = float(segment_length)
+        self.coeffs = coeffs
+
+    @property
+    def degree(self):
+        """Degree of the Chebyshev polynomials"""
+        return self.coeffs.shape[2] - 1
+
+    @property
+    def t_end(self):
+        """End of the last segment"""
+        return self.t_start + self.segment_length * self.coeffs.shape[1]
+
+    @property
+    def nbytes(self):
+        """Memory taken by the coefficients (bytes)"""
+        return self.coeffs.nbytes
+
+    @classmethod
+    def from_simulations(
+        cls, sim_dict, t_start, t_end, segment_length=8.0, degree=14, tolerance=DEFAULT_TOLERANCE
+    ):
+        """
+        Integrates the orbits of all the objects of a set of ASSIST simulations once across a
+        time window, and fits their positions with Chebyshev polynomials
+
+        The orbits are first sampled on segments of segment_length days at degree `degree`,
+        which takes 24 * (degree + 1) bytes per object and segment: with the defaults, about
+        165 kB per object for a 10-year window, or 820 MB for a chunk of 5000 objects. Given
+        a tolerance, the segments are then lengthened (up to MAX_SEGMENT_FACTOR times) and the
+        degree lowered as far as the tolerance allows for all the objects, which for main-belt
+        and more distant objects shrinks the polynomials several times.
+
+        Parameters
+        ----------
+        sim_dict: dictionary
+            Dictionary of ASSIST simulation objects, as built by generate_simulations
+        t_start: float
+            Start of the window, in the time frame of the simulations
+        t_end: float
+            End of the window, in the time frame of the simulations
+        segment_length: float
+            Length of the segments (days) the orbits are sampled on (default: 8)
+        degree: int
+            Degree of the Chebyshev polynomials the orbits are sampled with (default: 14)
+        tolerance: float
+            Position tolerance (au) of the polynomials, or None to keep the sampled segments
+            and degree (default: DEFAULT_TOLERANCE)
+        Returns
+        -------
+        : ChebyshevEphemeris
+            The fitted ephemeris, with the objects in the order of sim_dict
+        """
+        designations = list(sim_dict.keys())
+        n_segments = max(int(np.ceil((t_end - t_start) / segment_length)), 1)
+        if tolerance is not None:
+            # so that the segments can be merged
+            n_segments = -(-n_segments // MAX_SEGMENT_FACTOR) * MAX_SEGMENT_FACTOR
+
+        # the sampling times, in increasing order so each simulation is integrated once
+        x = chebyshev_nodes(degree)
+        times = t_start + segment_length * (np.arange(n_segments)[:, np.newaxis] + (x + 1) / 2)
+
+        # the objects sharing a simulation are sampled together
+        groups = {}
+        for i, v in enumerate(sim_dict.values()):
+            groups.setdefault(id(v["sim"]), (v["sim"], v["ex"], [], []))
+            groups[id(v["sim"])][2].append(i)
+            groups[id(v["sim"])][3].append(v["index"])
+
+        positions = np.empty((len(designations), n_segments, degree + 1, 3))
+        for sim, ex, objects, indices in groups.values():
+            for k, t in enumerate(times.ravel()):
+                r, _ = get_particle_states_at(sim, ex, t, indices)
+                positions[objects, k // (degree + 1), k % (degree + 1)] = r
+
+        # interpolate at the nodes: positions = T @ coeffs. The coefficients replace the
+        # positions one segment at a time, so the samples are never held twice.
+        t_nodes, _ = chebyshev_basis(x, degree)
+        fit = np.linalg.inv(t_nodes)
+        for segment in range(n_segments):
+            positions[:, segment] = np.einsum("jk,nkd->njd", fit, positions[:, segment])
+
+        orbit_ephemeris = cls(designations, t_start, segment_length, positions)
+        if tolerance is not None:
+            orbit_ephemeris = orbit_ephemeris.compressed(tolerance)
+        return orbit_ephemeris
+
+    def resampled(self, t_start, segment_length, n_segments, degree):
+        """
+        Refits the polynomials onto other segments, which must lie within the window
+        covered by this ephemeris
+
+        Parameters
+        ----------
+        t_start: float
+            Start of the first new segment
+        segment_length: float
+            Length of the new segments (days)
+        n_segments: int
+            Number of new segments
+        degree: int
+            Degree of the new polynomials
+        Returns
+        -------
+        : ChebyshevEphemeris
+            The refitted ephemeris
+        """
+        eps = 1e-9 * self.segment_length
+        if t_start < self.t_start - eps or t_start + segment_length * n_segments > self.t_end + eps:
+            raise ValueError(
+                f"Segments from {t_start} to {t_start + segment_length * n_segments} are outside of the "
+                f"Chebyshev ephemeris, which covers {self.t_start} to {self.t_end}."
+            )
+
+        # the new nodes, and where they fall in the current segments
+        x = chebyshev_nodes(degree)
+        times = t_start + segment_length * (np.arange(n_segments)[:, np.newaxis] + (x + 1) / 2)
+        segment = np.clip(
+            ((times - self.t_start) // self.segment_length).astype(np.int64), 0, self.coeffs.shape[1] - 1
+        )
+        basis, _ = chebyshev_basis(
+            2 * (times - self.t_start - segment * self.segment_length) / self.segment_length - 1, self.degree
+        )
+        fit = np.linalg.inv(chebyshev_basis(x, degree)[0])
+
+        # the objects are refitted in blocks, to bound the memory taken by the gathered coefficients
+        n_objects = len(self.designations)
+        coeffs = np.empty((n_objects, n_segments, degree + 1, 3))
+        block = max(1, 2**22 // (n_segments * (degree + 1) * (self.degree + 1)))
+        for first in range(0, n_objects, block):
+            positions = np.einsum("skj,nskjd->nskd", basis, self.coeffs[first : first + block][:, segment])
+            coeffs[first : first + block] = np.einsum("jk,nskd->nsjd", fit, positions)
+
+        return ChebyshevEphemeris(self.designations, t_start, segment_length, coeffs)
+
+    def truncated(self, tolerance, min_degree=2):
+        """
+        Drops the highest-order coefficients whose summed size is below a tolerance for all
+        the objects and segments
+
+        Parameters
+        ----------
+        tolerance: float
+            Largest position error (au) added by dropping coefficients
+        min_degree: int
+            Lowest degree kept, so that the velocities stay smooth (default: 2)
+        Returns
+        -------
+        : ChebyshevEphemeris
+            The truncated ephemeris, or this one if no coefficient can be dropped
+        """
+        sizes = np.linalg.norm(self.coeffs, axis=-1).max(axis=(0, 1), initial=0)
+        # tail[j] bounds the error of keeping the coefficients below j
+        tail = np.append(np.cumsum(sizes[::-1])[::-1], 0.0)
+        degree = max(int(np.argmax(tail[1:] <= tolerance)), min(min_degree, self.degree))
+        if degree == self.degree:
+            return self
+        return ChebyshevEphemeris(
+            self.designations,
+            self.t_start,
+            self.segment_length,
+            np.ascontiguousarray(self.coeffs[:, :, : degree + 1]),
+        )
+
+    def compressed(self, tolerance, max_factor=MAX_SEGMENT_FACTOR):
+        """
+        Lengthens the segments and lowers the degree of the polynomials as far as a tolerance
+        allows for all the objects. Half of the tolerance goes to each step.
+
+        Parameters
+        ----------
+        tolerance: float
+            Position tolerance (au)
+        max_factor: int
+            Largest factor by which the segments are lengthened (default: MAX_SEGMENT_FACTOR)
+        Returns
+        -------
+        : ChebyshevEphemeris
+            The compressed ephemeris
+        """
+        n_segments = self.coeffs.shape[1]
+        orbit_ephemeris = self
+        factor = 2
+        while factor <= max_factor and n_segments % factor == 0:
+            candidate = self.resampled(
+                self.t_start, factor * self.segment_length, n_segments // factor, self.degree
+            )
+            if candidate.truncation_error().max(initial=0) > tolerance / 2:
+                break
+            orbit_ephemeris = candidate
+            factor *= 2
+
+        return orbit_ephemeris.truncated(tolerance / 2)
+
+    def truncation_error(self):
+        """
+        Estimates the error of the Chebyshev interpolants of each object, from the size of
+        their two highest-order coefficients
+
+        Returns
+        -------
+        error: array (N entries)
+            Largest estimated position error (au) of each object over all the segments
+        """
+        return np.linalg.norm(self.coeffs[:, :, -2:, :], axis=-1).sum(axis=-1).max(axis=1)
+
+    def get_states(self, objects, t):
+        """
+        Evaluates the positions and velocities of a set of objects
+
+        Parameters
+        ----------
+        objects: array of ints (N entries)
+            Indices of the objects in self.designations
+        t: float or array (N entries)
+            Times, in the time frame of the simulations
+        Returns
+        -------
+        r: array (N,3)
+            Positions (au)
+        v: array (N,3)
+            Velocities (au/day)
+        """
+        objects = np.asarray(objects, dtype=np.int64)
+        t = np.broadcast_to(np.asarray(t, dtype=float), objects.shape)
+        if len(t) and (t.min() < self.t_start or t.max() > self.t_end):
+            raise ValueError(
+                f"Times from {t.min()} to {t.max()} are outside of the Chebyshev ephemeris, "
+                f"which covers {self.t_start} to {self.t_end}."
+            )
+
+        segment = np.clip(
+            ((t - self.t_start) // self.segment_length).astype(np.int64), 0, self.coeffs.shape[1] - 1
+        )
+        x = 2 * (t - self.t_start - segment * self.segment_length) / self.segment_length - 1
+
+        basis, dbasis = chebyshev_basis(x, self.degree)
+        coeffs = self.coeffs[objects, segment]
+        r = np.einsum("nj,njd->nd", basis, coeffs)
+        v = np.einsum("nj,njd->nd", dbasis, coeffs) * (2 / self.segment_length)
+        return r, v
+
+    def integrate_light_time(self, objects, t, r_obs, lt0=0, iter=3, speed_of_light=SPEED_OF_LIGHT):
+        """
+        Performs the light travel time correction between a set of objects and the observatory
+        iteratively at a given reference time
+
+        Parameters
+        ----------
+        objects: array of ints (N entries)
+            Indices of the objects in self.designations
+        t: float
+            Target time, in the time frame of the simulations
+        r_obs: array (3 entries)
+            Observatory position at time t
+        lt0: float
+            First guess for light travel time
+        iter: int
+            Number of iterations
+        speed_of_light: float
+            Speed of light for the calculation (default is SPEED_OF_LIGHT constant)
+        Returns
+        -------
+        rho: array (N,3)
+            Object-observatory vectors
+        rho_mag: array (N entries)
+            Magnitudes of the rho vectors
+        lt: array (N entries)
+            Light travel times
+        target: array (N,3)
+            Object position vectors at t-lt
+        vtarget: array (N,3)
+            Object velocities at t-lt
+        """
+        lt = np.full(len(objects), float(lt0))
+        for i in range(iter):
+            target, vtarget = self.get_states(objects, t - lt)
+            rho = target - r_obs
+            rho_mag = np.linalg.norm(rho, axis=1)
+            lt = rho_mag / speed_of_light
+
+        return rho, rho_mag, lt, target, vtarget
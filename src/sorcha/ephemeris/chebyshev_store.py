@@ -0,0 +1,356 @@
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from sorcha.ephemeris.chebyshev_ephemeris import DEFAULT_TOLERANCE, ChebyshevEphemeris
+from sorcha.ephemeris.simulation_setup import create_assist_ephemeris, generate_simulations
+
+# Version of the layout of the Chebyshev ephemeris stores. Stores written with another
+# version are refused.
+CHEBYSHEV_STORE_VERSION = 2
+
+
+class ChebyshevEphemerisStore:
+    """
+    Reads the Chebyshev ephemerides of a population of objects written by build_chebyshev_store.
+
+    A store is a directory holding the Chebyshev coefficients of the objects as .npy files,
+    one per chunk of objects, which are memory-mapped so that only the objects and segments
+    that are read are loaded. The designations of the objects are indexed in a sorted array,
+    and the times are Julian dates (TDB), so a store does not depend on the pointing database
+    or on the ASSIST ephemeris used when reading it.
+
+    All the chunks cover the same time window, but each has its own segment length and degree,
+    sized from the fit tolerance of its objects. The segment lengths of the chunks are all
+    multiples of the shortest one.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path: str
+            Directory of the store
+        """
+        self.path = path
+
+        with open(os.path.join(path, "metadata.json")) as f:
+            self.metadata = json.load(f)
+        if self.metadata.get("version") != CHEBYSHEV_STORE_VERSION:
+            raise ValueError(
+                f"The Chebyshev ephemeris store in {path} has version {self.metadata.get('version')}, "
+                f"but this version of Sorcha reads version {CHEBYSHEV_STORE_VERSION}."
+            )
+
+        self.jd_start = self.metadata["jd_start"]
+        self.jd_end = self.metadata["jd_end"]
+        # the segment length, number of segments and degree of each chunk
+        self.chunks = self.metadata["chunks"]
+
+        self.index_designations = np.load(os.path.join(path, "index_designations.npy"), mmap_mode="r")
+        self.index_chunk = np.load(os.path.join(path, "index_chunk.npy"), mmap_mode="r")
+        self.index_row = np.load(os.path.join(path, "index_row.npy"), mmap_mode="r")
+        self._coeffs = {}
+
+    def __len__(self):
+        return len(self.index_designations)
+
+    def chunk_coeffs(self, chunk):
+        """
+        Memory-maps the coefficients of a chunk of objects
+
+        Parameters
+        ----------
+        chunk: int
+            Number of the chunk
+        Returns
+        -------
+        coeffs: array (N, n_segments, degree + 1, 3)
+            Chebyshev coefficients of the objects of the chunk
+        """
+        if chunk not in self._coeffs:
+            self._coeffs[chunk] = np.load(os.path.join(self.path, f"coeffs_{chunk:05d}.npy"), mmap_mode="r")
+        return self._coeffs[chunk]
+
+    def read(self, designations, jd_ref, jd_start=None, jd_end=None):
+        """
+        Reads the Chebyshev ephemeris of a set of objects
+
+        Parameters
+        ----------
+        designations: array of str
+            Designations of the objects
+        jd_ref: float
+            Reference time (JD TDB) of the time frame of the returned ephemeris, i.e.
+            the reference time of the ASSIST ephemeris
+        jd_start: float, optional
+            Start (JD TDB) of the time window to read. Default = None (start of the store)
+        jd_end: float, optional
+            End (JD TDB) of the time window to read. Default = None (end of the store)
+        Returns
+        -------
+        : ChebyshevEphemeris
+            The ephemeris of the objects, in the order of designations, covering the
+            segments that overlap the time window
+        """
+        jd_start = self.jd_start if jd_start is None else jd_start
+        jd_end = self.jd_end if jd_end is None else jd_end
+        if jd_start < self.jd_start or jd_end > self.jd_end:
+            raise ValueError(
+                f"The window from JD {jd_start} to {jd_end} is not covered by the Chebyshev ephemeris store "
+                f"in {self.path}, which covers JD {self.jd_start} to {self.jd_end}."
+            )
+
+        designations = np.asarray(designations).astype(str)
+        position = np.searchsorted(self.index_designations, designations)
+        position = np.minimum(position, len(self.index_designations) - 1)
+        missing = self.index_designations[position] != designations
+        if missing.any():
+            raise ValueError(
+                f"{missing.sum()} objects are missing from the Chebyshev ephemeris store in {self.path}, "
+                f"for example {designations[missing][0]}."
+            )
+
+        chunks = self.index_chunk[position]
+        rows = self.index_row[position]
+
+        # the objects of chunks with other layouts are refitted to the shortest segments
+        # and highest degree of the chunks read
+        read_chunks = [int(chunk) for chunk in np.unique(chunks)]
+        segment_length = min(self.chunks[chunk]["segment_length"] for chunk in read_chunks)
+        degree = max(self.chunks[chunk]["degree"] for chunk in read_chunks)
+        n_segments = int(round((self.jd_end - self.jd_start) / segment_length))
+
+        first = int((jd_start - self.jd_start) // segment_length)
+        last = max(int(np.ceil((jd_end - self.jd_start) / segment_length)), first + 1)
+        last = min(last, n_segments)
+        t_start = self.jd_start + first * segment_length - jd_ref
+
+        coeffs = np.empty((len(designations), last - first, degree + 1, 3))
+        for chunk in read_chunks:
+            in_chunk = chunks == chunk
+            layout = self.chunks[chunk]
+            factor = int(round(layout["segment_length"] / segment_length))
+            chunk_first, chunk_last = first // factor, -(-last // factor)
+            chunk_ephemeris = ChebyshevEphemeris(
+                designations[in_chunk],
+                self.jd_start + chunk_first * layout["segment_length"] - jd_ref,
+                layout["segment_length"],
+                self.chunk_coeffs(chunk)[rows[in_chunk], chunk_first:chunk_last],
+            )
+            if factor != 1 or layout["degree"] != degree:
+                chunk_ephemeris = chunk_ephemeris.resampled(t_start, segment_length, last - first, degree)
+            coeffs[in_chunk] = chunk_ephemeris.coeffs
+
+        return ChebyshevEphemeris(designations, t_start, segment_length, coeffs)
+
+
+def write_chebyshev_store(store_path, orbit_ephemerides, jd_ref, metadata=None, overwrite=False):
+    """
+    Writes the Chebyshev ephemerides of a population of objects to a store that can be read
+    by ChebyshevEphemerisStore. The store is written to a temporary directory which is then
+    renamed, so that runs never read a partial store. An existing store is only replaced
+    once the new one is complete.
+
+    Parameters
+    ----------
+    store_path : str
+        Directory of the store. It must not exist yet, unless overwrite is True.
+    orbit_ephemerides : iterable of ChebyshevEphemeris
+        The ephemerides of the chunks of objects, which must all cover the same window,
+        with segment lengths that are multiples of the shortest one
+    jd_ref : float
+        Reference time (JD TDB) of the time frame of the ephemerides
+    metadata : dictionary, optional
+        Additional information recorded in the metadata of the store. Default = None
+    overwrite : boolean, optional
+        Whether to replace an existing store at store_path. Default = False
+
+    Returns
+    -------
+    None.
+    """
+    pplogger = logging.getLogger(__name__)
+
+    if os.path.exists(store_path) and not os.path.isdir(store_path):
+        raise ValueError(f"{store_path} exists and is not a Chebyshev ephemeris store directory.")
+    if os.path.exists(store_path) and not overwrite:
+        raise ValueError(f"A Chebyshev ephemeris store already exists at {store_path}.")
+
+    parent = os.path.dirname(os.path.abspath(store_path))
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix=".tmp_chebyshev_")
+
+    # the temporary directory is removed however the writing stops, even when interrupted
+    try:
+        designations = []
+        layouts = []
+        for chunk, orbit_ephemeris in enumerate(orbit_ephemerides):
+            layouts.append(
+                {
+                    "t_start": orbit_ephemeris.t_start,
+                    "t_end": orbit_ephemeris.t_end,
+                    "segment_length": orbit_ephemeris.segment_length,
+                    "n_segments": orbit_ephemeris.coeffs.shape[1],
+                    "degree": orbit_ephemeris.degree,
+                }
+            )
+            np.save(os.path.join(tmp_path, f"coeffs_{chunk:05d}.npy"), orbit_ephemeris.coeffs)
+            designations.append(orbit_ephemeris.designations.astype(str))
+
+        if not layouts:
+            raise ValueError("No Chebyshev ephemerides to write.")
+
+        # the chunks can be read together if they cover the same window, with segments
+        # that are all multiples of the shortest ones
+        shortest = min(layout["segment_length"] for layout in layouts)
+        for layout in layouts:
+            factor = layout["segment_length"] / shortest
+            if (
+                not np.isclose(layout["t_start"], layouts[0]["t_start"], rtol=0, atol=1e-9 * shortest)
+                or not np.isclose(layout["t_end"], layouts[0]["t_end"], rtol=0, atol=1e-9 * shortest)
+                or not np.isclose(factor, round(factor))
+            ):
+                raise ValueError(
+                    "The Chebyshev ephemerides of the chunks of a store must cover the same window, "
+                    "with segments that are multiples of the shortest ones."
+                )
+
+        # index the designations of all the chunks, which are in the order of the simulations
+        lengths = [len(d) for d in designations]
+        index_chunk = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+        index_row = np.arange(sum(lengths), dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        designations = np.concatenate(designations)
+        order = np.argsort(designations, kind="stable")
+        if np.any(designations[order][1:] == designations[order][:-1]):
+            raise ValueError("The designations of the objects of a Chebyshev ephemeris store must be unique.")
+
+        np.save(os.path.join(tmp_path, "index_designations.npy"), designations[order])
+        np.save(os.path.join(tmp_path, "index_chunk.npy"), index_chunk[order])
+        np.save(os.path.join(tmp_path, "index_row.npy"), index_row[order])
+
+        store_metadata = {
+            "version": CHEBYSHEV_STORE_VERSION,
+            "jd_start": layouts[0]["t_start"] + jd_ref,
+            "jd_end": layouts[0]["t_end"] + jd_ref,
+            "n_objects": len(designations),
+            "chunks": [
+                {key: layout[key] for key in ("segment_length", "n_segments", "degree")} for layout in layouts
+            ],
+        }
+        store_metadata.update(metadata or {})
+        with open(os.path.join(tmp_path, "metadata.json"), "w") as f:
+            json.dump(store_metadata, f, indent=2)
+
+        # the old store is moved aside, and only deleted once the new one is in its place
+        old_path = None
+        if os.path.isdir(store_path):
+            old_path = tmp_path + "_old"
+            os.rename(store_path, old_path)
+        try:
+            os.rename(tmp_path, store_path)
+        except BaseException:
+            if old_path is not None:
+                os.rename(old_path, store_path)
+            raise
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    if old_path is not None:
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    pplogger.info(f"Wrote the Chebyshev ephemerides of {len(designations)} objects to {store_path}")
+
+
+def build_chebyshev_store(
+    orbits_reader,
+    args,
+    sconfigs,
+    mjd_start,
+    mjd_end,
+    store_path,
+    segment_length=8.0,
+    degree=14,
+    tolerance=DEFAULT_TOLERANCE,
+    overwrite=False,
+):
+    """
+    Integrates the orbits of a population of objects with ASSIST across a time window, and
+    writes their Chebyshev ephemerides to a store that can be read by ChebyshevEphemerisStore.
+    The orbits are integrated in chunks of sconfigs.input.size_serial_chunk objects, and the
+    segments and degree of each chunk are sized from the tolerance, as in
+    ChebyshevEphemeris.from_simulations.
+
+    Parameters
+    ----------
+    orbits_reader : OrbitAuxReader
+        Reader of the orbits of the objects
+    args : sorchaArguments object or similar
+        Command-line arguments from Sorcha.
+    sconfigs : dataclass
+        Dataclass of configuration file arguments.
+    mjd_start : float
+        Start (MJD TDB) of the time window
+    mjd_end : float
+        End (MJD TDB) of the time window
+    store_path : str
+        Directory of the store. It must not exist yet, unless overwrite is True.
+    segment_length : float
+        Length of the segments the orbits are sampled on (days) (default: 8)
+    degree : int
+        Degree of the Chebyshev polynomials the orbits are sampled with (default: 14)
+    tolerance : float
+        Position tolerance (au) of the Chebyshev polynomials, or None to store the sampled
+        segments and degree (default: DEFAULT_TOLERANCE)
+    overwrite : boolean
+        Whether to replace an existing store at store_path once the new one is written
+        (default: False)
+
+    Returns
+    -------
+    None.
+    """
+    pplogger = logging.getLogger(__name__)
+
+    if mjd_end <= mjd_start:
+        pplogger.error("ERROR: build_chebyshev_store: the end of the time window must be after its start.")
+        sys.exit("ERROR: build_chebyshev_store: the end of the time window must be after its start.")
+
+    ephem, gm_sun, gm_total = create_assist_ephemeris(args, sconfigs.auxiliary)
+    t_start = mjd_start + 2400000.5 - ephem.jd_ref
+    t_end = mjd_end + 2400000.5 - ephem.jd_ref
+
+    orbits_reader._build_id_map()
+    n_objects = len(orbits_reader.obj_id_table)
+    block_size = sconfigs.input.size_serial_chunk
+
+    def orbit_ephemerides():
+        for block_start in range(0, n_objects, block_size):
+            pplogger.info(f"Integrating objects {block_start}-{min(block_start + block_size, n_objects)}")
+            orbits_df = orbits_reader.read_rows(block_start=block_start, block_size=block_size)
+            sim_dict = generate_simulations(ephem, gm_sun, gm_total, orbits_df, args)
+            orbit_ephemeris = ChebyshevEphemeris.from_simulations(
+                sim_dict, t_start, t_end, segment_length=segment_length, degree=degree, tolerance=tolerance
+            )
+            object_size = orbit_ephemeris.nbytes / len(orbit_ephemeris.designations)
+            pplogger.info(
+                f"Fitted the objects in {orbit_ephemeris.segment_length}-day segments of degree "
+                f"{orbit_ephemeris.degree} ({object_size / 1e3:.1f} kB per object)."
+            )
+            yield orbit_ephemeris
+
+    metadata = {
+        "orbits": os.path.abspath(args.orbinfile),
+        "jpl_planets": sconfigs.auxiliary.jpl_planets,
+        "jpl_small_bodies": sconfigs.auxiliary.jpl_small_bodies,
+    }
+    try:
+        write_chebyshev_store(store_path, orbit_ephemerides(), ephem.jd_ref, metadata, overwrite=overwrite)
+    except ValueError as err:
+        pplogger.error(err)
+        sys.exit(err)
@@ -2,8 +2,6 @@ import numpy as np
 import healpy as hp
 import numba
 
-from collections import defaultdict
-
 from sorcha.ephemeris.simulation_geometry import *
 from sorcha.ephemeris.simulation_constants import *
 
@@ -45,6 +43,32 @@ def lagrange3(t0, t1, t2, t):
     return L0, L1, L2
 
 
+def csr_gather(offsets, values, rows):
+    """Gathers the values stored in a set of rows of a CSR-style (compressed sparse row)
+    structure, in which the values of row i are values[offsets[i]:offsets[i + 1]].
+
+    Parameters
+    ----------
+    offsets : 1D array of ints
+        Start of each row in values, followed by the total number of values
+    values : 1D array
+        The values of all the rows, concatenated
+    rows : 1D array of ints
+        The rows to gather
+
+    Returns
+    -------
+    : 1D array
+        The values of the requested rows, concatenated
+    """
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    # position in `values` of every gathered entry
+    row_start_in_output = np.cumsum(lengths) - lengths
+    positions = np.repeat(starts - row_start_in_output, lengths) + np.arange(lengths.sum())
+    return values[positions]
+
+
 class PixelDict:
     """
     Class with methods needed during the ephemerides generation
@@ -62,6 +86,7 @@ class PixelDict:
         nside=128,
         nested=True,
         n_sub_intervals=101,
+        orbit_ephemeris=None,
     ):
         """
         Initialization function for the class. Computes the initial positions required for the ephemerides interpolation
@@ -70,13 +95,14 @@ class PixelDict:
         jd_tdb: float
             Reference time for the initialization
         sim_dict: dictionary
-            dictionary of ASSIST simulation objects
+            dictionary of ASSIST simulation objects. None if the objects are only known
+            through orbit_ephemeris
         ephem: Ephem
             ASSIST Ephem object
         obsCode: str
             MPC Observatory code
-        observatories: Observatory
-            Observatory object
+        observatories: Observatory or ObservatoryEphemeris
+            Observatory object, or tabulated observatory ephemeris covering the pickets
         picket_interval : float
             The interval (days) between picket calculations.  This is 1 day
             by default
@@ -87,6 +113,9 @@ class PixelDict:
             Defines the ordering scheme for the healpix ordering. True (default) means a NESTED ordering
         n_sub_intervals: int
             Number of sub-intervals for the Lagrange interpolation (default: 101)
+        orbit_ephemeris: ChebyshevEphemeris
+            Pre-propagated orbits of the objects of sim_dict, in the same order, used instead
+            of the simulations when given. Required if sim_dict is None (default: None)
         """
         self.nside = nside
         self.picket_interval = picket_interval
@@ -96,6 +125,7 @@ class PixelDict:
         self.sim_dict = sim_dict
         self.ephem = ephem
         self.observatory = observatory
+        self.orbit_ephemeris = orbit_ephemeris
 
         # Set the three times and compute the observatory position
         # at those times
@@ -111,13 +141,35 @@ class PixelDict:
         self.tm = self.t0 - picket_interval
         self.r_obs_m = self.get_observatory_position(self.tm)
 
-        # Initialize the dictionary of positions
-
-        self.pixel_dict = defaultdict(list)
-
-        self.rho_hat_m_dict = self.get_all_object_unit_vectors(self.r_obs_m, self.tm)
-        self.rho_hat_0_dict = self.get_all_object_unit_vectors(self.r_obs_0, self.t0)
-        self.rho_hat_p_dict = self.get_all_object_unit_vectors(self.r_obs_p, self.tp)
+        # Objects are referred to by their index in this array, both in the pixel
+        # index and in the (N,3) arrays of unit vectors
+        if sim_dict is None:
+            self.designations = orbit_ephemeris.designations
+            sim_dict = {}
+        else:
+            self.designations = np.array(list(sim_dict.keys()), dtype=object)
+
+        # The simulation holding each object, and the index of its particle there
+        self.simulations = []
+        self.object_simulation = np.empty(len(self.designations), dtype=np.int64)
+        self.object_particle = np.empty(len(self.designations), dtype=np.int64)
+        simulation_numbers = {}
+        for i, v in enumerate(sim_dict.values()):
+            if id(v["sim"]) not in simulation_numbers:
+                simulation_numbers[id(v["sim"])] = len(self.simulations)
+                self.simulations.append((v["sim"], v["ex"]))
+            self.object_simulation[i] = simulation_numbers[id(v["sim"])]
+            self.object_particle[i] = v["index"]
+
+        # Initialize the pixel index: the objects near pixel self.pixels[i] are
+        # self.pixel_objects[self.pixel_offsets[i] : self.pixel_offsets[i + 1]]
+        self.pixels = np.empty(0, dtype=np.int64)
+        self.pixel_offsets = np.zeros(1, dtype=np.int64)
+        self.pixel_objects = np.empty(0, dtype=np.int64)
+
+        self.rho_hat_m = self.get_all_object_unit_vectors(self.r_obs_m, self.tm)
+        self.rho_hat_0 = self.get_all_object_unit_vectors(self.r_obs_0, self.t0)
+        self.rho_hat_p = self.get_all_object_unit_vectors(self.r_obs_p, self.tp)
 
         self.compute_pixel_traversed()
 
@@ -138,15 +190,69 @@ class PixelDict:
         r_obs = self.observatory.barycentricObservatory(et, self.obsCode) / AU_KM
         return r_obs
 
-    def get_object_unit_vectors(self, desigs, r_obs, t, lt0=0.01):
+    def integrate_light_time(self, objects, r_obs, t, lt0=0.01):
+        """
+        Performs the light travel time correction between a set of objects and the observatory
+        at a given time
+
+        Parameters
+        ----------
+        objects: array of ints
+            Indices of the objects in self.designations
+        r_obs: array (3 entries)
+            Observatory location
+        t: float
+            Time of the observation
+        lt0: float
+            Initial guess (in days) for light-time correction (default: 0.01 days)
+        Returns
+        -------
+        The outputs are given in the order of objects.
+
+        rho: array (N,3)
+            Object-observatory vectors
+        rho_mag: array (N entries)
+            Magnitudes of the rho vectors
+        lt: array (N entries)
+            Light travel times
+        target: array (N,3)
+            Object position vectors at t-lt
+        vtarget: array (N,3)
+            Object velocities at t-lt
+        """
+        objects = np.asarray(objects, dtype=np.int64)
+        if self.orbit_ephemeris is not None:
+            return self.orbit_ephemeris.integrate_light_time(objects, t - self.ephem.jd_ref, r_obs, lt0=lt0)
+
+        n = len(objects)
+        rho, target, vtarget = np.empty((n, 3)), np.empty((n, 3)), np.empty((n, 3))
+        rho_mag, lt = np.empty(n), np.empty(n)
+
+        object_simulation = self.object_simulation[objects]
+        for j in np.unique(object_simulation):
+            sim, ex = self.simulations[j]
+            in_sim = object_simulation == j
+            (
+                rho[in_sim],
+                rho_mag[in_sim],
+                lt[in_sim],
+                target[in_sim],
+                vtarget[in_sim],
+            ) = integrate_light_time_particles(
+                sim, ex, t - self.ephem.jd_ref, r_obs, self.object_particle[objects[in_sim]], lt0=lt0
+            )
+
+        return rho, rho_mag, lt, target, vtarget
+
+    def get_object_unit_vectors(self, objects, r_obs, t, lt0=0.01):
         """
         Computes the unit vector (in the equatorial sphere) that point towards the object - observatory vector
         for a list of objects, at a given time
 
         Parameters
         ----------
-        desigs: list
-            List of designations (consistent with the simulation dictionary)
+        objects: array of ints
+            Indices of the objects in self.designations
         r_obs: array (3 entries)
             Observatory location
         t: float
@@ -155,21 +261,12 @@ class PixelDict:
             Initial guess (in days) for light-time correction (default: 0.01 days)
         Returns
         -------
-        rho_hat_dict: dict
-            Dictionary of unit vectors
+        rho_hat: array (N,3)
+            Unit vectors, in the order of objects
         """
-        rho_hat_dict = {}
-        for k in desigs:
-            v = self.sim_dict[k]
-            sim, ex = v["sim"], v["ex"]
-
-            # Get the topocentric unit vectors
-            rho, rho_mag, lt, r_ast, v_ast = integrate_light_time(
-                sim, ex, t - self.ephem.jd_ref, r_obs, lt0=lt0
-            )
-            rho_hat = rho / rho_mag
-            rho_hat_dict[k] = rho_hat
-        return rho_hat_dict
+        # Get the topocentric unit vectors
+        rho, rho_mag, lt, r_ast, v_ast = self.integrate_light_time(objects, r_obs, t, lt0=lt0)
+        return rho / rho_mag[:, np.newaxis]
 
     def get_all_object_unit_vectors(self, r_obs, t, lt0=0.01):
         """
@@ -186,12 +283,11 @@ class PixelDict:
             Initial guess (in days) for light-time correction (default: 0.01 days)
         Returns
         -------
-        rho_hat_dict: dict
-            Dictionary of unit vectors
+        rho_hat: array (N,3)
+            Unit vectors, in the order of self.designations
         """
-
-        desigs = self.sim_dict.keys()
-        return self.get_object_unit_vectors(desigs, r_obs, t, lt0=lt0)
+        objects = np.arange(len(self.designations))
+        return self.get_object_unit_vectors(objects, r_obs, t, lt0=lt0)
 
     def get_interp_factors(self, tm, t0, tp, n_sub_intervals):
         """
@@ -223,20 +319,20 @@ class PixelDict:
         Lp = Lp[:, np.newaxis]
         return Lm, L0, Lp
 
-    def interpolate_unit_vectors(self, desigs, jd_tdb):
+    def interpolate_unit_vectors(self, objects, jd_tdb):
         """
-        Interpolates the unit vectors for a list of designations towards the new target time
+        Interpolates the unit vectors for a list of objects towards the new target time
 
         Parameters
         ----------
-        desigs: list
-            List of designations (consistent with the simulation dictionary)
+        objects: array of ints
+            Indices of the objects in self.designations
         jd_tdb: float
             Target time
         Returns
         -------
-        unit_vector_dict: dict
-            Dictionary of unit vectors
+        unit_vectors: array (N,3)
+            Interpolated (not normalized) unit vectors, in the order of objects
         """
         # Update the table of unit vectors if needed.
         # Should not normally need to, if this routine is being
@@ -245,47 +341,46 @@ class PixelDict:
 
         Lm, L0, Lp = lagrange3(self.tm, self.t0, self.tp, jd_tdb)
 
-        unit_vector_dict = {}
-
-        for k in desigs:
-            rho_hat_m = self.rho_hat_m_dict[k]
-            rho_hat_0 = self.rho_hat_0_dict[k]
-            rho_hat_p = self.rho_hat_p_dict[k]
-
-            # Interpolate the unit vectors over a finer sampled set of times
-            vec = rho_hat_m * Lm + rho_hat_0 * L0 + rho_hat_p * Lp
-
-            unit_vector_dict[k] = vec
-
-        return unit_vector_dict
+        objects = np.asarray(objects, dtype=np.int64)
+        return self.rho_hat_m[objects] * Lm + self.rho_hat_0[objects] * L0 + self.rho_hat_p[objects] * Lp
 
     def compute_pixel_traversed(self):
         """
-        Computes the healpix pixels traversed by all the objects during between times tm and tp
+        Computes the healpix pixels traversed by all the objects during between times tm and tp,
+        and builds the index from pixels (and their neighbours) to objects
         """
         # These don't need to be recomputed, if the interval stays the same
         Lm, L0, Lp = self.get_interp_factors(self.tm, self.t0, self.tp, self.n_sub_intervals)
 
-        self.pixel_dict = defaultdict(list)
-
-        for k, v in self.sim_dict.items():
-            rho_hat_m = self.rho_hat_m_dict[k]
-            rho_hat_0 = self.rho_hat_0_dict[k]
-            rho_hat_p = self.rho_hat_p_dict[k]
-
-            # Interpolate the unit vectors over a finer sampled set of times
-            vec = rho_hat_m * Lm + rho_hat_0 * L0 + rho_hat_p * Lp
-
-            # Find the healpix locations
-            pixels = hp.vec2pix(self.nside, vec[:, 0], vec[:, 1], vec[:, 2], nest=self.nested)
-            pixels = list(set(pixels))
-
-            # Add the neighboring pixels
-            pixels = set(hp.get_all_neighbours(self.nside, pixels, nest=self.nested).flatten())
-
-            # Add the pixels that the object traverse, and the neighbors, to the pixel_dict
-            for pix in pixels:
-                self.pixel_dict[pix].append(k)
+        n_objects = len(self.designations)
+
+        # Interpolate the unit vectors of all the objects over a finer sampled set of times,
+        # giving an array of shape (n_objects, n_sub_intervals, 3)
+        vec = (
+            self.rho_hat_m[:, np.newaxis, :] * Lm[np.newaxis]
+            + self.rho_hat_0[:, np.newaxis, :] * L0[np.newaxis]
+            + self.rho_hat_p[:, np.newaxis, :] * Lp[np.newaxis]
+        )
+
+        # Find the healpix locations, and keep the unique (object, pixel) pairs
+        npix = hp.nside2npix(self.nside)
+        pixels = hp.vec2pix(
+            self.nside, vec[..., 0].ravel(), vec[..., 1].ravel(), vec[..., 2].ravel(), nest=self.nested
+        )
+        objects = np.repeat(np.arange(n_objects, dtype=np.int64), self.n_sub_intervals)
+        objects, pixels = np.divmod(np.unique(objects * npix + pixels), npix)
+
+        # Add the neighboring pixels. Missing neighbours are returned as -1,
+        # hence the shift by one when encoding the (pixel, object) pairs.
+        pixels = hp.get_all_neighbours(self.nside, pixels, nest=self.nested).ravel()
+        objects = np.tile(objects, 8)
+        pixels, objects = np.divmod(np.unique((pixels + 1) * n_objects + objects), n_objects)
+        pixels -= 1
+
+        # The pairs are sorted by pixel, then object: store them as a CSR-style index
+        self.pixels, starts = np.unique(pixels, return_index=True)
+        self.pixel_offsets = np.append(starts, len(pixels))
+        self.pixel_objects = objects
 
     def update_pickets(self, jd_tdb):
         """
@@ -305,29 +400,29 @@ class PixelDict:
                     # shift earlier
                     self.tp = self.t0
                     self.r_obs_p = self.r_obs_0
-                    self.rho_hat_p_dict = self.rho_hat_0_dict
+                    self.rho_hat_p = self.rho_hat_0
 
                     self.t0 = self.tm
                     self.r_obs_0 = self.r_obs_m
-                    self.rho_hat_0_dict = self.rho_hat_m_dict
+                    self.rho_hat_0 = self.rho_hat_m
 
                     self.tm = self.t0 - self.picket_interval
                     self.r_obs_m = self.get_observatory_position(self.tm)
-                    self.rho_hat_m_dict = self.get_all_object_unit_vectors(self.r_obs_m, self.tm)
+                    self.rho_hat_m = self.get_all_object_unit_vectors(self.r_obs_m, self.tm)
 
                 else:
                     # shift later
                     self.tm = self.t0
                     self.r_obs_m = self.r_obs_0
-                    self.rho_hat_m_dict = self.rho_hat_0_dict
+                    self.rho_hat_m = self.rho_hat_0
 
                     self.t0 = self.tp
                     self.r_obs_0 = self.r_obs_p
-                    self.rho_hat_0_dict = self.rho_hat_p_dict
+                    self.rho_hat_0 = self.rho_hat_p
 
                     self.tp = self.t0 + self.picket_interval
                     self.r_obs_p = self.get_observatory_position(self.tp)
-                    self.rho_hat_p_dict = self.get_all_object_unit_vectors(self.r_obs_p, self.tp)
+                    self.rho_hat_p = self.get_all_object_unit_vectors(self.r_obs_p, self.tp)
 
             else:
                 # Need to compute three new sets
@@ -336,23 +431,23 @@ class PixelDict:
                 # This is repeated code
                 self.t0 += n * self.picket_interval
                 self.r_obs_0 = self.get_observatory_position(self.t0)
-                self.rho_hat_0_dict = self.get_all_object_unit_vectors(self.r_obs_0, self.t0)
+                self.rho_hat_0 = self.get_all_object_unit_vectors(self.r_obs_0, self.t0)
 
                 self.tp = self.t0 + self.picket_interval
                 self.r_obs_p = self.get_observatory_position(self.tp)
-                self.rho_hat_p_dict = self.get_all_object_unit_vectors(self.r_obs_p, self.tp)
+                self.rho_hat_p = self.get_all_object_unit_vectors(self.r_obs_p, self.tp)
 
                 self.tm = self.t0 - self.picket_interval
                 self.r_obs_m = self.get_observatory_position(self.tm)
-                self.rho_hat_m_dict = self.get_all_object_unit_vectors(self.r_obs_m, self.tm)
+                self.rho_hat_m = self.get_all_object_unit_vectors(self.r_obs_m, self.tm)
 
             self.compute_pixel_traversed()
         else:
             pass
 
-    def get_designations(self, jd_tdb, ra, dec, ang_fov):
+    def get_designations(self, jd_tdb, ra, dec, ang_fov, pixels=None):
         """
-        Get the object designations that are within an angular radius of a topocentric unit vector at a
+        Get the objects that are within an angular radius of a topocentric unit vector at a
         given time.
 
         Parameters
@@ -365,18 +460,22 @@ class PixelDict:
             declination (degrees)
         ang_fov: float
             Field of view radius
+        pixels: array of ints, optional
+            The healpix pixels within ang_fov of ra/dec, if already computed (default: None)
         Returns
         -------
-        desigs : list
-            List of designations
+        objects : array of ints
+            Indices (in self.designations) of the objects, sorted
         """
         # Update the table of unit vectors if needed.
         self.update_pickets(jd_tdb)
 
-        pixels = get_hp_neighbors(ra, dec, ang_fov, nside=self.nside, nested=self.nested)
+        if pixels is None:
+            pixels = get_hp_neighbors(ra, dec, ang_fov, nside=self.nside, nested=self.nested)
 
-        desigs = set()
-        for pix in pixels:
-            desigs.update(self.pixel_dict[pix])
+        # Look up the pixels that are in the index
+        rows = np.searchsorted(self.pixels, pixels)
+        found = rows < len(self.pixels)
+        found[found] = self.pixels[rows[found]] == pixels[found]
 
-        return desigs
+        return np.unique(csr_gather(self.pixel_offsets, self.pixel_objects, rows[found]))
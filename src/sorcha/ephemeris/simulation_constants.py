@@ -6,6 +6,13 @@ AU_KM = AU_M / 1000.0
 SPEED_OF_LIGHT = 2.99792458e5 * 86400.0 / AU_KM
 OBLIQUITY_ECLIPTIC = 84381.448 * (1.0 / 3600) * np.pi / 180.0
 
+# TT - TAI, in seconds
+TT_MINUS_TAI = 32.184
+# Parameters of the TDB - TT model used by SPICE, from the leapseconds kernel (naif0012.tls)
+DELTET_K = 1.657e-3
+DELTET_EB = 1.671e-2
+DELTET_M = (6.239996, 1.99096871e-7)
+
 
 def create_ecl_to_eq_rotation_matrix(ecl):
     """
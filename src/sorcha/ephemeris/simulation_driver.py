@@ -1,23 +1,135 @@
 from dataclasses import dataclass
 from collections import defaultdict
-from csv import writer
-from io import StringIO
-
+import sys
 import numpy as np
 import pandas as pd
 import spiceypy as spice
 
 from sorcha.ephemeris.simulation_setup import (
     create_assist_ephemeris,
+    create_pointing_arrays,
     furnish_spiceypy,
     generate_simulations,
+    PointingArrays,
 )
 from sorcha.ephemeris.simulation_constants import *
 from sorcha.ephemeris.simulation_geometry import *
 from sorcha.ephemeris.simulation_parsing import *
 from sorcha.utilities.dataUtilitiesForTests import get_data_out_filepath
 from sorcha.ephemeris.pixel_dict import PixelDict
-from sorcha.modules.PPOutput import PPOutWriteCSV, PPOutWriteSqlite3, PPOutWriteHDF5
+from sorcha.ephemeris.chebyshev_ephemeris import ChebyshevEphemeris
+from sorcha.ephemeris.chebyshev_store import ChebyshevEphemerisStore
+from sorcha.modules.PPOutput import (
+    PPOutWriteCSV,
+    PPOutWriteSqlite3,
+    PPOutWriteHDF5,
+    PPOutWriteParquet,
+    PPCloseParquetWriters,
+)
+
+# The columns of the ephemeris generated by create_ephemeris, in output order
+EPHEMERIS_COLUMNS = (
+    "ObjID",
+    "FieldID",
+    "fieldMJD_TAI",
+    "fieldJD_TDB",
+    "Range_LTC_km",
+    "RangeRate_LTC_km_s",
+    "RA_deg",
+    "RARateCosDec_deg_day",
+    "Dec_deg",
+    "DecRate_deg_day",
+    "Obj_Sun_x_LTC_km",
+    "Obj_Sun_y_LTC_km",
+    "Obj_Sun_z_LTC_km",
+    "Obj_Sun_vx_LTC_km_s",
+    "Obj_Sun_vy_LTC_km_s",
+    "Obj_Sun_vz_LTC_km_s",
+    "Obs_Sun_x_km",
+    "Obs_Sun_y_km",
+    "Obs_Sun_z_km",
+    "Obs_Sun_vx_km_s",
+    "Obs_Sun_vy_km_s",
+    "Obs_Sun_vz_km_s",
+    "phase_deg",
+)
+
+
+class EphemerisColumns:
+    """
+    Preallocated, growable column buffers holding the ephemeris rows generated by create_ephemeris.
+    The float columns are stored in a single 2D array so that the final dataframe is built
+    without copying them.
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        Parameters
+        ----------
+        capacity : int
+            Initial number of rows the buffers can hold (default: 1024)
+        """
+        self.n_rows = 0
+        self.obj_ids = np.empty(capacity, dtype=object)
+        self.field_ids = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty((len(EPHEMERIS_COLUMNS) - 2, capacity))
+
+    def reserve(self, n_new):
+        """
+        Makes sure the buffers can hold n_new more rows, doubling their size as needed.
+
+        Parameters
+        ----------
+        n_new : int
+            Number of rows about to be appended
+        """
+        capacity = len(self.field_ids)
+        if self.n_rows + n_new <= capacity:
+            return
+
+        while capacity < self.n_rows + n_new:
+            capacity *= 2
+
+        obj_ids = np.empty(capacity, dtype=object)
+        field_ids = np.empty(capacity, dtype=np.int64)
+        values = np.empty((self.values.shape[0], capacity))
+        obj_ids[: self.n_rows] = self.obj_ids[: self.n_rows]
+        field_ids[: self.n_rows] = self.field_ids[: self.n_rows]
+        values[:, : self.n_rows] = self.values[:, : self.n_rows]
+        self.obj_ids, self.field_ids, self.values = obj_ids, field_ids, values
+
+    def append_rows(self, columns):
+        """
+        Appends a block of ephemeris rows.
+
+        Parameters
+        ----------
+        columns : tuple
+            Arrays of values for each of the EPHEMERIS_COLUMNS, as returned by
+            calculate_rates_and_geometry_batch
+        """
+        n_new = len(columns[0])
+        self.reserve(n_new)
+        end = self.n_rows + n_new
+        self.obj_ids[self.n_rows : end] = [str(obj_id) for obj_id in columns[0]]
+        self.field_ids[self.n_rows : end] = columns[1]
+        self.values[:, self.n_rows : end] = columns[2:]
+        self.n_rows = end
+
+    def to_dataframe(self):
+        """
+        Builds the ephemeris dataframe from the buffers.
+
+        Returns
+        -------
+        ephemeris_df : pandas dataframe
+            The ephemeris, with the EPHEMERIS_COLUMNS as columns
+        """
+        n = self.n_rows
+        ephemeris_df = pd.DataFrame(self.values[:, :n].T, columns=EPHEMERIS_COLUMNS[2:], copy=False)
+        ephemeris_df.insert(0, "FieldID", self.field_ids[:n])
+        ephemeris_df.insert(0, "ObjID", self.obj_ids[:n])
+        return ephemeris_df
 
 
 @dataclass
@@ -47,7 +159,9 @@ def get_vec(row, vecname):
     return np.asarray([row[f"{vecname}_x"], row[f"{vecname}_y"], row[f"{vecname}_z"]])
 
 
-def create_ephemeris(orbits_df, pointings_df, args, sconfigs):
+def create_ephemeris(
+    orbits_df, pointings_df, args, sconfigs, write_ephemeris=True, pointings=None, join_columns=None
+):
     """Generate a set of observations given a collection of orbits
     and set of pointings.
 
@@ -82,6 +196,17 @@ def create_ephemeris(orbits_df, pointings_df, args, sconfigs):
             power of 2 (1, 2, 4, ...)  nside=64 is current default.
         n_sub_intervals: int
             Number of sub-intervals for the Lagrange interpolation (default: 101)
+    write_ephemeris : bool, optional
+        Write the ephemeris to the file given by args.output_ephemeris_file, if set.
+        Callers that write the ephemeris themselves set this to False. Default = True
+    pointings : PointingArrays, optional
+        pointings_df converted by create_pointing_arrays. Callers generating the ephemeris
+        for several chunks of orbits pass it to do the conversion only once.
+        Default = None (converted here)
+    join_columns : list of strings, optional
+        The columns of orbits_df joined onto the observations. An object_index column,
+        giving the row of each object in orbits_df, is added so that the other columns
+        can be looked up later on. Default = None (all the columns are joined)
 
     Returns
     -------
@@ -114,48 +239,16 @@ def create_ephemeris(orbits_df, pointings_df, args, sconfigs):
     n_sub_intervals = sconfigs.simulation.ar_n_sub_intervals
 
     ephemeris_csv_filename = None
-    if args.output_ephemeris_file and args.outpath:
+    if write_ephemeris and args.output_ephemeris_file and args.outpath:
         ephemeris_csv_filename = os.path.join(args.outpath, args.output_ephemeris_file)
 
     verboselog("Building ASSIST ephemeris object.")
     ephem, gm_sun, gm_total = create_assist_ephemeris(args, sconfigs.auxiliary)
     verboselog("Furnishing SPICE kernels.")
     furnish_spiceypy(args, sconfigs.auxiliary)
-    verboselog("Generating ASSIST+REBOUND simulations.")
-    sim_dict = generate_simulations(ephem, gm_sun, gm_total, orbits_df, args)
     pixel_dict = defaultdict(list)
-    observatories = Observatory(args, sconfigs.auxiliary)
-
-    output = StringIO()
-    in_memory_csv = writer(output)
-
-    column_names = (
-        "ObjID",
-        "FieldID",
-        "fieldMJD_TAI",
-        "fieldJD_TDB",
-        "Range_LTC_km",
-        "RangeRate_LTC_km_s",
-        "RA_deg",
-        "RARateCosDec_deg_day",
-        "Dec_deg",
-        "DecRate_deg_day",
-        "Obj_Sun_x_LTC_km",
-        "Obj_Sun_y_LTC_km",
-        "Obj_Sun_z_LTC_km",
-        "Obj_Sun_vx_LTC_km_s",
-        "Obj_Sun_vy_LTC_km_s",
-        "Obj_Sun_vz_LTC_km_s",
-        "Obs_Sun_x_km",
-        "Obs_Sun_y_km",
-        "Obs_Sun_z_km",
-        "Obs_Sun_vx_km_s",
-        "Obs_Sun_vy_km_s",
-        "Obs_Sun_vz_km_s",
-        "phase_deg",
-    )
-    column_types = defaultdict(ObjID=str, FieldID=str).setdefault(float)
-    in_memory_csv.writerow(column_names)
+
+    ephemeris_columns = EphemerisColumns()
 
     # t_picket is the last time at which the sky positions of all the objects
     # were calculated and placed into a healpix dictionary, i.e. the
@@ -168,8 +261,53 @@ def create_ephemeris(orbits_df, pointings_df, args, sconfigs):
 
     verboselog("Generating ephemeris...")
 
+    if pointings is None:
+        pointings = create_pointing_arrays(pointings_df, sconfigs)
+
+    # the observatory positions at the pickets are interpolated from the tabulated
+    # observatory ephemeris when there is one
+    observatories = pointings.observatory
+    if observatories is None:
+        observatories = Observatory(args, sconfigs.auxiliary)
+
+    # the orbits are integrated across the survey window and the pickets around it
+    pad = 2 * picket_interval + 1
+    orbit_ephemeris = None
+    if sconfigs.input.ephemerides_type.casefold() == "cheb":
+        verboselog("Reading the pre-propagated orbits from the Chebyshev ephemeris store.")
+        sim_dict = None
+        try:
+            orbit_ephemeris = ChebyshevEphemerisStore(args.input_ephemeris_file).read(
+                orbits_df["ObjID"],
+                ephem.jd_ref,
+                pointings.jd_tdb.min() - pad,
+                pointings.jd_tdb.max() + pad,
+            )
+        except ValueError as err:
+            args.pplogger.error(err)
+            sys.exit(err)
+    else:
+        verboselog("Generating ASSIST+REBOUND simulations.")
+        sim_dict = generate_simulations(ephem, gm_sun, gm_total, orbits_df, args)
+
+    # optionally integrate each orbit once across the survey window (and the pickets
+    # around it), so the positions of the objects become polynomial evaluations
+    if sconfigs.simulation.ar_prepropagation_segment is not None:
+        verboselog("Pre-propagating the orbits.")
+        orbit_ephemeris = ChebyshevEphemeris.from_simulations(
+            sim_dict,
+            pointings.jd_tdb.min() - ephem.jd_ref - pad,
+            pointings.jd_tdb.max() - ephem.jd_ref + pad,
+            segment_length=sconfigs.simulation.ar_prepropagation_segment,
+            tolerance=sconfigs.simulation.ar_prepropagation_tolerance,
+        )
+        verboselog(
+            f"Pre-propagated the orbits in {orbit_ephemeris.segment_length}-day segments of degree "
+            f"{orbit_ephemeris.degree} ({orbit_ephemeris.nbytes / 1e6:.1f} MB)."
+        )
+
     pixdict = PixelDict(
-        pointings_df["fieldJD_TDB"].iloc[0],
+        pointings.jd_tdb[0],
         sim_dict,
         ephem,
         obsCode,
@@ -177,61 +315,71 @@ def create_ephemeris(orbits_df, pointings_df, args, sconfigs):
         picket_interval,
         nside,
         n_sub_intervals=n_sub_intervals,
+        orbit_ephemeris=orbit_ephemeris,
     )
-    for _, pointing in pointings_df.iterrows():
-        mjd_tai = float(pointing["observationMidpointMJD_TAI"])
+    for i in range(len(pointings.jd_tdb)):
+        jd_tdb = pointings.jd_tdb[i]
 
         # If the observation time is too far from the
         # time of the last set of ballpark sky position,
         # compute a new set
 
-        desigs = pixdict.get_designations(
-            pointing["fieldJD_TDB"], pointing["fieldRA_deg"], pointing["fieldDec_deg"], ang_fov
+        objects = pixdict.get_designations(
+            jd_tdb, pointings.ra[i], pointings.dec[i], ang_fov, pixels=pointings.get_disc_pixels(i)
         )
-        unit_vectors = pixdict.interpolate_unit_vectors(desigs, pointing["fieldJD_TDB"])
-        visit_vector = get_vec(pointing, "visit_vector")
-        r_obs = get_vec(pointing, "r_obs")
-
-        for k, uv in unit_vectors.items():
-            ephem_geom_params = EphemerisGeometryParameters()
-            ephem_geom_params.obj_id = k
-            ephem_geom_params.mjd_tai = mjd_tai
-
-            v = sim_dict[k]
-            sim, ex = v["sim"], v["ex"]
-            uv /= np.linalg.norm(uv)
-            ang = np.arccos(np.dot(uv, visit_vector)) * 180 / np.pi
-            if ang < ang_fov + buffer:
-                (
-                    ephem_geom_params.rho,
-                    ephem_geom_params.rho_mag,
-                    _,
-                    ephem_geom_params.r_ast,
-                    ephem_geom_params.v_ast,
-                ) = integrate_light_time(sim, ex, pointing["fieldJD_TDB"] - ephem.jd_ref, r_obs, lt0=0.01)
-                ephem_geom_params.rho_hat = ephem_geom_params.rho / ephem_geom_params.rho_mag
-
-                ang_from_center = 180 / np.pi * np.arccos(np.dot(ephem_geom_params.rho_hat, visit_vector))
-                if ang_from_center < ang_fov:
-                    out_tuple = calculate_rates_and_geometry(pointing, ephem_geom_params)
-                    in_memory_csv.writerow(out_tuple)
+        if len(objects) == 0:
+            continue
+
+        uv = pixdict.interpolate_unit_vectors(objects, jd_tdb)
+        visit_vector = pointings.visit_vector[i]
+        r_obs = pointings.r_obs[i]
+
+        # Keep the objects whose interpolated positions land within the buffered field of view
+        uv /= np.linalg.norm(uv, axis=1)[:, np.newaxis]
+        ang = np.arccos(uv @ visit_vector) * 180 / np.pi
+        objects = objects[ang < ang_fov + buffer]
+        if len(objects) == 0:
+            continue
+
+        rho, rho_mag, _, r_ast, v_ast = pixdict.integrate_light_time(objects, r_obs, jd_tdb, lt0=0.01)
+        rho_hat = rho / rho_mag[:, np.newaxis]
+
+        ang_from_center = 180 / np.pi * np.arccos(rho_hat @ visit_vector)
+        in_fov = ang_from_center < ang_fov
+        if not in_fov.any():
+            continue
+
+        ephem_geom_params = EphemerisGeometryParameters()
+        ephem_geom_params.obj_id = pixdict.designations[objects[in_fov]]
+        ephem_geom_params.mjd_tai = pointings.mjd_tai[i]
+        ephem_geom_params.rho = rho[in_fov]
+        ephem_geom_params.rho_mag = rho_mag[in_fov]
+        ephem_geom_params.rho_hat = rho_hat[in_fov]
+        ephem_geom_params.r_ast = r_ast[in_fov]
+        ephem_geom_params.v_ast = v_ast[in_fov]
+
+        ephemeris_columns.append_rows(calculate_rates_and_geometry_batch(pointings, i, ephem_geom_params))
 
     verboselog("Ephemeris generated.")
-    # reset to the beginning of the in-memory CSV
-    output.seek(0)
-    ephemeris_df = pd.read_csv(output, dtype=column_types)
+    ephemeris_df = ephemeris_columns.to_dataframe()
 
     # if the user has defined an output file name for the ephemeris results, write out to that file
     if ephemeris_csv_filename:
         verboselog("Writing out ephemeris results to file.")
         write_out_ephemeris_file(ephemeris_df, ephemeris_csv_filename, args, sconfigs)
+        # nothing else is appended to this file, so a Parquet file is finalized here
+        if sconfigs.input.eph_format == "parquet":
+            PPCloseParquetWriters(ephemeris_csv_filename + ".parquet")
 
     # join the ephemeris and input orbits dataframe, take special care to make
     # sure the 'ObjID' column types match.
     verboselog("Joining ephemeris to orbits dataframe.")
     ephemeris_df["ObjID"] = ephemeris_df["ObjID"].astype("string")
     orbits_df["ObjID"] = orbits_df["ObjID"].astype("string")
-    observations = ephemeris_df.join(orbits_df.set_index("ObjID"), on="ObjID")
+    objects_df = orbits_df.set_index("ObjID")
+    if join_columns is not None:
+        objects_df = objects_df[join_columns].assign(object_index=np.arange(len(objects_df)))
+    observations = ephemeris_df.join(objects_df, on="ObjID")
 
     spice.kclear()
 
@@ -247,19 +395,20 @@ def get_residual_vectors(v1):
     The triplet (A,D,v1) forms an orthonormal basis of the 3D vector space
     Parameters
     -----------
-        v1 : array, shape = (3,))
-            The vector to be decomposed
+        v1 : array, shape = (3,) or (N,3)
+            The vector(s) to be decomposed
     Returns
     ----------
-        A :  array, shape = (3,))
-            A  vector
-        D : array, shape = (3,))
-            D vector
+        A :  array, shape = (3,) or (N,3)
+            A  vector(s)
+        D : array, shape = (3,) or (N,3)
+            D vector(s)
     """
-    x, y, z = v1
+    v1 = np.asarray(v1)
+    x, y, z = v1[..., 0], v1[..., 1], v1[..., 2]
     cosd = np.sqrt(1 - z * z)
-    A = np.array((-y, x, 0.0)) / cosd
-    D = np.array((-z * x / cosd, -z * y / cosd, cosd))
+    A = np.stack((-y / cosd, x / cosd, np.zeros_like(z)), axis=-1)
+    D = np.stack((-z * x / cosd, -z * y / cosd, cosd), axis=-1)
     return A, D
 
 
@@ -278,55 +427,103 @@ def calculate_rates_and_geometry(pointing: pd.DataFrame, ephem_geom_params: Ephe
     : tuple
         Tuple containing the ephemeris parameters needed for Sorcha post processing.
     """
-    r_sun = get_vec(pointing, "r_sun")
-    r_obs = get_vec(pointing, "r_obs")
-    v_sun = get_vec(pointing, "v_sun")
-    v_obs = get_vec(pointing, "v_obs")
-
-    ra0, dec0 = vec2ra_dec(ephem_geom_params.rho_hat)
-    drhodt = ephem_geom_params.v_ast - v_obs
-    drho_magdt = (1 / ephem_geom_params.rho_mag) * np.dot(ephem_geom_params.rho, drhodt)
+    batch_params = EphemerisGeometryParameters(
+        obj_id=[ephem_geom_params.obj_id],
+        mjd_tai=ephem_geom_params.mjd_tai,
+        rho=np.atleast_2d(ephem_geom_params.rho),
+        rho_hat=np.atleast_2d(ephem_geom_params.rho_hat),
+        rho_mag=np.atleast_1d(ephem_geom_params.rho_mag),
+        r_ast=np.atleast_2d(ephem_geom_params.r_ast),
+        v_ast=np.atleast_2d(ephem_geom_params.v_ast),
+    )
+    pointings = PointingArrays(
+        field_id=np.array([pointing["FieldID"]]),
+        jd_tdb=np.array([pointing["fieldJD_TDB"]]),
+        r_obs=get_vec(pointing, "r_obs")[np.newaxis],
+        v_obs=get_vec(pointing, "v_obs")[np.newaxis],
+        r_sun=get_vec(pointing, "r_sun")[np.newaxis],
+        v_sun=get_vec(pointing, "v_sun")[np.newaxis],
+    )
+    return tuple(column[0] for column in calculate_rates_and_geometry_batch(pointings, 0, batch_params))
+
+
+def calculate_rates_and_geometry_batch(
+    pointings: PointingArrays, i: int, ephem_geom_params: EphemerisGeometryParameters
+):
+    """Calculate rates and geometry for all the objects of a pointing within the field of view
+
+    Parameters
+    ----------
+    pointings : PointingArrays
+        The pointing database, as numpy arrays.
+    i : int
+        Index of the pointing in pointings.
+    ephem_geom_params : EphemerisGeometryParameters
+        Various parameters necessary to calculate the ephemeris. obj_id is a list of N designations,
+        rho_mag an array of shape (N,) and rho, rho_hat, r_ast and v_ast arrays of shape (N,3).
+
+    Returns
+    -------
+    : tuple
+        Tuple of arrays (one per column of EPHEMERIS_COLUMNS, N entries each) containing
+        the ephemeris parameters needed for Sorcha post processing.
+    """
+    r_sun = pointings.r_sun[i]
+    r_obs = pointings.r_obs[i]
+    v_sun = pointings.v_sun[i]
+    v_obs = pointings.v_obs[i]
+
+    rho = ephem_geom_params.rho
+    rho_hat = ephem_geom_params.rho_hat
+    rho_mag = ephem_geom_params.rho_mag
+    r_ast = ephem_geom_params.r_ast
+    v_ast = ephem_geom_params.v_ast
+    n = len(rho_mag)
+
+    ra0, dec0 = vec2ra_dec(rho_hat.T)
+    drhodt = v_ast - v_obs
+    drho_magdt = (1 / rho_mag) * np.einsum("ij,ij->i", rho, drhodt)
     ddeltatdt = drho_magdt / (SPEED_OF_LIGHT)
-    drhodt = ephem_geom_params.v_ast * (1 - ddeltatdt) - v_obs
-    A, D = get_residual_vectors(ephem_geom_params.rho_hat)
+    drhodt = v_ast * (1 - ddeltatdt)[:, np.newaxis] - v_obs
+    A, D = get_residual_vectors(rho_hat)
     drho_hatdt = (
-        drhodt / ephem_geom_params.rho_mag
-        - drho_magdt * ephem_geom_params.rho_hat / ephem_geom_params.rho_mag
+        drhodt / rho_mag[:, np.newaxis] - drho_magdt[:, np.newaxis] * rho_hat / rho_mag[:, np.newaxis]
     )
-    dradt = np.dot(A, drho_hatdt)
-    ddecdt = np.dot(D, drho_hatdt)
-    r_ast_sun = ephem_geom_params.r_ast - r_sun
-    v_ast_sun = ephem_geom_params.v_ast - v_sun
-    r_ast_obs = ephem_geom_params.r_ast - r_obs
+    dradt = np.einsum("ij,ij->i", A, drho_hatdt)
+    ddecdt = np.einsum("ij,ij->i", D, drho_hatdt)
+    r_ast_sun = r_ast - r_sun
+    v_ast_sun = v_ast - v_sun
+    r_ast_obs = r_ast - r_obs
     phase_angle = np.arccos(
-        np.dot(r_ast_sun, r_ast_obs) / (np.linalg.norm(r_ast_sun) * np.linalg.norm(r_ast_obs))
+        np.einsum("ij,ij->i", r_ast_sun, r_ast_obs)
+        / (np.linalg.norm(r_ast_sun, axis=1) * np.linalg.norm(r_ast_obs, axis=1))
     )
     obs_sun = r_obs - r_sun
     dobs_sundt = v_obs - v_sun
 
     return (
-        ephem_geom_params.obj_id,
-        pointing["FieldID"],
-        ephem_geom_params.mjd_tai,
-        pointing["fieldJD_TDB"],
-        ephem_geom_params.rho_mag * AU_KM,
+        np.array(ephem_geom_params.obj_id, dtype=object),
+        np.full(n, pointings.field_id[i]),
+        np.full(n, ephem_geom_params.mjd_tai),
+        np.full(n, pointings.jd_tdb[i]),
+        rho_mag * AU_KM,
         drho_magdt * AU_KM / (24 * 60 * 60),
         ra0,
         dradt * 180 / np.pi,
         dec0,
         ddecdt * 180 / np.pi,
-        r_ast_sun[0] * AU_KM,
-        r_ast_sun[1] * AU_KM,
-        r_ast_sun[2] * AU_KM,
-        v_ast_sun[0] * AU_KM / (24 * 60 * 60),
-        v_ast_sun[1] * AU_KM / (24 * 60 * 60),
-        v_ast_sun[2] * AU_KM / (24 * 60 * 60),
-        obs_sun[0] * AU_KM,
-        obs_sun[1] * AU_KM,
-        obs_sun[2] * AU_KM,
-        dobs_sundt[0] * AU_KM / (24 * 60 * 60),
-        dobs_sundt[1] * AU_KM / (24 * 60 * 60),
-        dobs_sundt[2] * AU_KM / (24 * 60 * 60),
+        r_ast_sun[:, 0] * AU_KM,
+        r_ast_sun[:, 1] * AU_KM,
+        r_ast_sun[:, 2] * AU_KM,
+        v_ast_sun[:, 0] * AU_KM / (24 * 60 * 60),
+        v_ast_sun[:, 1] * AU_KM / (24 * 60 * 60),
+        v_ast_sun[:, 2] * AU_KM / (24 * 60 * 60),
+        np.full(n, obs_sun[0] * AU_KM),
+        np.full(n, obs_sun[1] * AU_KM),
+        np.full(n, obs_sun[2] * AU_KM),
+        np.full(n, dobs_sundt[0] * AU_KM / (24 * 60 * 60)),
+        np.full(n, dobs_sundt[1] * AU_KM / (24 * 60 * 60)),
+        np.full(n, dobs_sundt[2] * AU_KM / (24 * 60 * 60)),
         phase_angle * 180 / np.pi,
     )
 
@@ -364,3 +561,8 @@ def write_out_ephemeris_file(ephemeris_df, ephemeris_csv_filename, args, sconfig
     elif sconfigs.input.eph_format == "hdf5" or sconfigs.output.output_format == "h5":
         verboselog("Outputting ephemeris to HDF5 binary file...")
         PPOutWriteHDF5(ephemeris_df, ephemeris_csv_filename + ".h5", "sorcha_ephemeris")
+    elif sconfigs.input.eph_format == "parquet":
+        verboselog("Outputting ephemeris to Parquet file...")
+        PPOutWriteParquet(
+            ephemeris_df, ephemeris_csv_filename + ".parquet", sconfigs.output.parquet_compression
+        )
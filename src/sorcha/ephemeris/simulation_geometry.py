@@ -1,5 +1,6 @@
 import healpy as hp
 import numpy as np
+from collections import defaultdict
 from sorcha.ephemeris.simulation_constants import (
     RADIUS_EARTH_KM,
     SPEED_OF_LIGHT,
@@ -8,6 +9,11 @@ from sorcha.ephemeris.simulation_constants import (
 )
 import spiceypy as spice
 
+# Reading one particle through sim.particles costs about as much as serializing a few hundred
+# particles, so the particles are only read one by one when they are this many times fewer
+# than the particles of the simulation
+DIRECT_READ_RATIO = 256
+
 
 def ecliptic_to_equatorial(v, rot_mat=ECL_TO_EQ_ROTATION_MATRIX):
     """
@@ -45,7 +51,7 @@ def equatorial_to_ecliptic(v, rot_mat=EQ_TO_ECL_ROTATION_MATRIX):
     return np.dot(v, rot_mat)
 
 
-def integrate_light_time(sim, ex, t, r_obs, lt0=0, iter=3, speed_of_light=SPEED_OF_LIGHT):
+def integrate_light_time(sim, ex, t, r_obs, lt0=0, iter=3, speed_of_light=SPEED_OF_LIGHT, index=0):
     """
     Performs the light travel time correction between object and observatory iteratively for the object at a given reference time
 
@@ -65,6 +71,8 @@ def integrate_light_time(sim, ex, t, r_obs, lt0=0, iter=3, speed_of_light=SPEED_
         Number of iterations
     speed_of_light: float
         Speed of light for the calculation (default is SPEED_OF_LIGHT constant)
+    index: int
+        Index of the object's particle in the simulation (default is 0)
     Returns
     -------
     rho: array
@@ -81,8 +89,8 @@ def integrate_light_time(sim, ex, t, r_obs, lt0=0, iter=3, speed_of_light=SPEED_
     lt = lt0
     for i in range(iter):
         ex.integrate_or_interpolate(t - lt)
-        target = np.array(sim.particles[0].xyz)
-        vtarget = np.array(sim.particles[0].vxyz)
+        target = np.array(sim.particles[index].xyz)
+        vtarget = np.array(sim.particles[index].vxyz)
         rho = target - r_obs
         rho_mag = np.linalg.norm(rho)
         lt = rho_mag / speed_of_light
@@ -90,6 +98,231 @@ def integrate_light_time(sim, ex, t, r_obs, lt0=0, iter=3, speed_of_light=SPEED_
     return rho, rho_mag, lt, target, vtarget
 
 
+def get_particle_states_at(sim, ex, t, indices):
+    """
+    Moves the simulation to a given time and returns the positions and velocities of a set of particles
+
+    Parameters
+    ----------
+    sim: simulation
+        Rebound simulation object
+    ex: simulation extras
+        ASSIST simulation extras
+    t: float
+        Target time
+    indices: array of ints
+        Indices of the particles in the simulation
+    Returns
+    -------
+    r: array (N,3)
+        Particle positions at time t
+    v: array (N,3)
+        Particle velocities at time t
+    """
+    ex.integrate_or_interpolate(t)
+    if len(indices) * DIRECT_READ_RATIO < sim.N:
+        particles = [sim.particles[int(i)] for i in indices]
+        r = np.array([p.xyz for p in particles], dtype=float).reshape(-1, 3)
+        v = np.array([p.vxyz for p in particles], dtype=float).reshape(-1, 3)
+        return r, v
+
+    r = np.empty((sim.N, 3))
+    v = np.empty((sim.N, 3))
+    sim.serialize_particle_data(xyz=r, vxvyvz=v)
+    return r[indices], v[indices]
+
+
+def get_particle_states(sim, ex, times, indices, interval=0.01, t_ref=None, edge_states=None):
+    """
+    Computes the positions and velocities of a set of particles in a simulation, each particle at its own time.
+    The simulation is only moved to the edges of the intervals (of length `interval`, aligned on t_ref) that
+    contain the requested times, and the states in between are obtained by cubic Hermite interpolation of the
+    positions and velocities at the edges. The states at the edges can be kept between calls in edge_states,
+    so that the edges shared with earlier calls are not integrated again.
+
+    Parameters
+    ----------
+    sim: simulation
+        Rebound simulation object
+    ex: simulation extras
+        ASSIST simulation extras
+    times: array (N entries)
+        Target time for each particle
+    indices: array of ints (N entries)
+        Indices of the particles in the simulation
+    interval: float
+        Maximum time span (days) over which the states are interpolated (default is 0.01 days)
+    t_ref: float
+        Time on which the edges of the intervals are aligned (default is the earliest target time)
+    edge_states: dictionary
+        States of the particles at the edges computed by earlier calls with the same simulation,
+        indices, interval and t_ref, by edge number. The new edges are added to it (default is None)
+    Returns
+    -------
+    r: array (N,3)
+        Particle positions at the target times
+    v: array (N,3)
+        Particle velocities at the target times
+    """
+    times = np.asarray(times, dtype=float)
+
+    if t_ref is None:
+        t_ref = times.min()
+    if edge_states is None:
+        edge_states = {}
+
+    if times.max() == times.min():
+        # a single time on an edge (as the first guess of the light travel time usually is)
+        # is kept with the edges, and any other single time is integrated to directly
+        edge = (times[0] - t_ref) / interval
+        if not np.isclose(edge, np.round(edge), rtol=0, atol=1e-9):
+            return get_particle_states_at(sim, ex, times[0], indices)
+        edge = int(np.round(edge))
+        if edge not in edge_states:
+            edge_states[edge] = get_particle_states_at(sim, ex, t_ref + edge * interval, indices)
+        return edge_states[edge]
+
+    # the intervals holding at least one target time, and the edges of those intervals
+    bins = np.floor((times - t_ref) / interval).astype(int)
+    edges = np.unique(np.concatenate((bins, bins + 1)))
+    edge_times = t_ref + edges * interval
+
+    for edge, t_edge in zip(edges.tolist(), edge_times):
+        if edge not in edge_states:
+            edge_states[edge] = get_particle_states_at(sim, ex, t_edge, indices)
+    r_edges = np.array([edge_states[edge][0] for edge in edges.tolist()])
+    v_edges = np.array([edge_states[edge][1] for edge in edges.tolist()])
+
+    # the edge following bins is always bins + 1
+    lo = np.searchsorted(edges, bins)
+    hi = lo + 1
+    n = np.arange(len(indices))
+    r0, v0 = r_edges[lo, n], v_edges[lo, n]
+    r1, v1 = r_edges[hi, n], v_edges[hi, n]
+
+    h = edge_times[hi] - edge_times[lo]
+    s = (times - edge_times[lo]) / h
+    s, h = s[:, np.newaxis], h[:, np.newaxis]
+    s2, s3 = s * s, s * s * s
+
+    r = (2 * s3 - 3 * s2 + 1) * r0 + (s3 - 2 * s2 + s) * h * v0 + (3 * s2 - 2 * s3) * r1 + (s3 - s2) * h * v1
+    v = (6 * s2 - 6 * s) * (r0 - r1) / h + (3 * s2 - 4 * s + 1) * v0 + (3 * s2 - 2 * s) * v1
+    return r, v
+
+
+def integrate_light_time_batch(sim_dict, desigs, t, r_obs, lt0=0, iter=3, speed_of_light=SPEED_OF_LIGHT):
+    """
+    Performs the light travel time correction between a set of objects and the observatory iteratively
+    at a given reference time. The objects sharing a simulation are corrected together.
+
+    Parameters
+    ----------
+    sim_dict: dictionary
+        Dictionary of ASSIST simulation objects, as built by generate_simulations
+    desigs: list
+        List of designations (consistent with the simulation dictionary)
+    t: float
+        Target time
+    r_obs: array (3 entries)
+        Observatory position at time t
+    lt0: float
+        First guess for light travel time
+    iter: int
+        Number of iterations
+    speed_of_light: float
+        Speed of light for the calculation (default is SPEED_OF_LIGHT constant)
+    Returns
+    -------
+    The outputs are given in the order of desigs.
+
+    rho: array (N,3)
+        Object-observatory vectors
+    rho_mag: array (N entries)
+        Magnitudes of the rho vectors
+    lt: array (N entries)
+        Light travel times
+    target: array (N,3)
+        Object position vectors at t-lt
+    vtarget: array (N,3)
+        Object velocities at t-lt
+    """
+    # group the objects by the simulation holding them
+    desigs = list(desigs)
+    groups = defaultdict(list)
+    for i, k in enumerate(desigs):
+        groups[id(sim_dict[k]["sim"])].append(i)
+
+    n = len(desigs)
+    rho, target, vtarget = np.empty((n, 3)), np.empty((n, 3)), np.empty((n, 3))
+    rho_mag, lt = np.empty(n), np.empty(n)
+
+    for positions in groups.values():
+        v = sim_dict[desigs[positions[0]]]
+        indices = [sim_dict[desigs[i]]["index"] for i in positions]
+        (
+            rho[positions],
+            rho_mag[positions],
+            lt[positions],
+            target[positions],
+            vtarget[positions],
+        ) = integrate_light_time_particles(
+            v["sim"], v["ex"], t, r_obs, indices, lt0=lt0, iter=iter, speed_of_light=speed_of_light
+        )
+
+    return rho, rho_mag, lt, target, vtarget
+
+
+def integrate_light_time_particles(sim, ex, t, r_obs, indices, lt0=0, iter=3, speed_of_light=SPEED_OF_LIGHT):
+    """
+    Performs the light travel time correction between a set of particles of one simulation
+    and the observatory iteratively at a given reference time.
+
+    Parameters
+    ----------
+    sim: simulation
+        ASSIST simulation object
+    ex: Extras
+        ASSIST Extras object
+    t: float
+        Target time
+    r_obs: array (3 entries)
+        Observatory position at time t
+    indices: array-like of int
+        Indices of the particles in the simulation
+    lt0: float
+        First guess for light travel time
+    iter: int
+        Number of iterations
+    speed_of_light: float
+        Speed of light for the calculation (default is SPEED_OF_LIGHT constant)
+    Returns
+    -------
+    The outputs are given in the order of indices.
+
+    rho: array (N,3)
+        Object-observatory vectors
+    rho_mag: array (N entries)
+        Magnitudes of the rho vectors
+    lt: array (N entries)
+        Light travel times
+    target: array (N,3)
+        Object position vectors at t-lt
+    vtarget: array (N,3)
+        Object velocities at t-lt
+    """
+    # the iterations converge, so their target times mostly fall in the same intervals,
+    # whose edges are integrated once
+    edge_states = {}
+    lt = np.full(len(indices), float(lt0))
+    for i in range(iter):
+        target, vtarget = get_particle_states(sim, ex, t - lt, indices, t_ref=t, edge_states=edge_states)
+        rho = target - r_obs
+        rho_mag = np.linalg.norm(rho, axis=1)
+        lt = rho_mag / speed_of_light
+
+    return rho, rho_mag, lt, target, vtarget
+
+
 def get_hp_neighbors(ra_c, dec_c, search_radius, nside=32, nested=True):
     """
     Queries the healpix grid for pixels near the given RA/Dec with a given search radius
@@ -121,6 +354,45 @@ def get_hp_neighbors(ra_c, dec_c, search_radius, nside=32, nested=True):
     return res
 
 
+def get_hp_neighbors_many(ra_c, dec_c, search_radius, nside=32, nested=True):
+    """
+    Queries the healpix grid for pixels near each of a set of RA/Dec with a given search radius.
+    The results are returned as one flat array of pixels, with the pixels near the
+    i-th position given by pixels[offsets[i] : offsets[i + 1]]
+
+    Parameters
+    ----------
+    ra_c: array of floats
+        Target RAs
+    dec_c: array of floats
+        Target decs
+    search_radius: float
+        Radius for the query
+    nside: int
+        healpix nside
+    nested: boolean
+        Defines the ordering scheme for the healpix ordering. True (default) means a NESTED ordering
+    Returns
+    -------
+    pixels: array of ints
+        Healpix pixels near each position, concatenated
+    offsets: array of ints (N+1 entries)
+        Start of the pixels of each position, followed by the total number of pixels
+    """
+    sr = search_radius * np.pi / 180.0
+    phi_c = np.asarray(ra_c, dtype=float) * np.pi / 180.0
+    theta_c = np.pi / 2.0 - np.asarray(dec_c, dtype=float) * np.pi / 180.0
+
+    vecs = hp.ang2vec(theta_c, phi_c).reshape(-1, 3)
+    res = [hp.query_disc(nside, vec, sr, nest=nested, inclusive=True) for vec in vecs]
+
+    offsets = np.zeros(len(res) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(r) for r in res])
+    pixels = np.concatenate(res).astype(np.int64) if res else np.empty(0, dtype=np.int64)
+
+    return pixels, offsets
+
+
 def ra_dec2vec(ra, dec):
     """
     Converts a RA/Dec pair to a unit vector on the sphere
@@ -207,3 +479,231 @@ def barycentricObservatoryRates(et, obsCode, observatories, Rearth=RADIUS_EARTH_
     mVecp = np.dot(mp, obsVec) * Rearth
     mVecm = np.dot(mm, obsVec) * Rearth
     return pos + mVec, vel + (mVecp - mVecm) / (2 * delta_et)
+
+
+def hermite_interpolate(x_nodes, f, df, x):
+    """
+    Cubic Hermite interpolation of a tabulated function, given its values and derivatives
+    on a grid of nodes
+
+    Parameters
+    ----------
+    x_nodes: array (M entries)
+        Increasing abscissae of the nodes
+    f: array (M, ...)
+        Values of the function at the nodes
+    df: array (M, ...)
+        Derivatives of the function at the nodes
+    x: array (N entries)
+        Abscissae to interpolate at, within [x_nodes[0], x_nodes[-1]]
+    Returns
+    -------
+    value: array (N, ...)
+        Interpolated values of the function
+    derivative: array (N, ...)
+        Derivatives of the interpolant
+    """
+    i = np.clip(np.searchsorted(x_nodes, x, side="right") - 1, 0, len(x_nodes) - 2)
+    h = x_nodes[i + 1] - x_nodes[i]
+    u = (x - x_nodes[i]) / h
+
+    # broadcast the per-abscissa quantities over the trailing dimensions of f
+    shape = (len(x),) + (1,) * (f.ndim - 1)
+    u, h = u.reshape(shape), h.reshape(shape)
+
+    u2, u3 = u * u, u * u * u
+    h00, h10, h01, h11 = 2 * u3 - 3 * u2 + 1, u3 - 2 * u2 + u, -2 * u3 + 3 * u2, u3 - u2
+    g00, g10, g01, g11 = 6 * u2 - 6 * u, 3 * u2 - 4 * u + 1, -6 * u2 + 6 * u, 3 * u2 - 2 * u
+
+    value = h00 * f[i] + h10 * h * df[i] + h01 * f[i + 1] + h11 * h * df[i + 1]
+    derivative = (g00 * f[i] + g01 * f[i + 1]) / h + g10 * df[i] + g11 * df[i + 1]
+    return value, derivative
+
+
+# rate of the Earth rotation angle, in radians per second
+EARTH_ROTATION_RATE = 2 * np.pi * 1.00273781191135448 / (24 * 60 * 60)
+
+
+def earth_rotation_angle(et):
+    """
+    Approximate Earth rotation angle, using ephemeris time in place of UT1
+
+    Parameters
+    ----------
+    et: float or array
+        JPL ephemeris time
+    Returns
+    -------
+    theta: float or array
+        Rotation angle (radians)
+    """
+    days = np.asarray(et) / (24 * 60 * 60)
+    return 2 * np.pi * np.mod(0.7790572732640 + 0.00273781191135448 * days + np.mod(days, 1.0), 1.0)
+
+
+def rotation_z(theta):
+    """
+    Rotation matrices about the z axis, and their derivatives
+
+    Parameters
+    ----------
+    theta: array (N entries)
+        Rotation angles (radians)
+    Returns
+    -------
+    rot: array (N,3,3)
+        Rotation matrices
+    derivative: array (N,3,3)
+        Derivatives of the rotation matrices with respect to theta
+    """
+    c, s = np.cos(theta), np.sin(theta)
+    zero, one = np.zeros_like(theta), np.ones_like(theta)
+    rot = np.stack([c, -s, zero, s, c, zero, zero, zero, one], axis=-1).reshape(-1, 3, 3)
+    derivative = np.stack([-s, -c, zero, c, -s, zero, zero, zero, zero], axis=-1).reshape(-1, 3, 3)
+    return rot, derivative
+
+
+class ObservatoryEphemeris:
+    """
+    Barycentric positions and velocities of an observatory over a span of time.
+
+    The barycentric state of the Earth and the ITRF93 to J2000 rotation are evaluated
+    with SPICE once, on a regular grid of epochs, and then interpolated for any number of
+    epochs with cubic Hermite polynomials. The daily rotation of the Earth is taken out
+    analytically before tabulating the rotation, so only its slow part (precession,
+    nutation and polar motion) is interpolated.
+
+    The error of cubic Hermite interpolation is at most step**4 / 384 times the largest
+    fourth derivative of the interpolated function. For the default step of 1/8 day,
+    the barycentric motion of the Earth (fourth derivative ~26 km/day**4, mostly from the
+    Moon) contributes less than 2 cm, and the diurnal polar motion term (~10 m at the
+    Earth's surface) less than 1 cm.
+    """
+
+    def __init__(self, observatories, obsCode, et_start, et_end, step=10800.0, Rearth=RADIUS_EARTH_KM):
+        """
+        Tabulates the state of the Earth and its orientation. The SPICE kernels must be furnished.
+
+        Parameters
+        ----------
+        observatories: Observatory
+            Observatory object with spherical representations for the obsCode
+        obsCode: str
+            MPC observatory code
+        et_start: float
+            First JPL ephemeris time to cover
+        et_end: float
+            Last JPL ephemeris time to cover
+        step: float
+            Spacing (seconds) of the tabulated epochs (default: 10800, i.e. 1/8 day)
+        Rearth: float
+            Radius of the Earth (default is RADIUS_EARTH_KM)
+        """
+        self.obsCode = obsCode
+        self.obs_vec = np.array(observatories.ObservatoryXYZ[obsCode], dtype=float) * Rearth
+
+        n_nodes = max(int(np.ceil((et_end - et_start) / step)), 1) + 1
+        self.et = et_start + step * np.arange(n_nodes)
+
+        self.earth_pos = np.empty((n_nodes, 3))
+        self.earth_vel = np.empty((n_nodes, 3))
+        m = np.empty((n_nodes, 3, 3))
+        dm = np.empty((n_nodes, 3, 3))
+        for i, et in enumerate(self.et):
+            posvel, _ = spice.spkezr("EARTH", et, "J2000", "NONE", "SSB")
+            self.earth_pos[i], self.earth_vel[i] = posvel[0:3], posvel[3:6]
+            xform = np.array(spice.sxform("ITRF93", "J2000", et))
+            m[i], dm[i] = xform[0:3, 0:3], xform[3:6, 0:3]
+
+        # the slowly varying part of the rotation, M Rz(-theta), and its derivative
+        rot, drot = rotation_z(earth_rotation_angle(self.et))
+        rot_t, drot_t = rot.transpose(0, 2, 1), drot.transpose(0, 2, 1)
+        self.slow_rot = m @ rot_t
+        self.slow_rot_rate = dm @ rot_t + EARTH_ROTATION_RATE * (m @ drot_t)
+
+    # the arrays describing the tabulated ephemeris
+    TABLES = ("obs_vec", "et", "earth_pos", "earth_vel", "slow_rot", "slow_rot_rate")
+
+    @classmethod
+    def from_tables(cls, obsCode, tables):
+        """
+        Creates an observatory ephemeris from previously tabulated arrays, without SPICE
+
+        Parameters
+        ----------
+        obsCode: str
+            MPC observatory code
+        tables: dict
+            The arrays named in ObservatoryEphemeris.TABLES
+        Returns
+        -------
+        : ObservatoryEphemeris
+            The observatory ephemeris
+        """
+        observatory_ephemeris = cls.__new__(cls)
+        observatory_ephemeris.obsCode = obsCode
+        for name in cls.TABLES:
+            setattr(observatory_ephemeris, name, tables[name])
+        return observatory_ephemeris
+
+    def barycentricObservatoryRates(self, et):
+        """
+        Computes the position and rate of motion for the observatory in barycentric coordinates
+
+        Parameters
+        ----------
+        et: float or array (N entries)
+            JPL ephemeris time
+        Returns
+        -------
+         : array (3,) or (N,3)
+            Position of the observatory (baricentric, km)
+         : array (3,) or (N,3)
+            Velocity of the observatory (baricentric, km/s)
+        """
+        scalar = np.ndim(et) == 0
+        et = np.atleast_1d(np.asarray(et, dtype=float))
+        if et.min() < self.et[0] or et.max() > self.et[-1]:
+            raise ValueError(
+                f"Epochs from {et.min()} to {et.max()} are outside of the observatory ephemeris, "
+                f"which covers {self.et[0]} to {self.et[-1]}."
+            )
+
+        earth_pos, earth_vel = hermite_interpolate(self.et, self.earth_pos, self.earth_vel, et)
+        slow_rot, slow_rot_rate = hermite_interpolate(self.et, self.slow_rot, self.slow_rot_rate, et)
+
+        # the observatory vector and its rate, rotated with the Earth
+        rot, drot = rotation_z(earth_rotation_angle(et))
+        obs_vec = rot @ self.obs_vec
+        obs_vec_rate = EARTH_ROTATION_RATE * (drot @ self.obs_vec)
+
+        pos = earth_pos + np.einsum("nij,nj->ni", slow_rot, obs_vec)
+        vel = (
+            earth_vel
+            + np.einsum("nij,nj->ni", slow_rot_rate, obs_vec)
+            + np.einsum("nij,nj->ni", slow_rot, obs_vec_rate)
+        )
+
+        if scalar:
+            return pos[0], vel[0]
+        return pos, vel
+
+    def barycentricObservatory(self, et, obsCode=None):
+        """
+        Computes the barycentric position of the observatory
+
+        Parameters
+        ----------
+            et : float or array (N entries)
+                JPL internal ephemeris time
+            obsCode : str
+                MPC Observatory code. If given, it must be the code the ephemeris
+                was tabulated for (default: None)
+        Returns
+        -------
+            : array (3,) or (N,3)
+                Barycentric position of the observatory (x,y,z)
+        """
+        if obsCode is not None and obsCode != self.obsCode:
+            raise ValueError(f"The observatory ephemeris is tabulated for {self.obsCode}, not {obsCode}.")
+        return self.barycentricObservatoryRates(et)[0]
@@ -3,12 +3,44 @@ import os
 import numpy as np
 import spiceypy as spice
 from pooch import Decompress
-from sorcha.ephemeris.simulation_constants import RADIUS_EARTH_KM
+from sorcha.ephemeris.simulation_constants import (
+    DELTET_EB,
+    DELTET_K,
+    DELTET_M,
+    RADIUS_EARTH_KM,
+    TT_MINUS_TAI,
+)
 from sorcha.ephemeris.simulation_geometry import ecliptic_to_equatorial, equatorial_to_ecliptic
 from sorcha.ephemeris.simulation_data_files import make_retriever
 from sorcha.ephemeris.orbit_conversion_utilities import universal_cartesian, universal_keplerian
 
 
+def mjd_tai_to_jd_tdb(mjd_tai):
+    """
+    Converts MJD values in TAI to JD in TDB, using the same model of
+    TDB - TT as SPICE (see the DELTET parameters of the leapseconds kernel).
+    The calculation is vectorized, and does not need any SPICE kernel.
+
+    Parameters
+    -------------
+    mjd_tai : float or array of floats
+        Input mjd
+
+    Returns
+    -------------
+    jd_tdb : float or array of floats
+        JD in TDB
+    """
+    # TT seconds past J2000
+    tt = (np.asarray(mjd_tai, dtype=float) - 51544.5) * (24 * 60 * 60) + TT_MINUS_TAI
+
+    m = DELTET_M[0] + DELTET_M[1] * tt
+    e = m + DELTET_EB * np.sin(m)
+    tdb = tt + DELTET_K * np.sin(e)
+
+    return 2451545.0 + tdb / (24 * 60 * 60)
+
+
 def mjd_tai_to_epoch(mjd_tai):
     """
     Converts a MJD value in TAI to SPICE ephemeris time
@@ -22,10 +54,7 @@ def mjd_tai_to_epoch(mjd_tai):
     -------------
         : Ephemeris time
     """
-    jd = mjd_tai + 2400000.5 + 32.184 / (24 * 60 * 60)
-    epoch_str = "JD %lf TDT" % jd
-    epoch = spice.j2000() + spice.str2et(epoch_str) / (24 * 60 * 60)
-    return epoch
+    return float(mjd_tai_to_jd_tdb(mjd_tai))
 
 
 def parse_orbit_row(row, epochJD_TDB, ephem, sun_dict, gm_sun, gm_total):
@@ -293,8 +322,6 @@ class Observatory:
             oc_file : str
                 Path for the file with observatory codes
         """
-        self.observatoryPositionCache = {}  # previously calculated positions to speed up the process
-
         if oc_file == None:
             retriever = make_retriever(auxconfigs, args.ar_data_file_path)
 
@@ -1,4 +1,8 @@
+from dataclasses import dataclass
 from functools import partial
+import hashlib
+import shutil
+import tempfile
 import spiceypy as spice
 from assist import Ephem
 from . import simulation_parsing as sp
@@ -14,18 +18,69 @@ from sorcha.ephemeris.simulation_constants import *
 from sorcha.ephemeris.simulation_data_files import make_retriever
 
 from sorcha.ephemeris.simulation_geometry import (
-    barycentricObservatoryRates,
-    get_hp_neighbors,
+    ObservatoryEphemeris,
+    get_hp_neighbors_many,
     ra_dec2vec,
 )
 from sorcha.ephemeris.simulation_parsing import (
     Observatory,
-    mjd_tai_to_epoch,
+    mjd_tai_to_jd_tdb,
 )
 
 from sorcha.utilities.generate_meta_kernel import build_meta_kernel_file
 
 
+@dataclass
+class PointingArrays:
+    """Data class holding the pointing information used by the ephemeris generation as numpy arrays,
+    indexed by the position of the pointing in the pointing database"""
+
+    field_id: np.ndarray = None
+    """FieldID of each pointing, shape (N,)"""
+    mjd_tai: np.ndarray = None
+    """observationMidpointMJD_TAI of each pointing, shape (N,)"""
+    jd_tdb: np.ndarray = None
+    """fieldJD_TDB of each pointing, shape (N,)"""
+    ra: np.ndarray = None
+    """fieldRA_deg of each pointing, shape (N,)"""
+    dec: np.ndarray = None
+    """fieldDec_deg of each pointing, shape (N,)"""
+    visit_vector: np.ndarray = None
+    """unit vector towards the field center, shape (N,3)"""
+    r_obs: np.ndarray = None
+    """barycentric observatory position (au), shape (N,3)"""
+    v_obs: np.ndarray = None
+    """barycentric observatory velocity (au/day), shape (N,3)"""
+    r_sun: np.ndarray = None
+    """barycentric Sun position (au), shape (N,3)"""
+    v_sun: np.ndarray = None
+    """barycentric Sun velocity (au/day), shape (N,3)"""
+    disc_pixels: np.ndarray = None
+    """healpix pixels within the field of view of the pointings, concatenated"""
+    disc_offsets: np.ndarray = None
+    """start of the disc_pixels of each pointing, followed by their total number, shape (N+1,)"""
+    observatory: ObservatoryEphemeris = None
+    """tabulated observatory ephemeris, covering the pointings and the pickets around them"""
+
+    def get_disc_pixels(self, i):
+        """Returns the healpix pixels within the field of view of pointing i, or None if they
+        have not been computed.
+
+        Parameters
+        -----------
+        i : int
+            Index of the pointing.
+
+        Returns
+        --------
+        pixels : array of ints or None
+            The healpix pixels of the pointing.
+        """
+        if self.disc_pixels is None:
+            return None
+        return self.disc_pixels[self.disc_offsets[i] : self.disc_offsets[i + 1]]
+
+
 def create_assist_ephemeris(args, auxconfigs) -> tuple:
     """Build the ASSIST ephemeris object
     Parameter
@@ -94,7 +149,9 @@ def furnish_spiceypy(args, auxconfigs):
 
 def generate_simulations(ephem, gm_sun, gm_total, orbits_df, args):
     """
-    Creates the dictionary of ASSIST simulations for the ephemeris generation
+    Creates the dictionary of ASSIST simulations for the ephemeris generation.
+    All the objects with the same epoch are added as test particles to a single
+    simulation, so that they can be integrated together.
 
     Parameters
     ------------
@@ -112,11 +169,16 @@ def generate_simulations(ephem, gm_sun, gm_total, orbits_df, args):
     Returns
     ---------
     sim_dict : dict
-        Dictionary of ASSIST simulations
+        Dictionary of ASSIST simulations. For each object, "sim" and "ex" are the
+        simulation holding the object and its ASSIST extras, and "index" is the
+        index of the object's particle in that simulation.
 
     """
     sim_dict = defaultdict(dict)  # return
 
+    # rebound particles for each epoch, in input order
+    epoch_particles = defaultdict(list)
+
     sun_dict = dict()  # This could be passed in and reused
     for i, row in orbits_df.iterrows():
         epoch = row["epochMJD_TDB"]
@@ -137,7 +199,9 @@ def generate_simulations(ephem, gm_sun, gm_total, orbits_df, args):
 
         # Instantiate a rebound particle
         ic = rebound.Particle(x=x, y=y, z=z, vx=vx, vy=vy, vz=vz)
+        epoch_particles[epoch].append((row["ObjID"], ic))
 
+    for epoch, particles in epoch_particles.items():
         # Instantiate a rebound simulation and set initial time and time step
         # The time step is just a guess to start with.
         sim = rebound.Simulation()
@@ -145,8 +209,9 @@ def generate_simulations(ephem, gm_sun, gm_total, orbits_df, args):
         sim.dt = 10
         # This turns off the iterative timestep introduced in arXiv:2401.02849 and default since rebound 4.0.3
         sim.ri_ias15.adaptive_mode = 1
-        # Add the particle to the simulation
-        sim.add(ic)
+        # Add the particles to the simulation
+        for _, ic in particles:
+            sim.add(ic)
 
         # Attach assist extras to the simulation
         ex = assist.Extras(sim, ephem)
@@ -158,8 +223,10 @@ def generate_simulations(ephem, gm_sun, gm_total, orbits_df, args):
         ex.forces = forces
 
         # Save the simulation in the dictionary
-        sim_dict[row["ObjID"]]["sim"] = sim
-        sim_dict[row["ObjID"]]["ex"] = ex
+        for index, (obj_id, _) in enumerate(particles):
+            sim_dict[obj_id]["sim"] = sim
+            sim_dict[obj_id]["ex"] = ex
+            sim_dict[obj_id]["index"] = index
 
     return sim_dict
 
@@ -182,6 +249,30 @@ def precompute_pointing_information(pointings_df, args, sconfigs):
     pointings_df : pandas dataframe
         The original dataframe with several additional columns of precomputed values.
     """
+    pointings_df, _ = _precompute_pointing_information(pointings_df, args, sconfigs)
+    return pointings_df
+
+
+def _precompute_pointing_information(pointings_df, args, sconfigs):
+    """Adds the precomputed values to the pointings dataframe, and also returns the
+    observatory ephemeris tabulated on the way.
+
+    Parameters
+    -----------
+    pointings_df : pandas dataframe
+        Contains the telescope pointing database.
+    args : dictionary
+        Command line arguments needed for initialization.
+    sconfigs: dataclass
+        Dataclass of configuration file arguments.
+
+    Returns
+    --------
+    pointings_df : pandas dataframe
+        The original dataframe with several additional columns of precomputed values.
+    observatory_ephemeris : ObservatoryEphemeris
+        The observatory ephemeris, covering the pointings and the pickets around them.
+    """
     ephem, _, _ = create_assist_ephemeris(args, sconfigs.auxiliary)
 
     furnish_spiceypy(args, sconfigs.auxiliary)
@@ -196,26 +287,18 @@ def precompute_pointing_information(pointings_df, args, sconfigs):
     pointings_df["visit_vector_y"] = vectors[:, 1]
     pointings_df["visit_vector_z"] = vectors[:, 2]
 
-    # use pandas `apply` (even though it's slow) instead of looping over the df in a for loop
-    pointings_df["fieldJD_TDB"] = pointings_df.apply(
-        lambda row: mjd_tai_to_epoch(row["observationMidpointMJD_TAI"]), axis=1
+    pointings_df["fieldJD_TDB"] = mjd_tai_to_jd_tdb(
+        pointings_df["observationMidpointMJD_TAI"].to_numpy(dtype=float)
     )
     et = (pointings_df["fieldJD_TDB"] - spice.j2000()) * 24 * 60 * 60
 
-    # create a partial function since most params don't change, and it makes the lambda easier to read
-    partial_get_hp_neighbors = partial(
-        get_hp_neighbors,
-        search_radius=sconfigs.simulation.ar_ang_fov + sconfigs.simulation.ar_fov_buffer,
-        nside=2**sconfigs.simulation.ar_healpix_order,
-        nested=True,
-    )
-
-    # create empty arrays for observatory position and velocity to be filled in
-    r_obs = np.empty((len(pointings_df), 3))
-    v_obs = np.empty((len(pointings_df), 3))
+    # tabulate the observatory ephemeris once, over the span of the pointings and the
+    # pickets of the ephemeris generation around them
+    et = et.to_numpy(dtype=float)
+    pad = (2 * sconfigs.simulation.ar_picket + 1) * 24 * 60 * 60
+    observatory_ephemeris = ObservatoryEphemeris(observatories, obsCode, et.min() - pad, et.max() + pad)
 
-    for idx, et_i in enumerate(et):
-        r_obs[idx], v_obs[idx] = barycentricObservatoryRates(et_i, obsCode, observatories=observatories)
+    r_obs, v_obs = observatory_ephemeris.barycentricObservatoryRates(et)
 
     r_obs /= AU_KM  # convert to au
     v_obs *= (24 * 60 * 60) / AU_KM  # convert to au/day
@@ -244,4 +327,278 @@ def precompute_pointing_information(pointings_df, args, sconfigs):
     pointings_df["v_sun_z"] = v_sun[:, 2]
 
     spice.kclear()
-    return pointings_df
+    return pointings_df, observatory_ephemeris
+
+
+def create_pointing_arrays(pointings_df, sconfigs=None):
+    """Converts the pointing information used by the ephemeris generation into contiguous
+    numpy arrays, so it can be indexed by integer without building a pandas row per pointing.
+    If the configuration is given, the healpix pixels within the field of view of each pointing
+    are also computed, once for all the chunks of objects.
+
+    Parameters
+    -----------
+    pointings_df : pandas dataframe
+        The pointing database, with the columns added by precompute_pointing_information.
+    sconfigs: dataclass, optional
+        Dataclass of configuration file arguments. Default = None
+
+    Returns
+    --------
+    pointings : PointingArrays
+        The pointing information as numpy arrays.
+    """
+
+    def get_vectors(name):
+        return np.ascontiguousarray(
+            pointings_df[[f"{name}_x", f"{name}_y", f"{name}_z"]].to_numpy(dtype=float)
+        )
+
+    pointings = PointingArrays(
+        field_id=pointings_df["FieldID"].to_numpy(dtype=np.int64),
+        mjd_tai=pointings_df["observationMidpointMJD_TAI"].to_numpy(dtype=float),
+        jd_tdb=pointings_df["fieldJD_TDB"].to_numpy(dtype=float),
+        ra=pointings_df["fieldRA_deg"].to_numpy(dtype=float),
+        dec=pointings_df["fieldDec_deg"].to_numpy(dtype=float),
+        visit_vector=get_vectors("visit_vector"),
+        r_obs=get_vectors("r_obs"),
+        v_obs=get_vectors("v_obs"),
+        r_sun=get_vectors("r_sun"),
+        v_sun=get_vectors("v_sun"),
+    )
+
+    if sconfigs is not None:
+        # the same search as PixelDict.get_designations does for each pointing
+        pointings.disc_pixels, pointings.disc_offsets = get_hp_neighbors_many(
+            pointings.ra,
+            pointings.dec,
+            search_radius=sconfigs.simulation.ar_ang_fov,
+            nside=2**sconfigs.simulation.ar_healpix_order,
+            nested=True,
+        )
+
+    return pointings
+
+
+# Version of the layout of the pointing cache, part of its key
+POINTING_CACHE_VERSION = 3
+
+# The PointingArrays fields stored in the pointing cache
+POINTING_CACHE_FIELDS = (
+    "field_id",
+    "jd_tdb",
+    "visit_vector",
+    "r_obs",
+    "v_obs",
+    "r_sun",
+    "v_sun",
+    "disc_pixels",
+    "disc_offsets",
+)
+
+
+def _data_file_signatures(args, auxconfigs):
+    """Identifies the SPICE kernels and ephemerides files that a run would read, by their
+    resolved path, size and modification time. Hashing the contents of these files
+    (over a GB) on every run would cost more than the cache saves.
+
+    Parameters
+    -----------
+    args : dictionary
+        Command line arguments needed for initialization.
+    auxconfigs: dataclass
+        Dataclass of auxiliary configuration file arguments.
+
+    Returns
+    --------
+    signatures : list of tuples
+        (path, size, modification time in ns) of each file. The size and time are None
+        for a file that has not been downloaded yet.
+    """
+    data_path = make_retriever(auxconfigs, args.ar_data_file_path).abspath
+
+    signatures = []
+    for file_name in (
+        *auxconfigs.ordered_kernel_files,
+        auxconfigs.jpl_planets,
+        auxconfigs.jpl_small_bodies,
+        auxconfigs.observatory_codes,
+    ):
+        file_path = os.path.realpath(os.path.join(data_path, file_name))
+        try:
+            stat = os.stat(file_path)
+            signatures.append((file_path, stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            signatures.append((file_path, None, None))
+
+    return signatures
+
+
+def pointing_cache_key(args, sconfigs):
+    """Computes the key of the cached pointing information for this run. The key depends on
+    the contents of the pointing database and on everything else that goes into the
+    precomputed values: the SQL query, the observatory code, the SPICE kernels and
+    ephemerides files (by resolved path, size and modification time), and the field
+    of view and healpix order used to find the pixels covered by each pointing.
+
+    Parameters
+    -----------
+    args : dictionary
+        Command line arguments needed for initialization.
+    sconfigs: dataclass
+        Dataclass of configuration file arguments.
+
+    Returns
+    --------
+    key : str
+        Hexadecimal digest identifying the cached pointing information.
+    """
+    db_hash = hashlib.md5()
+    with open(args.pointing_database, "rb") as f:
+        for block in iter(partial(f.read, 2**24), b""):
+            db_hash.update(block)
+
+    auxconfigs = sconfigs.auxiliary
+    key = hashlib.md5()
+    for value in (
+        POINTING_CACHE_VERSION,
+        db_hash.hexdigest(),
+        sconfigs.input.pointing_sql_query,
+        sconfigs.filters.observing_filters,
+        sconfigs.simulation.ar_obs_code,
+        _data_file_signatures(args, auxconfigs),
+        sconfigs.simulation.ar_ang_fov,
+        sconfigs.simulation.ar_healpix_order,
+        sconfigs.simulation.ar_picket,
+    ):
+        key.update(repr(value).encode())
+        key.update(b"\0")
+
+    return key.hexdigest()
+
+
+def save_pointing_cache(pointings, cache_dir, key):
+    """Writes the precomputed pointing information to the cache directory, as one .npy file
+    per field, so later runs can memory-map it. The files are written to a temporary
+    directory which is then renamed, so that concurrent runs never read a partial cache.
+
+    Parameters
+    -----------
+    pointings : PointingArrays
+        The precomputed pointing information.
+    cache_dir : str
+        The directory holding the cached pointing information.
+    key : str
+        The key of the cached pointing information, from pointing_cache_key.
+
+    Returns
+    --------
+    None.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp_pointings_")
+    for name in POINTING_CACHE_FIELDS:
+        np.save(os.path.join(tmp_path, name + ".npy"), getattr(pointings, name))
+    if pointings.observatory is not None:
+        for name in ObservatoryEphemeris.TABLES:
+            np.save(os.path.join(tmp_path, f"observatory_{name}.npy"), getattr(pointings.observatory, name))
+
+    try:
+        os.rename(tmp_path, os.path.join(cache_dir, f"pointings_{key}"))
+    except OSError:
+        # another run wrote the same cache in the meantime
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def load_pointing_cache(pointings_df, cache_dir, key, obsCode=None):
+    """Reads the cached pointing information written by save_pointing_cache, memory-mapping
+    the arrays, and adds the precomputed columns to the pointing dataframe.
+
+    Parameters
+    -----------
+    pointings_df : pandas dataframe
+        Contains the telescope pointing database.
+    cache_dir : str
+        The directory holding the cached pointing information.
+    key : str
+        The key of the cached pointing information, from pointing_cache_key.
+    obsCode : str, optional
+        MPC observatory code of the cached observatory ephemeris. Default = None
+
+    Returns
+    --------
+    pointings : PointingArrays or None
+        The cached pointing information, or None if it is not in the cache.
+    """
+    path = os.path.join(cache_dir, f"pointings_{key}")
+    if not os.path.isdir(path):
+        return None
+
+    cached = {
+        name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in POINTING_CACHE_FIELDS
+    }
+    if not np.array_equal(cached["field_id"], pointings_df["FieldID"].to_numpy(dtype=np.int64)):
+        return None
+
+    pointings_df["fieldJD_TDB"] = cached["jd_tdb"]
+    for name in ("visit_vector", "r_obs", "v_obs", "r_sun", "v_sun"):
+        for j, axis in enumerate("xyz"):
+            pointings_df[f"{name}_{axis}"] = cached[name][:, j]
+
+    pointings = PointingArrays(
+        mjd_tai=pointings_df["observationMidpointMJD_TAI"].to_numpy(dtype=float),
+        ra=pointings_df["fieldRA_deg"].to_numpy(dtype=float),
+        dec=pointings_df["fieldDec_deg"].to_numpy(dtype=float),
+        **cached,
+    )
+
+    if os.path.isfile(os.path.join(path, "observatory_et.npy")):
+        tables = {
+            name: np.load(os.path.join(path, f"observatory_{name}.npy"), mmap_mode="r")
+            for name in ObservatoryEphemeris.TABLES
+        }
+        pointings.observatory = ObservatoryEphemeris.from_tables(obsCode, tables)
+
+    return pointings
+
+
+def prepare_pointings(pointings_df, args, sconfigs):
+    """Precomputes the pointing information needed by the ephemeris generation, and converts
+    it to numpy arrays. If a pointing cache directory is configured, the precomputed
+    information is read from it when available, and written to it otherwise.
+
+    Parameters
+    -----------
+    pointings_df : pandas dataframe
+        Contains the telescope pointing database.
+    args : dictionary
+        Command line arguments needed for initialization.
+    sconfigs: dataclass
+        Dataclass of configuration file arguments.
+
+    Returns
+    --------
+    pointings_df : pandas dataframe
+        The original dataframe with several additional columns of precomputed values.
+    pointings : PointingArrays
+        The pointing information as numpy arrays.
+    """
+    pplogger = logging.getLogger(__name__)
+    cache_dir = sconfigs.simulation.ar_pointing_cache
+
+    if cache_dir is not None:
+        key = pointing_cache_key(args, sconfigs)
+        pointings = load_pointing_cache(pointings_df, cache_dir, key, sconfigs.simulation.ar_obs_code)
+        if pointings is not None:
+            pplogger.info(f"Read the precomputed pointing information from the cache in {cache_dir}.")
+            return pointings_df, pointings
+
+    pointings_df, observatory_ephemeris = _precompute_pointing_information(pointings_df, args, sconfigs)
+    pointings = create_pointing_arrays(pointings_df, sconfigs)
+    pointings.observatory = observatory_ephemeris
+
+    if cache_dir is not None:
+        pplogger.info(f"Writing the precomputed pointing information to the cache in {cache_dir}.")
+        save_pointing_cache(pointings, cache_dir, key)
+
+    return pointings_df, pointings
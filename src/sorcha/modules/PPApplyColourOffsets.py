@@ -1,6 +1,7 @@
 import logging
 import sys
 import numpy as np
+import pandas as pd
 import fnmatch
 
 
@@ -60,11 +61,11 @@ def PPApplyColourOffsets(observations, function, othercolours, observing_filters
 
     # first apply the correct colour offset to H for every observation
     try:
-        unique_opt_filters = observations["optFilter"].unique()
-        for filter in unique_opt_filters:
-            mask = observations["optFilter"] == filter
-            diff_column_name = f"{filter}-{mainfilter}"
-            observations.loc[mask, H_col] = observations[H_col] + observations[diff_column_name]
+        unique_opt_filters = list(observations["optFilter"].unique())
+        colour_offsets = PPSelectFilterColumns(
+            observations, unique_opt_filters, [f"{filter}-{mainfilter}" for filter in unique_opt_filters]
+        )
+        observations[H_col] = observations[H_col].to_numpy() + colour_offsets
 
     except KeyError:
         pplogger.error("ERROR: PPApplyColourOffsets: H column missing!")
@@ -82,8 +83,8 @@ def PPApplyColourOffsets(observations, function, othercolours, observing_filters
         if set([H_col, "G1", "G2"]).issubset(observations.columns):
             pass
         elif set(col_list).issubset(observations.columns):
-            observations["G1"] = observations.apply(lambda row: row["G1" + row["optFilter"]], axis=1)
-            observations["G2"] = observations.apply(lambda row: row["G2" + row["optFilter"]], axis=1)
+            observations["G1"] = PPSelectFilterColumns(observations, observing_filters, G1list)
+            observations["G2"] = PPSelectFilterColumns(observations, observing_filters, G2list)
             observations.drop(col_list[1:], axis=1, inplace=True)
         else:
             pplogger.error(
@@ -100,7 +101,7 @@ def PPApplyColourOffsets(observations, function, othercolours, observing_filters
         if set([H_col, "GS"]).issubset(observations.columns):
             pass
         elif set(col_list).issubset(observations.columns):
-            observations["GS"] = observations.apply(lambda row: row["GS" + row["optFilter"]], axis=1)
+            observations["GS"] = PPSelectFilterColumns(observations, observing_filters, Glist)
             observations.drop(col_list[1:], axis=1, inplace=True)
         else:
             pplogger.error(
@@ -117,7 +118,7 @@ def PPApplyColourOffsets(observations, function, othercolours, observing_filters
         if set([H_col, "G12"]).issubset(observations.columns):
             pass
         elif set(col_list).issubset(observations.columns):
-            observations["G12"] = observations.apply(lambda row: row["G12" + row["optFilter"]], axis=1)
+            observations["G12"] = PPSelectFilterColumns(observations, observing_filters, G12list)
             observations.drop(col_list[1:], axis=1, inplace=True)
         else:
             pplogger.error(
@@ -134,7 +135,7 @@ def PPApplyColourOffsets(observations, function, othercolours, observing_filters
         if set([H_col, "S"]).issubset(observations.columns):
             pass
         elif set(col_list).issubset(observations.columns):
-            observations["S"] = observations.apply(lambda row: row["S" + row["optFilter"]], axis=1)
+            observations["S"] = PPSelectFilterColumns(observations, observing_filters, Slist)
             observations.drop(col_list[1:], axis=1, inplace=True)
         else:
             pplogger.error(
@@ -162,3 +163,37 @@ def PPApplyColourOffsets(observations, function, othercolours, observing_filters
     observations.rename(columns={H_col: "H_filter", "H_original": H_col}, inplace=True)
 
     return observations
+
+
+def PPSelectFilterColumns(observations, filters, columns):
+    """
+    Selects, for each observation, the value of the column corresponding to the
+    filter of the observation, by gathering from the (observations x filters)
+    array of the columns with the categorical codes of the filters.
+
+    Parameters
+    -----------
+    observations: Pandas dataframe
+        dataframe of observations.
+
+    filters : list of strings
+        list of filters.
+
+    columns : list of strings
+        name of the column holding the values for each filter in filters.
+
+    Returns
+    -----------
+    values : numpy array
+        the value of the column of the filter of each observation.
+    """
+
+    # map the categorical codes of the filters of the observations to positions in filters
+    opt_filter = observations["optFilter"].astype("category")
+    filter_positions = pd.Index(filters).get_indexer(opt_filter.cat.categories)
+    codes = np.where(opt_filter.cat.codes < 0, -1, filter_positions[opt_filter.cat.codes])
+    if np.any(codes < 0):
+        raise KeyError("PPSelectFilterColumns: filter missing from the list of filters.")
+
+    values = observations[columns].to_numpy()
+    return values[np.arange(len(values)), codes]
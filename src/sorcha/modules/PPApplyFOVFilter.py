@@ -1,6 +1,5 @@
 import logging
 import numpy as np
-from astropy.coordinates import SkyCoord
 
 from sorcha.utilities.sorchaModuleRNG import PerModuleRNG
 
@@ -68,38 +67,115 @@ def PPApplyFOVFilter(observations, sconfigs, module_rngs, footprint=None, verbos
     return observations
 
 
+def PPApplyFOVMask(observations, sconfigs, module_rngs, footprint=None, keep=None, verbose=False):
+    """
+    Returns which observations pass the field-of-view filters applied by
+    PPApplyFOVFilter, without removing any rows.
+
+    Adds the following columns to the observations dataframe:
+
+    - detectorID (if full camera footprint is used, NaN for the observations
+      that do not land on a detector)
+
+    Parameters
+    -----------
+    observations: Pandas dataframe
+        dataframe of observations.
+
+    sconfigs: dataclass
+        Dataclass of configuration file arguments.
+
+    module_rngs : PerModuleRNG
+        A collection of random number generators (per module).
+
+    footprint: Footprint
+        A Footprint class object that represents the boundaries of the detector(s).
+        Default: None.
+
+    keep : numpy array of booleans, optional
+        The observations kept by the previous filters. Default = None (all observations)
+
+    verbose: boolean
+        Controls whether logging in verbose mode is on or off.
+        Default: False
+
+    Returns
+    -----------
+    keep : numpy array of booleans
+        True for the observations that are kept and pass the field-of-view filters.
+    """
+
+    pplogger = logging.getLogger(__name__)
+    verboselog = pplogger.info if verbose else lambda *a, **k: None
+
+    n = len(observations.index)
+    if keep is None:
+        keep = np.ones(n, dtype=bool)
+
+    if sconfigs.fov.camera_model == "footprint":
+        verboselog("Applying sensor footprint filter...")
+        onSensor, detectorIDs = footprint.applyFootprint(
+            observations, edge_thresh=sconfigs.fov.footprint_edge_threshold
+        )
+
+        detectorID = np.full(n, np.nan)
+        detectorID[onSensor] = detectorIDs
+        observations["detectorID"] = detectorID
+
+        keep = keep & ~np.isnan(detectorID)
+
+    if sconfigs.fov.camera_model == "circle":
+        verboselog("FOV is circular...")
+        if sconfigs.fov.circle_radius:
+            verboselog("Circle radius is set. Applying circular footprint filter...")
+            keep = keep & PPCircleFootprintMask(observations, sconfigs.fov.circle_radius)
+        if sconfigs.fov.fill_factor:
+            verboselog("Fill factor is set. Flagging random observations to mimic chip gaps.")
+            keep = PPSimpleSensorAreaMask(n, module_rngs, sconfigs.fov.fill_factor, keep=keep)
+
+    return keep
+
+
 def PPGetSeparation(obj_RA, obj_Dec, cen_RA, cen_Dec):
     """
     Function to calculate the distance of an object from the field centre.
 
     Parameters
     -----------
-    obj_RA : float
+    obj_RA : float or array of floats
         RA of object in decimal degrees.
 
-    obj_Dec: float
+    obj_Dec: float or array of floats
         Dec of object in decimal degrees.
 
-    cen_RA : float
+    cen_RA : float or array of floats
         RA of field centre in decimal degrees.
 
-    cen_Dec : float
+    cen_Dec : float or array of floats
         Dec of field centre in decimal degrees.
 
     Returns
     -----------
-    sep_degree : float
+    sep_degree : float or array of floats
         The separation of the object from the centre of the field, in decimal
         degrees.
 
     """
 
-    obj_coord = SkyCoord(ra=obj_RA, dec=obj_Dec, unit="deg")
-    cen_coord = SkyCoord(ra=cen_RA, dec=cen_Dec, unit="deg")
+    # Vincenty formula, as used by astropy for SkyCoord separations, which is accurate
+    # at all angles
+    obj_RA, obj_Dec, cen_RA, cen_Dec = map(np.radians, (obj_RA, obj_Dec, cen_RA, cen_Dec))
+
+    sin_dRA = np.sin(cen_RA - obj_RA)
+    cos_dRA = np.cos(cen_RA - obj_RA)
+    sin_obj_Dec, cos_obj_Dec = np.sin(obj_Dec), np.cos(obj_Dec)
+    sin_cen_Dec, cos_cen_Dec = np.sin(cen_Dec), np.cos(cen_Dec)
 
-    sep = obj_coord.separation(cen_coord)
+    num1 = cos_cen_Dec * sin_dRA
+    num2 = cos_obj_Dec * sin_cen_Dec - sin_obj_Dec * cos_cen_Dec * cos_dRA
+    denominator = sin_obj_Dec * sin_cen_Dec + cos_obj_Dec * cos_cen_Dec * cos_dRA
 
-    return sep.degree
+    return np.degrees(np.arctan2(np.hypot(num1, num2), denominator))
 
 
 def PPCircleFootprint(observations, circle_radius):
@@ -122,21 +198,40 @@ def PPCircleFootprint(observations, circle_radius):
 
     """
 
-    data_coords = SkyCoord(ra=observations["RA_deg"].values, dec=observations["Dec_deg"].values, unit="deg")
+    new_observations = observations[PPCircleFootprintMask(observations, circle_radius)]
+    new_observations = new_observations.reset_index(drop=True)
 
-    field_coords = SkyCoord(
-        ra=observations["fieldRA_deg"].values, dec=observations["fieldDec_deg"].values, unit="deg"
-    )
+    return new_observations
 
-    separations = data_coords.separation(field_coords).degree
-    observations["object_separation"] = separations
 
-    new_observations = observations[observations["object_separation"] < circle_radius]
+def PPCircleFootprintMask(observations, circle_radius):
+    """
+    Returns which observations lie inside a circle of given radius centred
+    on the field centre, without removing any rows. Used by PPCircleFootprint.
 
-    new_observations.reset_index(drop=True, inplace=True)
-    new_observations = new_observations.drop("object_separation", axis=1)
+    Parameters
+    -----------
+    observations : Pandas dataframe
+        dataframe of observations.
 
-    return new_observations
+    circle_radius : float
+        radius of circle footprint in degrees.
+
+    Returns
+    ----------
+    keep : numpy array of booleans
+        True for the observations within the circle radius.
+
+    """
+
+    separations = PPGetSeparation(
+        observations["RA_deg"].to_numpy(dtype=float),
+        observations["Dec_deg"].to_numpy(dtype=float),
+        observations["fieldRA_deg"].to_numpy(dtype=float),
+        observations["fieldDec_deg"].to_numpy(dtype=float),
+    )
+
+    return separations < circle_radius
 
 
 def PPSimpleSensorArea(ephemsdf, module_rngs, fillfactor=0.9):
@@ -162,17 +257,48 @@ def PPSimpleSensorArea(ephemsdf, module_rngs, fillfactor=0.9):
         Dataframe of observations with 1- fillfactor fraction of objects
         removed per on-sky observation pointing.
 
+    """
+    ephemsOut = ephemsdf[PPSimpleSensorAreaMask(len(ephemsdf), module_rngs, fillfactor)]
+    ephemsOut = ephemsOut.reset_index(drop=True)
+
+    return ephemsOut
+
+
+def PPSimpleSensorAreaMask(n, module_rngs, fillfactor=0.9, keep=None):
+    """
+    Randomly flags a number of observations proportional to the fraction of
+    the field not covered by the detector, without removing any rows. Random
+    numbers are only drawn for the observations already kept, in order, so the
+    flagged observations are the same as those removed by PPSimpleSensorArea.
+
+    Parameters
+    -----------
+    n : int
+        Number of observations.
+
+    module_rngs : PerModuleRNG
+        A collection of random number generators (per module).
+
+    fillfactor : float
+        fraction of FOV covered by the sensor.
+        Default = 0.9
+
+    keep : numpy array of booleans, optional
+        The observations kept by the previous filters. Default = None (all observations)
+
+    Returns
+    ----------
+    on_sensor : numpy array of booleans
+        True for the observations that are kept and land on the sensor.
+
     """
     # Set the module specific seed as an offset from the base seed.
     rng = module_rngs.getModuleRNG(__name__)
 
-    n = len(ephemsdf)
+    if keep is None:
+        keep = np.ones(n, dtype=bool)
 
-    randomNum = rng.random(n)
-    fillArray = np.zeros(n) + fillfactor
-    dropObs = np.where(randomNum > fillArray)[0]
+    on_sensor = np.zeros(n, dtype=bool)
+    on_sensor[keep] = rng.random(np.count_nonzero(keep)) <= fillfactor
 
-    ephemsOut = ephemsdf.drop(dropObs)
-    ephemsOut = ephemsOut.reset_index(drop=True)
-
-    return ephemsOut
+    return on_sensor
@@ -0,0 +1,111 @@
+import logging
+import numpy as np
+
+from sorcha.modules.PPApplyFOVFilter import PPApplyFOVMask
+from sorcha.modules.PPBrightLimit import PPBrightLimitMask
+from sorcha.modules.PPFadingFunctionFilter import PPFadingFunctionMask
+from sorcha.modules.PPMagnitudeLimit import PPMagnitudeLimitMask
+from sorcha.modules.PPSNRLimit import PPSNRLimitMask
+
+
+def PPApplyFilterMasks(observations, sconfigs, module_rngs, footprint=None, verbose=False):
+    """
+    Applies the field-of-view, SNR limit, magnitude limit, fading function and
+    bright limit filters, in that order, as a running mask of the observations
+    that are kept. The observations that survive are copied once at the end,
+    instead of once per filter. The result is the same as applying PPApplyFOVFilter,
+    PPSNRLimit, PPMagnitudeLimit, PPFadingFunctionFilter and PPBrightLimit one
+    after the other, including the random draws and the index: the observations
+    keep their original row labels unless one of those filters would have reset them.
+
+    Parameters
+    -----------
+    observations : Pandas dataframe
+        dataframe of observations. Columns computed by the filters (detectorID)
+        are added to it.
+
+    sconfigs : dataclass
+        Dataclass of configuration file arguments.
+
+    module_rngs : PerModuleRNG
+        A collection of random number generators (per module).
+
+    footprint : Footprint
+        A Footprint class object that represents the boundaries of the detector(s).
+        Default: None.
+
+    verbose : boolean
+        Controls whether logging in verbose mode is on or off.
+        Default: False
+
+    Returns
+    -----------
+    observations : Pandas dataframe
+        dataframe of the observations that passed all the filters.
+    """
+
+    pplogger = logging.getLogger(__name__)
+    verboselog = pplogger.info if verbose else lambda *a, **k: None
+
+    keep = np.ones(len(observations.index), dtype=bool)
+    # whether the filters applied one after the other would have reset the index
+    reset_index = False
+
+    if sconfigs.fov.camera_model != "none" and keep.any():
+        verboselog("Applying field-of-view filters...")
+        verboselog("Number of rows BEFORE applying FOV filters: " + str(np.count_nonzero(keep)))
+        keep = PPApplyFOVMask(
+            observations, sconfigs, module_rngs, footprint=footprint, keep=keep, verbose=verbose
+        )
+        verboselog("Number of rows AFTER applying FOV filters: " + str(np.count_nonzero(keep)))
+        reset_index = sconfigs.fov.camera_model == "circle" and bool(
+            sconfigs.fov.circle_radius or sconfigs.fov.fill_factor
+        )
+
+    if sconfigs.expert.snr_limit_on and keep.any():
+        verboselog(
+            "Dropping observations with signal to noise ratio less than {}...".format(
+                sconfigs.expert.snr_limit
+            )
+        )
+        verboselog("Number of rows BEFORE applying SNR limit filter: " + str(np.count_nonzero(keep)))
+        keep &= PPSNRLimitMask(observations, sconfigs.expert.snr_limit)
+        verboselog("Number of rows AFTER applying SNR limit filter: " + str(np.count_nonzero(keep)))
+        reset_index = True
+
+    if sconfigs.expert.mag_limit_on and keep.any():
+        verboselog("Dropping detections fainter than user-defined magnitude limit... ")
+        verboselog("Number of rows BEFORE applying mag limit filter: " + str(np.count_nonzero(keep)))
+        keep &= PPMagnitudeLimitMask(observations, sconfigs.expert.mag_limit)
+        verboselog("Number of rows AFTER applying mag limit filter: " + str(np.count_nonzero(keep)))
+        reset_index = True
+
+    if sconfigs.fadingfunction.fading_function_on and keep.any():
+        verboselog("Applying detection efficiency fading function...")
+        verboselog("Number of rows BEFORE applying fading function: " + str(np.count_nonzero(keep)))
+        keep = PPFadingFunctionMask(
+            observations,
+            sconfigs.fadingfunction.fading_function_peak_efficiency,
+            sconfigs.fadingfunction.fading_function_width,
+            module_rngs,
+            keep=keep,
+            verbose=verbose,
+        )
+        verboselog("Number of rows AFTER applying fading function: " + str(np.count_nonzero(keep)))
+        reset_index = True
+
+    if sconfigs.saturation.bright_limit_on and keep.any():
+        verboselog("Dropping observations that are too bright...")
+        verboselog("Number of rows BEFORE applying bright limit filter " + str(np.count_nonzero(keep)))
+        keep &= PPBrightLimitMask(
+            observations, sconfigs.filters.observing_filters, sconfigs.saturation.bright_limit
+        )
+        verboselog("Number of rows AFTER applying bright limit filter " + str(np.count_nonzero(keep)))
+        reset_index = True
+
+    observations = observations[keep]
+    if reset_index:
+        return observations.reset_index(drop=True)
+    if sconfigs.fov.camera_model == "footprint":
+        return observations.sort_index()
+    return observations
@@ -1,6 +1,8 @@
 import logging
 import sys
 
+import numpy as np
+
 
 def PPBrightLimit(observations, observing_filters, bright_limit):
     """
@@ -28,27 +30,49 @@ def PPBrightLimit(observations, observing_filters, bright_limit):
 
     """
 
+    observations_out = observations[PPBrightLimitMask(observations, observing_filters, bright_limit)]
+    observations_out.reset_index(drop=True, inplace=True)
+
+    return observations_out
+
+
+def PPBrightLimitMask(observations, observing_filters, bright_limit):
+    """
+    Returns which observations are fainter than the user-defined saturation
+    limit, without removing any rows. Used by PPBrightLimit.
+
+    Parameters
+    -----------
+    observations : Pandas dataframe
+        Dataframe of observations.
+
+    observing_filters : list of strings
+        Observing filters present in the data.
+
+    bright_limit : float or list of floats
+        Saturation limits: either single value applied to all filters or a list of values for each filter.
+
+    Returns
+    ----------
+    keep : numpy array of booleans
+        False for the observations brighter than the bright_limit for their filter.
+
+    """
+
+    psf_mag = observations["PSFMag"].to_numpy()
+
     if type(bright_limit) is float:
-        observations_out = observations.drop(observations[observations["PSFMag"] < bright_limit].index)
+        too_bright = psf_mag < bright_limit
 
     elif type(bright_limit) is list:
-        drop_index = []
-
-        # get the index of everything brighter than its designated saturation limit in filter
+        # everything brighter than its designated saturation limit in filter
+        too_bright = np.zeros(len(psf_mag), dtype=bool)
+        opt_filter = observations["optFilter"].to_numpy()
         for i, filt in enumerate(observing_filters):
-            ind = observations[
-                (observations["optFilter"] == filt) & (observations["PSFMag"] < bright_limit[i])
-            ].index.values
-            drop_index.append(ind.tolist())
-
-        # then drop all at once (it's probably faster this way)
-        flat_index = [x for xs in drop_index for x in xs]
-        observations_out = observations.drop(flat_index)
+            too_bright |= (opt_filter == filt) & (psf_mag < bright_limit[i])
 
     else:
         logging.error("ERROR: PPBrightLimit: expected a float or list of floats for bright_limit.")
         sys.exit("ERROR: PPBrightLimit: expected a float or list of floats for bright_limit.")
 
-    observations_out.reset_index(drop=True, inplace=True)
-
-    return observations_out
+    return ~too_bright
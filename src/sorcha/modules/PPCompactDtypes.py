@@ -0,0 +1,85 @@
+import numpy as np
+
+# Columns repeated on many observations, stored as categoricals: integer codes
+# per observation, plus the distinct values once.
+COMPACT_CATEGORICAL_COLUMNS = ["ObjID", "optFilter", "FORMAT"]
+
+# Per-observation columns that are stored as float32. Positions and times
+# are kept as float64, as float32 is not precise enough for them.
+COMPACT_FLOAT32_COLUMNS = [
+    # rates
+    "RARateCosDec_deg_day",
+    "DecRate_deg_day",
+    "RangeRate_LTC_km_s",
+    # magnitudes
+    "trailedSourceMagTrue",
+    "PSFMagTrue",
+    "trailedSourceMag",
+    "PSFMag",
+    "fieldFiveSigmaDepth_mag",
+    "fiveSigmaDepth_mag",
+    # uncertainties
+    "astrometricSigma_deg",
+    "trailedSourceMagSigma",
+    "PSFMagSigma",
+    "SNR",
+    # seeing
+    "seeingFwhmGeom_arcsec",
+    "seeingFwhmEff_arcsec",
+]
+
+
+def PPCompactDtypes(observations):
+    """
+    Converts the columns of the observations to compact types to reduce their memory
+    use: the object IDs, filters and orbit formats become categoricals, and the rates,
+    magnitudes, uncertainties and seeing become float32. Columns that do not exist
+    yet, or have already been converted, are skipped, so it can be called again
+    after new columns are added. Modifies the dataframe in place.
+
+    Parameters
+    -----------
+    observations : pandas dataframe
+        Dataframe of observations.
+
+    Returns
+    -----------
+    observations : pandas dataframe
+        The observations, with compact column types.
+    """
+
+    for column in COMPACT_CATEGORICAL_COLUMNS:
+        if column in observations.columns and observations[column].dtype != "category":
+            observations[column] = observations[column].astype("category")
+
+    for column in COMPACT_FLOAT32_COLUMNS:
+        if column in observations.columns and observations[column].dtype == np.float64:
+            observations[column] = observations[column].astype(np.float32)
+
+    return observations
+
+
+def PPExpandCompactDtypes(observations):
+    """
+    Converts the object IDs and orbit formats of observations compacted by
+    PPCompactDtypes back to their original type, as their categories differ from
+    one chunk to the next and the output files need the same column types for all
+    chunks. The filters are left as categoricals, as read from the pointing database,
+    and the float32 columns are written out as they are. Modifies the dataframe in place.
+
+    Parameters
+    -----------
+    observations : pandas dataframe
+        Dataframe of observations.
+
+    Returns
+    -----------
+    observations : pandas dataframe
+        The observations, with the object IDs and orbit formats expanded.
+    """
+
+    for column in ["ObjID", "FORMAT"]:
+        if column in observations.columns and observations[column].dtype == "category":
+            observations[column] = observations[column].astype(observations[column].cat.categories.dtype)
+
+    return observations
@@ -1,3 +1,5 @@
+import numpy as np
+
 from sorcha.utilities.sorchaModuleRNG import PerModuleRNG
 
 
@@ -22,13 +24,44 @@ def PPDropObservations(observations, module_rngs, probability="detection probabi
     out : Pandas dataframe
         New dataframe of 'observations' modified to remove observations that could not be observed.
 
+    """
+    out = observations[PPDropObservationsMask(observations[probability].to_numpy(), module_rngs)]
+
+    return out
+
+
+def PPDropObservationsMask(detection_probability, module_rngs, keep=None):
+    """
+    Returns which observations are detected, i.e. have a probabilty of detection
+    greater than or equal to a sample drawn from a uniform distribution. Samples
+    are only drawn for the observations already kept, in order, so the detected
+    observations are the same as those kept by PPDropObservations.
+
+    Parameters
+    -----------
+    detection_probability : numpy array of floats
+        The probability of detection of each observation.
+
+    module_rngs : PerModuleRNG
+        A collection of random number generators (per module).
+
+    keep : numpy array of booleans, optional
+        The observations kept by the previous filters. Default = None (all observations)
+
+    Returns
+    ----------
+    detected : numpy array of booleans
+        True for the observations that are kept and detected.
+
     """
     # Set the module specific seed as an offset from the base seed.
     rng = module_rngs.getModuleRNG(__name__)
 
-    num_obs = len(observations.index)
+    if keep is None:
+        keep = np.ones(len(detection_probability), dtype=bool)
 
-    uniform_distr = rng.random(num_obs)
-    out = observations[observations[probability] >= uniform_distr]
+    detected = np.zeros(len(detection_probability), dtype=bool)
+    uniform_distr = rng.random(np.count_nonzero(keep))
+    detected[keep] = detection_probability[keep] >= uniform_distr
 
-    return out
+    return detected
@@ -1,7 +1,9 @@
 import logging
 
+import numpy as np
+
 from ..utilities.sorchaModuleRNG import PerModuleRNG
-from .PPDropObservations import PPDropObservations
+from .PPDropObservations import PPDropObservations, PPDropObservationsMask
 from .PPDetectionProbability import PPDetectionProbability
 
 
@@ -46,3 +48,42 @@ def PPFadingFunctionFilter(observations, fillfactor, width, module_rngs, verbose
     observations_drop.reset_index(drop=True, inplace=True)
 
     return observations_drop
+
+
+def PPFadingFunctionMask(observations, fillfactor, width, module_rngs, keep=None, verbose=False):
+    """
+    Returns which observations are detected according to the detection efficiency
+    fading function, without removing any rows. The random draws are the same as
+    those of PPFadingFunctionFilter applied to the observations already kept.
+
+    Parameters
+    -----------
+    observations : Pandas dataframe
+        Dataframe of observations.
+
+    fillFactor : float
+        Fraction of camera field-of-view covered by detectors
+
+    module_rngs : PerModuleRNG
+        A collection of random number generators (per module).
+
+    keep : numpy array of booleans, optional
+        The observations kept by the previous filters. Default = None (all observations)
+
+    verbose : boolean, optional
+        Verbose logging flag. Default = False
+
+    Returns
+    ----------
+    detected : numpy array of booleans
+        True for the observations that are kept and detected.
+    """
+
+    pplogger = logging.getLogger(__name__)
+    verboselog = pplogger.info if verbose else lambda *a, **k: None
+
+    verboselog("Calculating probabilities of detections...")
+    detection_probability = PPDetectionProbability(observations, fillFactor=fillfactor, w=width)
+
+    verboselog("Flagging observations below detection threshold...")
+    return PPDropObservationsMask(np.asarray(detection_probability), module_rngs, keep=keep)
@@ -236,17 +236,8 @@ class Detector:
             logger.error(f"ERROR: Detector.ison invalid array {point.shape}")
             sys.exit(f"ERROR: Detector.ison invalid array {point.shape}")
 
-        # check whether point is in circle bounding the detector
-        r2 = np.max((self.x - self.centerx) ** 2 + (self.y - self.centery) ** 2)
-        selectedidx = np.where((point[0] - self.centerx) ** 2 + (point[1] - self.centery) ** 2 <= r2)[0]
-
-        # check whether selected fall on the detector
-        # compare true area to the segmented area
-        selectedidx = selectedidx[np.abs(self.segmentedArea(point[:, selectedidx]) - self.trueArea()) <= ϵ]
-
-        # If there is a threshold to the edge, further filter selectedidx.
-        if edge_thresh is not None and len(selectedidx) > 0:
-            # Convert edge threshold to the same units as the detector.
+        # If there is a threshold to the edge, convert it to the same units as the detector.
+        if edge_thresh is not None:
             if self.units == "degrees" or self.units == "deg":
                 edge_thresh = edge_thresh / 3600.0
             elif self.units == "radians" or self.units == "rad":
@@ -255,16 +246,22 @@ class Detector:
                 logger.error(f"ERROR: Detector.ison unable to convert edge_thresh to {self.units}")
                 sys.exit(f"ERROR: Detector.ison unable to convert edge_thresh to {self.units}")
 
-            n = len(self.x)
-            for i in range(n):  # test each edge
-                dist_to_edge = distToSegment(
-                    point[:, selectedidx],
-                    self.x[i],
-                    self.y[i],
-                    self.x[(i + 1) % n],
-                    self.y[(i + 1) % n],
-                )
-                selectedidx = selectedidx[dist_to_edge > edge_thresh]
+        # check whether the points are in the circle bounding the detector, whether they
+        # fall on the detector (comparing the true area to the segmented area) and whether
+        # they are far enough from its edges, in a single pass over the points
+        r2 = np.max((self.x - self.centerx) ** 2 + (self.y - self.centery) ** 2)
+        selectedidx = _ison_kernel(
+            np.ascontiguousarray(point[0], dtype=float),
+            np.ascontiguousarray(point[1], dtype=float),
+            np.ascontiguousarray(self.x, dtype=float),
+            np.ascontiguousarray(self.y, dtype=float),
+            self.centerx,
+            self.centery,
+            r2,
+            self.trueArea(),
+            ϵ,
+            -1.0 if edge_thresh is None else edge_thresh,
+        )
 
         if plot:
             x = point[0][selectedidx]
@@ -481,6 +478,194 @@ class Detector:
             plt.annotate(str(detector.ID), (detector.centerx, detector.centery))
 
 
+# ==============================================================================
+# compiled footprint test
+# ==============================================================================
+
+
+@njit(cache=True)
+def _on_detector(px, py, xs, ys, ncorners, centerx, centery, r2, true_area, epsilon, edge_thresh):
+    """
+    Tests whether a point falls on a detector, with the same criteria and in the same
+    floating-point order as Detector.ison: inside the circle bounding the detector,
+    segmented area equal to the true area, and further than edge_thresh from all the
+    edges (if edge_thresh >= 0).
+
+    Parameters
+    -----------
+    px, py : float
+        Coordinates of the point on the focal plane.
+
+    xs, ys : array
+        Corners of the detector, sorted by angle.
+
+    ncorners : int
+        Number of corners of the detector (the first ncorners entries of xs and ys).
+
+    centerx, centery : float
+        Centroid of the detector.
+
+    r2 : float
+        Squared radius of the circle bounding the detector.
+
+    true_area : float
+        Area of the detector (Detector.trueArea).
+
+    epsilon : float
+        Threshold on the difference between the segmented and true areas.
+
+    edge_thresh : float
+        Minimum distance to the edges, in the units of the detector. Negative to keep
+        points anywhere on the detector.
+
+    Returns
+    ----------
+    : boolean
+        Whether the point falls on the detector.
+    """
+    if (px - centerx) ** 2 + (py - centery) ** 2 > r2:
+        return False
+
+    area = 0.0
+    for k in range(ncorners):
+        x = xs[k] - px
+        y = ys[k] - py
+        xrolled = xs[k - 1 if k > 0 else ncorners - 1] - px
+        yrolled = ys[k - 1 if k > 0 else ncorners - 1] - py
+        area += np.abs(x * yrolled - y * xrolled)
+    if not np.abs(0.5 * area - true_area) <= epsilon:
+        return False
+
+    if edge_thresh >= 0:
+        for k in range(ncorners):
+            x0, y0 = xs[k], ys[k]
+            x1, y1 = xs[(k + 1) % ncorners], ys[(k + 1) % ncorners]
+            len_sq = (x1 - x0) * (x1 - x0) + (y1 - y0) * (y1 - y0)
+            if len_sq == 0.0:
+                proj_x, proj_y = x0, y0
+            else:
+                t = ((px - x0) * (x1 - x0) + (py - y0) * (y1 - y0)) / len_sq
+                t = min(max(t, 0.0), 1.0)
+                proj_x = x0 + (x1 - x0) * t
+                proj_y = y0 + (y1 - y0) * t
+            if not np.sqrt((px - proj_x) * (px - proj_x) + (py - proj_y) * (py - proj_y)) > edge_thresh:
+                return False
+
+    return True
+
+
+@njit(cache=True)
+def _ison_kernel(points_x, points_y, xs, ys, centerx, centery, r2, true_area, epsilon, edge_thresh):
+    """
+    Tests a set of points against a single detector (see _on_detector).
+
+    Returns
+    ----------
+    selectedidx : array of ints
+        Indices of the points which fall on the detector.
+    """
+    selected = np.empty(len(points_x), dtype=np.int64)
+    k = 0
+    for i in range(len(points_x)):
+        if _on_detector(
+            points_x[i], points_y[i], xs, ys, len(xs), centerx, centery, r2, true_area, epsilon, edge_thresh
+        ):
+            selected[k] = i
+            k += 1
+    return selected[:k]
+
+
+@njit(cache=True)
+def _footprint_kernel(
+    points_x,
+    points_y,
+    grid_x0,
+    grid_y0,
+    cell_size,
+    nx,
+    ny,
+    cell_start,
+    cell_detectors,
+    corners_x,
+    corners_y,
+    ncorners,
+    centerx,
+    centery,
+    r2,
+    true_area,
+    epsilon,
+    edge_thresh,
+):
+    """
+    Tests a set of points against the detectors whose bounding boxes overlap the cell of
+    a uniform grid of the focal plane holding each point.
+
+    Returns
+    ----------
+    detected : array of ints
+        Indices of the points which fall on a detector.
+
+    detector_index : array of ints
+        Index of the detector of each entry of detected.
+    """
+    n = len(points_x)
+    matches = np.zeros(n, dtype=np.int64)
+    cells = np.full(n, -1, dtype=np.int64)
+
+    for i in range(n):
+        px, py = points_x[i], points_y[i]
+        cx = (px - grid_x0) / cell_size
+        cy = (py - grid_y0) / cell_size
+        if not (cx >= 0 and cx < nx and cy >= 0 and cy < ny):
+            continue
+        cell = int(cx) * ny + int(cy)
+        cells[i] = cell
+        for j in range(cell_start[cell], cell_start[cell + 1]):
+            d = cell_detectors[j]
+            if _on_detector(
+                px,
+                py,
+                corners_x[d],
+                corners_y[d],
+                ncorners[d],
+                centerx[d],
+                centery[d],
+                r2[d],
+                true_area[d],
+                epsilon,
+                edge_thresh[d],
+            ):
+                matches[i] += 1
+
+    detected = np.empty(matches.sum(), dtype=np.int64)
+    detector_index = np.empty(matches.sum(), dtype=np.int64)
+    k = 0
+    for i in range(n):
+        if matches[i] == 0:
+            continue
+        cell = cells[i]
+        for j in range(cell_start[cell], cell_start[cell + 1]):
+            d = cell_detectors[j]
+            if _on_detector(
+                points_x[i],
+                points_y[i],
+                corners_x[d],
+                corners_y[d],
+                ncorners[d],
+                centerx[d],
+                centery[d],
+                r2[d],
+                true_area[d],
+                epsilon,
+                edge_thresh[d],
+            ):
+                detected[k] = i
+                detector_index[k] = d
+                k += 1
+
+    return detected, detector_index
+
+
 # ==============================================================================
 # camera class
 # ==============================================================================
@@ -558,6 +743,66 @@ class Footprint:
         for i in range(self.N):
             self.detectors[i].sortCorners()
 
+        self._build_grid()
+
+    def _build_grid(self):
+        """
+        Tabulates the geometry of the detectors, and indexes them on a uniform grid
+        of the focal plane: each cell lists the detectors whose bounding circles
+        overlap it, so that each point is only tested against those detectors.
+
+        Parameters
+        -----------
+        None.
+
+        Returns
+        ----------
+        None.
+
+        """
+        ncorners = np.array([len(detector.x) for detector in self.detectors], dtype=np.int64)
+        self._corners_x = np.zeros((self.N, ncorners.max()))
+        self._corners_y = np.zeros((self.N, ncorners.max()))
+        for i, detector in enumerate(self.detectors):
+            self._corners_x[i, : ncorners[i]] = detector.x
+            self._corners_y[i, : ncorners[i]] = detector.y
+        self._ncorners = ncorners
+        self._centerx = np.array([detector.centerx for detector in self.detectors])
+        self._centery = np.array([detector.centery for detector in self.detectors])
+        self._r2 = np.array(
+            [
+                np.max((detector.x - detector.centerx) ** 2 + (detector.y - detector.centery) ** 2)
+                for detector in self.detectors
+            ]
+        )
+        self._true_area = np.array([detector.trueArea() for detector in self.detectors])
+
+        # bounding boxes of the bounding circles, slightly padded against rounding
+        radius = np.sqrt(self._r2) * (1 + 1e-9)
+        xmin, xmax = self._centerx - radius, self._centerx + radius
+        ymin, ymax = self._centery - radius, self._centery + radius
+
+        # cells about half the size of a detector
+        self._cell_size = np.median(radius)
+        self._grid_x0, self._grid_y0 = xmin.min(), ymin.min()
+        self._nx = int((xmax.max() - self._grid_x0) / self._cell_size) + 1
+        self._ny = int((ymax.max() - self._grid_y0) / self._cell_size) + 1
+
+        cells = [[] for _ in range(self._nx * self._ny)]
+        for i in range(self.N):
+            for cx in range(
+                int((xmin[i] - self._grid_x0) / self._cell_size),
+                min(int((xmax[i] - self._grid_x0) / self._cell_size) + 1, self._nx),
+            ):
+                for cy in range(
+                    int((ymin[i] - self._grid_y0) / self._cell_size),
+                    min(int((ymax[i] - self._grid_y0) / self._cell_size) + 1, self._ny),
+                ):
+                    cells[cx * self._ny + cy].append(i)
+
+        self._cell_start = np.concatenate([[0], np.cumsum([len(cell) for cell in cells])]).astype(np.int64)
+        self._cell_detectors = np.array([i for cell in cells for i in cell], dtype=np.int64)
+
     def plot(self, theta=0.0, color="gray", units="rad", annotate=False):
         """
         Plots the footprint. Currently not on the focal plane, just the sky
@@ -658,15 +903,62 @@ class Footprint:
         # x, y = radec_to_focal_plane(ra, dec, fieldra, fielddec, rotSkyPos)
         # points = np.array((x, y))
 
-        # check whether they land on any of the detectors
-        detected = []
-        detectorId = []
-        i = 0
-        for detector in self.detectors:
-            stuff = detector.ison(points, edge_thresh=edge_thresh)
-            detected.append(stuff)
-            # detectorId.append([detector.ID] * len(stuff))
-            detectorId.append([i] * len(stuff))
-            i += 1
-
-        return np.concatenate(detected), np.concatenate(detectorId)
+        # check whether they land on any of the detectors, testing each point only
+        # against the detectors indexed in its cell of the focal plane grid
+        if edge_thresh is None:
+            edge_thresh_det = np.full(self.N, -1.0)
+        else:
+            edge_thresh_det = np.array(
+                [self._edge_thresh_units(detector, edge_thresh) for detector in self.detectors]
+            )
+
+        detected, detectorId = _footprint_kernel(
+            np.ascontiguousarray(points[0], dtype=float),
+            np.ascontiguousarray(points[1], dtype=float),
+            self._grid_x0,
+            self._grid_y0,
+            self._cell_size,
+            self._nx,
+            self._ny,
+            self._cell_start,
+            self._cell_detectors,
+            self._corners_x,
+            self._corners_y,
+            self._ncorners,
+            self._centerx,
+            self._centery,
+            self._r2,
+            self._true_area,
+            10.0 ** (-11),
+            edge_thresh_det,
+        )
+
+        # grouped by detector, as the detections would be by testing one detector after the other
+        order = np.lexsort((detected, detectorId))
+        return detected[order], detectorId[order].astype(float)
+
+    @staticmethod
+    def _edge_thresh_units(detector, edge_thresh):
+        """
+        Converts an edge threshold in arcseconds to the units of a detector.
+
+        Parameters
+        -----------
+        detector : Detector
+            The detector.
+
+        edge_thresh : float
+            The edge threshold, in arcseconds.
+
+        Returns
+        ----------
+        : float
+            The edge threshold, in the units of the detector.
+
+        """
+        if detector.units == "degrees" or detector.units == "deg":
+            return edge_thresh / 3600.0
+        elif detector.units == "radians" or detector.units == "rad":
+            return np.radians(edge_thresh / 3600.0)
+        logger.error(f"ERROR: Footprint.applyFootprint unable to convert edge_thresh to {detector.units}")
+        sys.exit(f"ERROR: Footprint.applyFootprint unable to convert edge_thresh to {detector.units}")
@@ -1,5 +1,6 @@
 import sys
 import logging
+import pyarrow.parquet as pq
 
 
 def PPGetMainFilterAndColourOffsets(filename, observing_filters, filesep):
@@ -18,8 +19,8 @@ def PPGetMainFilterAndColourOffsets(filename, observing_filters, filesep):
         The observation filters requested in the configuration file.
 
     filesep : string
-        The format of the physical parameters file. Should be "csv"/"comma"
-        or "whitespace".
+        The format of the physical parameters file. Should be "csv"/"comma",
+        "whitespace" or "parquet".
 
     Returns
     ----------
@@ -39,8 +40,12 @@ def PPGetMainFilterAndColourOffsets(filename, observing_filters, filesep):
 
     pplogger = logging.getLogger(__name__)
 
-    with open(filename) as f:
-        first_line = f.readline()
+    if filesep == "parquet":
+        # the column names of a Parquet file are read from its schema
+        first_line = ",".join(pq.read_schema(filename).names) + "\n"
+    else:
+        with open(filename) as f:
+            first_line = f.readline()
 
     H_loc = first_line.find("H_")
 
@@ -81,7 +86,7 @@ def PPGetMainFilterAndColourOffsets(filename, observing_filters, filesep):
     # check that the columns match up with the othercolours calculated from observing_filters config variable
     if filesep == "whitespace":
         split_line = first_line[:-1].split()
-    elif filesep == "comma" or filesep == "csv":
+    elif filesep == "comma" or filesep == "csv" or filesep == "parquet":
         split_line = first_line[:-1].split(",")
     else:
         err_str = f"ERROR: PPGetMainFilterAndColourOffsets: unexpected value for auxFormat keyword in configs: {filesep}"
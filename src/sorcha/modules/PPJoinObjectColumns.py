@@ -0,0 +1,88 @@
+from sorcha.activity.activity_registration import CA_METHODS
+from sorcha.lightcurves.lightcurve_registration import LC_METHODS
+
+# The columns of the orbits files, other than the object ID, in any of the
+# orbit formats.
+ORBIT_COLUMNS = [
+    "FORMAT",
+    "q",
+    "a",
+    "e",
+    "inc",
+    "node",
+    "argPeri",
+    "t_p_MJD_TDB",
+    "ma",
+    "x",
+    "y",
+    "z",
+    "xdot",
+    "ydot",
+    "zdot",
+    "epochMJD_TDB",
+]
+
+
+def PPDeferredObjectColumns(object_columns, sconfigs):
+    """
+    Selects the per-object columns that none of the post-processing steps read,
+    i.e. the orbital elements not required by the light curve or activity model.
+    Instead of being copied onto every observation of an object, they can be
+    looked up by PPJoinObjectColumns once the observations are filtered, or
+    not at all if they are not written out. Nothing is deferred if all the
+    columns are written out, so that they keep their order in the output.
+
+    Parameters
+    -----------
+    object_columns : list of strings
+        The columns of the table of objects (orbits and physical parameters).
+
+    sconfigs : dataclass
+        Dataclass of configuration file arguments.
+
+    Returns
+    -----------
+    deferred_columns : list of strings
+        The columns that do not need to be joined onto the observations.
+    """
+
+    if sconfigs.output.output_columns == "all":
+        return []
+
+    required_columns = []
+    if sconfigs.lightcurve.lc_model and LC_METHODS.get(sconfigs.lightcurve.lc_model, False):
+        required_columns += LC_METHODS[sconfigs.lightcurve.lc_model]().required_column_names
+    if sconfigs.activity.comet_activity and CA_METHODS.get(sconfigs.activity.comet_activity, False):
+        required_columns += CA_METHODS[sconfigs.activity.comet_activity]().required_column_names
+
+    return [column for column in object_columns if column in ORBIT_COLUMNS and column not in required_columns]
+
+
+def PPJoinObjectColumns(observations, objects_df, columns):
+    """
+    Copies per-object columns onto the observations, by looking them up with the
+    object_index column of the observations (the row of each object in objects_df),
+    which is then removed. Modifies the observations dataframe in place.
+
+    Parameters
+    -----------
+    observations : pandas dataframe
+        Dataframe of observations, with an object_index column.
+
+    objects_df : pandas dataframe
+        Table of objects.
+
+    columns : list of strings
+        The columns of objects_df to copy onto the observations.
+
+    Returns
+    -----------
+    observations : pandas dataframe
+        The observations, with the columns added.
+    """
+
+    object_index = observations["object_index"].to_numpy()
+    for column in columns:
+        observations[column] = objects_df[column].array.take(object_index)
+
+    return observations.drop(columns="object_index")
@@ -22,7 +22,33 @@ def PPMagnitudeLimit(observations, mag_limit, colname="trailedSourceMag"):
 
     """
 
-    observations = observations[observations[colname] < mag_limit]
+    observations = observations[PPMagnitudeLimitMask(observations, mag_limit, colname)]
     observations.reset_index(drop=True, inplace=True)
 
     return observations
+
+
+def PPMagnitudeLimitMask(observations, mag_limit, colname="trailedSourceMag"):
+    """
+    Returns which observations pass a straight cut on apparent magnitude,
+    without removing any rows. Used by PPMagnitudeLimit.
+
+    Parameters
+    -----------
+    observations : pandas dataframe
+        Dataframe of observations. Must have the colname column.
+
+    mag_limit : float
+        Limit for apparent magnitude cut.
+
+    colname : string, optional
+        Column thats used to apply the magnitude cut.
+        Default = "TrailedSourceMag"
+    Returns
+    -----------
+    keep : numpy array of booleans
+        True for the observations brighter than the limit.
+
+    """
+
+    return observations[colname].to_numpy() < mag_limit
@@ -4,11 +4,17 @@ import os
 import sys
 import sqlite3
 import logging
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # this is for suppressing a warning in PyTables when writing to HDF5
 import warnings
 from tables import NaturalNameWarning
 
+# the Parquet writers open during the run, by output file. Each chunk is appended to
+# its file as a row group, and the files are finalized by PPCloseParquetWriters.
+_parquet_writers = {}
+
 
 def PPOutWriteCSV(padain, outf, separator=","):
     """
@@ -74,9 +80,226 @@ def PPOutWriteHDF5(pp_results, outf, keyname="sorcha_results"):
     return
 
 
+def PPOutWriteParquet(pp_results, outf, compression="snappy"):
+    """
+    Appends a pandas dataframe to a Parquet file at a location given by the user,
+    as a new row group. The file is kept open between calls and must be closed with
+    PPCloseParquetWriters once all the chunks are written.
+
+    Parameters
+    -----------
+    pp_results : pandas dataframe
+        Dataframe of output.
+
+    outf : string
+        Location to which file should be written.
+
+    compression : string
+        Compression codec of the file ("snappy", "zstd", "gzip", "brotli", "lz4" or "none").
+        Default is "snappy".
+
+    Returns
+    -----------
+    None.
+
+    """
+
+    pp_results = pp_results.astype({"ObjID": str})
+
+    writer = _parquet_writers.get(outf)
+    if writer is None:
+        table = pa.Table.from_pandas(pp_results, preserve_index=False)
+        # the object IDs and filters repeat over many rows, so they are dictionary-encoded
+        writer = pq.ParquetWriter(
+            outf,
+            table.schema,
+            compression=None if compression == "none" else compression,
+            use_dictionary=[column for column in ["ObjID", "optFilter"] if column in table.column_names],
+        )
+        _parquet_writers[outf] = writer
+    else:
+        # later chunks are cast to the schema of the first one
+        table = pa.Table.from_pandas(pp_results, schema=writer.schema, preserve_index=False)
+
+    try:
+        writer.write_table(table, row_group_size=max(len(table), 1))
+    except BaseException:
+        # a failed write leaves the file unusable, so its writer is not kept for later chunks
+        PPCloseParquetWriters(outf)
+        raise
+
+    return
+
+
+def PPCloseParquetWriters(outf=None):
+    """
+    Finalizes the Parquet files written by PPOutWriteParquet.
+
+    Parameters
+    -----------
+    outf : string, optional
+        Location of the file to finalize. If None, all the open files are finalized.
+        Default is None.
+
+    Returns
+    -----------
+    None.
+
+    """
+
+    outfs = list(_parquet_writers) if outf is None else [outf]
+    for outf in outfs:
+        writer = _parquet_writers.pop(outf, None)
+        if writer is not None:
+            writer.close()
+
+
+class PPSqlite3Writer:
+    """
+    Writes the output of a run to a SQLite database through a single connection,
+    kept open for the whole run.
+
+    The database is loaded with journal_mode=WAL and synchronous=OFF, each table is
+    created once with explicit column types, and each chunk is inserted with
+    executemany in a single transaction. The indexes are built when the writer is
+    closed, once all the rows are in.
+    """
+
+    # SQLite types of the kinds of numpy dtypes. Anything else is stored as TEXT.
+    sqlite_types = {"b": "INTEGER", "i": "INTEGER", "u": "INTEGER", "f": "REAL"}
+
+    def __init__(self, outf):
+        """
+        Parameters
+        -----------
+        outf : string
+            Location of the SQLite database.
+        """
+        self.outf = outf
+        self.cnx = sqlite3.connect(outf)
+        self.cnx.execute("PRAGMA journal_mode=WAL")
+        self.cnx.execute("PRAGMA synchronous=OFF")
+
+        # the insert statement and columns of each table written so far
+        self.tables = {}
+
+    def _prepare_table(self, pp_results, tablename):
+        """
+        Creates a table for a dataframe if the database does not have it yet, and
+        prepares the statement inserting rows into it.
+
+        Parameters
+        -----------
+        pp_results : pandas dataframe
+            Dataframe of output.
+
+        tablename: string
+            Name of the table.
+
+        Returns
+        -----------
+        None.
+        """
+        columns = [str(column) for column in pp_results.columns]
+        definitions = [
+            '"{}" {}'.format(column, self.sqlite_types.get(dtype.kind, "TEXT"))
+            for column, dtype in zip(columns, pp_results.dtypes)
+        ]
+        self.cnx.execute('CREATE TABLE IF NOT EXISTS "{}" ({})'.format(tablename, ", ".join(definitions)))
+
+        quoted_columns = ", ".join('"{}"'.format(column) for column in columns)
+        insert = 'INSERT INTO "{}" ({}) VALUES ({})'.format(
+            tablename, quoted_columns, ", ".join(["?"] * len(columns))
+        )
+        self.tables[tablename] = (insert, columns)
+
+    def write(self, pp_results, tablename="sorcha_results"):
+        """
+        Appends a dataframe to a table of the database in one transaction.
+
+        Parameters
+        -----------
+        pp_results : pandas dataframe
+            Dataframe of output.
+
+        tablename: string
+            Name of the table. Default is "sorcha_results".
+
+        Returns
+        -----------
+        None.
+        """
+        if tablename not in self.tables:
+            self._prepare_table(pp_results, tablename)
+        insert, columns = self.tables[tablename]
+
+        # python values, with the missing values as None (NULL). SQLite stores float NaNs as NULL.
+        values = []
+        for column in columns:
+            series = pp_results[column]
+            if series.dtype.kind != "f" and series.isna().any():
+                series = series.astype(object).where(series.notna(), None)
+            values.append(series.tolist())
+
+        with self.cnx:
+            self.cnx.executemany(insert, zip(*values))
+
+    def close(self, index_columns=("ObjID", "fieldMJD_TAI", "optFilter"), tablename="sorcha_results"):
+        """
+        Builds the indexes of the table and closes the database.
+
+        Parameters
+        -----------
+        index_columns : list of strings
+            Columns to index. Default is ("ObjID", "fieldMJD_TAI", "optFilter").
+
+        tablename: string
+            Name of the table to index. Default is "sorcha_results".
+
+        Returns
+        -----------
+        None.
+        """
+        self.cnx.execute("PRAGMA synchronous=FULL")
+        with self.cnx:
+            for column in index_columns:
+                self.cnx.execute('CREATE INDEX "{}" ON "{}" ("{}")'.format(column, tablename, column))
+        self.cnx.execute("PRAGMA journal_mode=DELETE")
+        self.cnx.close()
+
+    def abort(self):
+        """
+        Closes the database without indexing it, for a run that stops before all
+        the chunks are written. The rows already committed are kept, and the
+        database is returned to the default journal mode so that no WAL file
+        is left behind.
+
+        Parameters
+        -----------
+        None.
+
+        Returns
+        -----------
+        None.
+        """
+        try:
+            if self.cnx.in_transaction:
+                self.cnx.rollback()
+            self.cnx.execute("PRAGMA synchronous=FULL")
+            self.cnx.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            self.cnx.close()
+
+
+# the SQLite writers open during the run, by output file
+_sqlite3_writers = {}
+
+
 def PPOutWriteSqlite3(pp_results, outf, tablename="sorcha_results"):
     """
-    Writes a pandas dataframe out to a CSV file at a location given by the user.
+    Appends a pandas dataframe to a SQLite database at a location given by the user.
+    The database is kept open between calls, and is closed and indexed by
+    PPIndexSQLDatabase once all the chunks are written.
 
     Parameters
     -----------
@@ -98,16 +321,17 @@ def PPOutWriteSqlite3(pp_results, outf, tablename="sorcha_results"):
 
     pp_results = pp_results.drop("level_0", axis=1, errors="ignore")
 
-    cnx = sqlite3.connect(outf)
-
-    pp_results.to_sql(tablename, con=cnx, if_exists="append", index=False)
+    if outf not in _sqlite3_writers:
+        _sqlite3_writers[outf] = PPSqlite3Writer(outf)
+    _sqlite3_writers[outf].write(pp_results, tablename)
 
     pplogger.info("SQL results saved in table {} in database {}.".format(tablename, outf))
 
 
 def PPIndexSQLDatabase(outf, tablename="sorcha_results"):
     """
-    Indexes a SQLite database of Sorcha output.
+    Indexes a SQLite database of Sorcha output, closing its writer if it
+    is still open.
 
     Parameters
     -----------
@@ -123,13 +347,31 @@ def PPIndexSQLDatabase(outf, tablename="sorcha_results"):
 
     """
 
-    cnx = sqlite3.connect(outf)
+    writer = _sqlite3_writers.pop(outf, None)
+    if writer is None:
+        writer = PPSqlite3Writer(outf)
+    writer.close(tablename=tablename)
+
+
+def PPCloseSqlite3Writers():
+    """
+    Closes the SQLite databases still open after a run stopped early,
+    without indexing them. Does nothing if PPIndexSQLDatabase has already
+    closed them.
+
+    Parameters
+    -----------
+    None.
+
+    Returns
+    -----------
+    None.
+
+    """
 
-    cur = cnx.cursor()
-    cur.execute("CREATE INDEX ObjID ON {} (ObjID)".format(tablename))
-    cur.execute("CREATE INDEX fieldMJD_TAI ON {} (fieldMJD_TAI)".format(tablename))
-    cur.execute("CREATE INDEX optFilter ON {} (optFilter)".format(tablename))
-    cnx.commit()
+    while _sqlite3_writers:
+        _, writer = _sqlite3_writers.popitem()
+        writer.abort()
 
 
 def PPWriteOutput(cmd_args, sconfigs, observations_in, verbose=False):
@@ -263,3 +505,9 @@ def PPWriteOutput(cmd_args, sconfigs, observations_in, verbose=False):
         out = os.path.join(cmd_args.outpath, cmd_args.outfilestem + outputsuffix)
         verboselog("Output to HDF5 binary file...")
         observations = PPOutWriteHDF5(observations, out)
+
+    elif sconfigs.output.output_format == "parquet":
+        outputsuffix = ".parquet"
+        out = os.path.join(cmd_args.outpath, cmd_args.outfilestem + outputsuffix)
+        verboselog("Output to Parquet file...")
+        observations = PPOutWriteParquet(observations, out, sconfigs.output.parquet_compression)
@@ -18,7 +18,30 @@ def PPSNRLimit(observations, sigma_limit=2.0):
 
     """
 
-    observations = observations[observations["SNR"] > sigma_limit]
+    observations = observations[PPSNRLimitMask(observations, sigma_limit)]
     observations.reset_index(drop=True, inplace=True)
 
     return observations
+
+
+def PPSNRLimitMask(observations, sigma_limit=2.0):
+    """
+    Returns which observations pass a straight SNR cut based on a limit,
+    without removing any rows. Used by PPSNRLimit.
+
+    Parameters
+    -----------
+    observations : pandas dataframe
+        Dataframe of observations. Must have "SNR" column.
+
+    sigma_limit : float, optional.
+        Limit for SNR cut.
+
+    Returns
+    -----------
+    keep : numpy array of booleans
+        True for the observations with SNR greater than the limit.
+
+    """
+
+    return observations["SNR"].to_numpy() > sigma_limit
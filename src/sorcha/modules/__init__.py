@@ -20,3 +20,6 @@ from . import PPFadingFunctionFilter
 from . import PPMagnitudeLimit
 from . import PPApplyColourOffsets
 from . import PPGetMainFilterAndColourOffsets
+from . import PPApplyFilterMasks
+from . import PPCompactDtypes
+from . import PPJoinObjectColumns
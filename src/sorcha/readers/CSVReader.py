@@ -1,9 +1,16 @@
+import io
+import numpy as np
+import os
 import pandas as pd
 import logging
 import sys
 
 from sorcha.readers.ObjectDataReader import ObjectDataReader
 
+# Version of the layout of the byte-offset index files (.sidx). Index files written
+# with another version are rebuilt.
+CSV_INDEX_VERSION = 1
+
 
 class CSVDataReader(ObjectDataReader):
     """A class to read in object data files stored as CSV or whitespace
@@ -12,7 +19,7 @@ class CSVDataReader(ObjectDataReader):
     Requires that the file's first column is ObjID.
     """
 
-    def __init__(self, filename, sep="csv", header=-1, **kwargs):
+    def __init__(self, filename, sep="csv", header=-1, use_index=False, **kwargs):
         """A class for reading the object data from a CSV file.
 
         Parameters
@@ -28,11 +35,19 @@ class CSVDataReader(ObjectDataReader):
             The row number of the header. If not provided, does an automatic search.
             Default = -1
 
+        use_index : boolean, optional
+            Use a byte-offset index of the rows of the file, saved next to it as
+            <filename>.sidx, to read blocks of rows and objects without parsing the
+            rest of the file. The index is built on first use, and rebuilt if the
+            file changes. Default = False
+
         **kwargs: dictionary, optional
             Extra arguments
         """
         super().__init__(**kwargs)
         self.filename = filename
+        self.use_index = use_index
+        self._index = None
 
         if sep not in ["whitespace", "csv", "comma"]:
             pplogger = logging.getLogger(__name__)
@@ -187,6 +202,11 @@ class CSVDataReader(ObjectDataReader):
         res_df : pandas dataframe
             Dataframe of the object data.
         """
+        if self.use_index:
+            n_rows = len(self._get_index()["starts"])
+            block_end = n_rows if block_size is None else min(block_start + block_size, n_rows)
+            return self._read_indexed_rows(np.arange(block_start, block_end))
+
         # Skip the rows before the header and then begin_loc rows after the header.
         skip_rows = []
         if self.header_row > 0:
@@ -212,12 +232,44 @@ class CSVDataReader(ObjectDataReader):
 
         return res_df
 
+    def _iterate_rows_internal(self, block_size=None, **kwargs):
+        """Reads the whole file in consecutive blocks of rows, in a single pass.
+
+        Parameters
+        -----------
+        block_size: integer, optional, default=None
+            The number of rows in each block.
+            Use block_size=None to read in all available data in one block.
+            default =None
+
+        **kwargs : dictionary, optional
+            Extra arguments
+
+        Yields
+        -----------
+        res_df : pandas dataframe
+            Dataframe of the object data of the block.
+        """
+        if block_size is None:
+            yield self._read_rows_internal()
+            return
+
+        if self.sep == "whitespace":
+            blocks = pd.read_csv(self.filename, sep="\\s+", header=self.header_row, chunksize=block_size)
+        else:
+            blocks = pd.read_csv(self.filename, delimiter=",", header=self.header_row, chunksize=block_size)
+
+        with blocks:
+            yield from blocks
+
     def _build_id_map(self):
         """Builds a table of just the object IDs"""
         if self.obj_id_table is not None:
             return
 
-        if self.sep == "whitespace":
+        if self.use_index:
+            self.obj_id_table = pd.DataFrame({"ObjID": self._get_index()["obj_ids"]})
+        elif self.sep == "whitespace":
             self.obj_id_table = pd.read_csv(
                 self.filename,
                 sep="\\s+",
@@ -252,6 +304,10 @@ class CSVDataReader(ObjectDataReader):
         """
         self._build_id_map()
 
+        if self.use_index:
+            rows = np.flatnonzero(self.obj_id_table["ObjID"].isin(obj_ids).values)
+            return self._read_indexed_rows(rows)
+
         # Create list of only the matching rows for these object IDs and the header row.
         skipped_row = [True] * self.header_row  # skip the pre-header
         skipped_row.extend([False])  # Keep the the column header
@@ -279,6 +335,134 @@ class CSVDataReader(ObjectDataReader):
             raise current_exc
         return res_df
 
+    def _get_index(self):
+        """Loads the byte-offset index of the rows of the file from <filename>.sidx,
+        or builds it and tries to save it there if it is missing or out of date.
+
+        Returns
+        -----------
+        index : dictionary
+            The byte range [starts[i], ends[i]) of each data row i of the file, the
+            ObjID of each row (obj_ids) and the header line (header).
+        """
+        if self._index is not None:
+            return self._index
+
+        pplogger = logging.getLogger(__name__)
+        index_path = self.filename + ".sidx"
+        stat = os.stat(self.filename)
+        file_info = np.array(
+            [CSV_INDEX_VERSION, stat.st_size, stat.st_mtime_ns, self.header_row], dtype=np.int64
+        )
+
+        if os.path.isfile(index_path):
+            try:
+                with np.load(index_path, allow_pickle=False) as data:
+                    index = {name: data[name] for name in data.files}
+                if np.array_equal(index["file_info"], file_info):
+                    pplogger.info(f"Reading the row index of {self.filename} from {index_path}")
+                    self._index = index
+                    return index
+            except (OSError, ValueError, KeyError):  # pragma: no cover
+                pass
+
+        pplogger.info(f"Building the row index of {self.filename}")
+        index = self._build_index()
+        index["file_info"] = file_info
+        try:
+            with open(index_path + ".tmp", "wb") as f:
+                np.savez(f, **index)
+            os.replace(index_path + ".tmp", index_path)
+        except OSError:  # pragma: no cover
+            pplogger.warning(f"Could not save the row index of {self.filename} to {index_path}")
+
+        self._index = index
+        return index
+
+    def _build_index(self):
+        """Finds the byte range of every data row of the file, and their ObjIDs.
+
+        Returns
+        -----------
+        index : dictionary
+            The byte range [starts[i], ends[i]) of each data row i of the file, the
+            ObjID of each row (obj_ids) and the header line (header).
+        """
+        # the end of every line, found one large block of the file at a time
+        line_ends = []
+        position = 0
+        with open(self.filename, "rb") as fh:
+            for block in iter(lambda: fh.read(2**24), b""):
+                line_ends.append(
+                    np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n")) + position + 1
+                )
+                position += len(block)
+        ends = np.concatenate(line_ends + [np.empty(0, dtype=np.int64)]).astype(np.int64)
+        if len(ends) == 0 or ends[-1] != position:
+            ends = np.append(ends, position)  # last line without a newline
+        starts = np.concatenate([[0], ends[:-1]]).astype(np.int64)
+
+        with open(self.filename, "rb") as fh:
+            fh.seek(starts[self.header_row])
+            header = fh.read(ends[self.header_row] - starts[self.header_row])
+        if not header.endswith(b"\n"):  # pragma: no cover
+            header += b"\n"
+
+        # pandas skips blank lines, which are at most a line break long
+        data_rows = np.arange(len(starts)) > self.header_row
+        data_rows &= ends - starts > 2
+
+        obj_ids = pd.read_csv(
+            self.filename,
+            sep="\\s+" if self.sep == "whitespace" else ",",
+            usecols=["ObjID"],
+            skiprows=self.header_row,
+        )
+        obj_ids = self._validate_object_id_column(obj_ids)["ObjID"].to_numpy(dtype=str)
+
+        if len(obj_ids) != data_rows.sum():
+            self._validate_csv(self.header_row)
+            error_str = f"ERROR: CSVReader: could not index the rows of {self.filename}."
+            pplogger = logging.getLogger(__name__)
+            pplogger.error(error_str)
+            sys.exit(error_str)
+
+        return {
+            "starts": starts[data_rows],
+            "ends": ends[data_rows],
+            "obj_ids": obj_ids,
+            "header": np.frombuffer(header, dtype=np.uint8),
+        }
+
+    def _read_indexed_rows(self, rows):
+        """Reads a set of data rows of the file, seeking to each run of consecutive
+        rows with the byte-offset index.
+
+        Parameters
+        -----------
+        rows : array of ints
+            The increasing 0-indexed numbers of the data rows to read.
+
+        Returns
+        -----------
+        res_df : pandas dataframe
+            Dataframe of the object data.
+        """
+        index = self._get_index()
+        buffer = io.BytesIO()
+        buffer.write(index["header"].tobytes())
+
+        runs = np.split(rows, np.flatnonzero(np.diff(rows) != 1) + 1) if len(rows) else []
+        with open(self.filename, "rb") as fh:
+            for run in runs:
+                fh.seek(index["starts"][run[0]])
+                buffer.write(fh.read(index["ends"][run[-1]] - index["starts"][run[0]]))
+        buffer.seek(0)
+
+        if self.sep == "whitespace":
+            return pd.read_csv(buffer, sep="\\s+")
+        return pd.read_csv(buffer, delimiter=",")
+
     def _process_and_validate_input_table(self, input_table, **kwargs):
         """Perform any input-specific processing and validation on the input table.
         Modifies the input dataframe in place.
@@ -14,16 +14,22 @@ For example, if the ephemeris file is used as the primary reader, the algorithm
 will load data in blocks of the ephemeris rows and join in the auxiliary data
 for just the object IDs on those rows. It is not guaranteed to include all
 rows for the current objects.
+
+If the rows of the ephemeris file are grouped by object, in the order of the
+objects in the primary reader, the ephemeris can instead be streamed in lockstep
+with the primary reader (``ephem_sorted``): stage 2 then reads the ephemeris file
+sequentially, so the whole file is read once instead of once per block.
 """
 
 import logging
+import numpy as np
 import pandas as pd
 import sys
 import collections
 
 
 class CombinedDataReader:
-    def __init__(self, ephem_primary=False, **kwargs):
+    def __init__(self, ephem_primary=False, ephem_sorted=False, **kwargs):
         """
         Parameters
         ----------
@@ -32,6 +38,12 @@ class CombinedDataReader:
             reader. Otherwise uses the first auxiliary data reader.
             Default = False
 
+        ephem_sorted: boolean, optional
+            The rows of the ephemeris are grouped by object, in the order of the
+            objects in the first auxiliary data reader, so the ephemeris is streamed
+            in a single pass instead of searched for the objects of each block.
+            Ignored if ephem_primary is True. Default = False
+
         **kwargs : dictionary, optional
         Extra arguments
 
@@ -40,6 +52,17 @@ class CombinedDataReader:
         self.aux_data_readers = []
         self.block_start = 0
         self.ephem_primary = ephem_primary
+        self.ephem_sorted = ephem_sorted
+
+        # State of the ephemeris stream: the iterator over its blocks of rows, the rows
+        # read but not returned yet, the row number of each object in the primary reader,
+        # and the row number of the last object returned.
+        self._ephem_stream = None
+        self._ephem_pending = None
+        self._ephem_pending_rows = None
+        self._ephem_columns = ["ObjID"]
+        self._object_rows = None
+        self._last_object_row = -1
 
     def add_ephem_reader(self, new_reader):
         """Add a new reader for ephemeris data.
@@ -171,7 +194,9 @@ class CombinedDataReader:
             return None
 
         # Load in the data for this block.
-        if ephem_df is None:
+        if ephem_df is None and self.ephem_sorted:
+            ephem_df = self._read_sorted_ephem(block_size, verbose)
+        elif ephem_df is None:
             ephem_df = self.ephem_reader.read_objects(obj_ids)
         ephem_ids = set(ephem_df["ObjID"].unique().tolist())
 
@@ -196,6 +221,74 @@ class CombinedDataReader:
 
         return ephem_df
 
+    def _read_sorted_ephem(self, block_size=None, verbose=False):
+        """Reads the ephemeris rows of the objects of the current block from the
+        ephemeris stream, i.e. all the rows up to the first row of an object of a
+        later block, which is kept for the next blocks.
+
+        Parameters
+        -----------
+        block_size: integer, optional
+            the number of rows of the ephemeris read at once.
+            Use block_size=None to read in all available data.
+            Default = None
+
+        verbose : boolean, optional
+            Use verbose logging.
+            Default = False
+
+        Returns
+        -----------
+        res_df : pandas dataframe
+            dataframe of the ephemeris rows of the current block.
+        """
+        pplogger = logging.getLogger(__name__)
+        verboselog = pplogger.info if verbose else lambda *a, **k: None
+
+        if self._ephem_stream is None:
+            verboselog(f"Streaming the ephemeris from: {self.ephem_reader.get_reader_info()}")
+            self._ephem_stream = self.ephem_reader.iterate_rows(block_size)
+            self.aux_data_readers[0]._build_id_map()
+            object_ids = self.aux_data_readers[0].obj_id_table["ObjID"]
+            self._object_rows = pd.Series(np.arange(len(object_ids)), index=object_ids.values)
+
+        # self.block_start is already past the objects of the current block
+        blocks = []
+        while True:
+            if self._ephem_pending is None or len(self._ephem_pending) == 0:
+                self._ephem_pending = next(self._ephem_stream, None)
+                if self._ephem_pending is None:
+                    break
+                self._ephem_columns = self._ephem_pending.columns
+
+                # the ephemerides of objects without orbits are ignored
+                rows = self._ephem_pending["ObjID"].map(self._object_rows)
+                self._ephem_pending = self._ephem_pending[rows.notna().values]
+                rows = rows.dropna().to_numpy(dtype=np.int64)
+                if np.any(np.diff(rows) < 0) or (len(rows) > 0 and rows[0] < self._last_object_row):
+                    pplogger.error(
+                        f"ERROR: the rows of {self.ephem_reader.get_reader_info()} are not grouped by object "
+                        f"in the order of {self.aux_data_readers[0].get_reader_info()}."
+                    )
+                    sys.exit(
+                        f"ERROR: the rows of {self.ephem_reader.get_reader_info()} are not grouped by object "
+                        f"in the order of {self.aux_data_readers[0].get_reader_info()}."
+                    )
+                self._ephem_pending_rows = rows
+                if len(rows) > 0:
+                    self._last_object_row = rows[-1]
+
+            n_current = np.searchsorted(self._ephem_pending_rows, self.block_start)
+            blocks.append(self._ephem_pending.iloc[:n_current])
+            self._ephem_pending = self._ephem_pending.iloc[n_current:]
+            self._ephem_pending_rows = self._ephem_pending_rows[n_current:]
+            if len(self._ephem_pending) > 0:
+                break
+
+        if len(blocks) == 0:
+            return pd.DataFrame(columns=self._ephem_columns)
+        return pd.concat(blocks, ignore_index=True)
+
     def read_aux_block(self, block_size=None, verbose=False, **kwargs):
         """Reads in a set number of rows from the input, performs
         post-processing and validation, and returns a data frame.
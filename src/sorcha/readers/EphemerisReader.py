@@ -4,6 +4,7 @@ import sys
 
 from sorcha.readers.CSVReader import CSVDataReader
 from sorcha.readers.HDF5Reader import HDF5DataReader
+from sorcha.readers.ParquetReader import ParquetDataReader
 from sorcha.readers.ObjectDataReader import ObjectDataReader
 
 
@@ -26,7 +27,7 @@ class EphemerisDataReader(ObjectDataReader):
             location/name of the data file.
 
         inputformat : string
-            format of input file ("whitespace"/"comma"/"csv"/"h5"/"hdf5").
+            format of input file ("whitespace"/"comma"/"csv"/"h5"/"hdf5"/"parquet").
 
         **kwargs : dictionary, optional
             Extra arguments
@@ -40,6 +41,8 @@ class EphemerisDataReader(ObjectDataReader):
             self.reader = CSVDataReader(filename, sep=inputformat, **kwargs)
         elif (inputformat == "h5") or (inputformat == "hdf5") or (inputformat == "HDF5"):
             self.reader = HDF5DataReader(filename, **kwargs)
+        elif inputformat == "parquet":
+            self.reader = ParquetDataReader(filename, **kwargs)
         else:
             pplogger.error(
                 f"ERROR: EphemerisDataReader: unknown format for ephemeris simulation results ({inputformat})."
@@ -87,6 +90,26 @@ class EphemerisDataReader(ObjectDataReader):
         res_df = self.reader.read_rows(block_start, block_size, **kwargs)
         return res_df
 
+    def _iterate_rows_internal(self, block_size=None, **kwargs):
+        """Reads the whole input in consecutive blocks of rows.
+
+        Parameters
+        -----------
+        block_size : int, optional
+            the number of rows in each block.
+            Use block_size=None to read in all available data in one block.
+            Default = None
+
+        **kwargs : dictionary, optional
+            Extra arguments
+
+        Yields
+        -----------
+        res_df : Pandas dataframe
+            dataframe of the object data of the block.
+        """
+        yield from self.reader.iterate_rows(block_size, **kwargs)
+
     def _read_objects_internal(self, obj_ids, **kwargs):
         """Read in a chunk of data corresponding to all rows for
         a given set of object IDs.
@@ -189,7 +212,7 @@ def read_full_ephemeris_table(filename, inputformat):
         location/name of the data file.
 
     inputformat : string
-        format of input file ("whitespace"/"comma"/"csv"/"h5"/"hdf5").
+        format of input file ("whitespace"/"comma"/"csv"/"h5"/"hdf5"/"parquet").
 
     Returns
     -----------
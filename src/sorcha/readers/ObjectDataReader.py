@@ -92,6 +92,52 @@ class ObjectDataReader(abc.ABC):
         res_df = self._process_and_validate_input_table(res_df, **kwargs)
         return res_df
 
+    def iterate_rows(self, block_size=None, **kwargs):
+        """Reads the whole input in consecutive blocks of rows, performs
+        post-processing and validation, and yields a data frame per block.
+
+        Parameters
+        -----------
+        block_size : int (optional)
+            the number of rows in each block.
+            Use block_size=None to read in all available data in one block.
+            Default = None
+
+        **kwargs : dictionary, optional
+            Extra arguments
+
+        Yields
+        -----------
+        res_df : Pandas dataframe
+            dataframe of the object data of the block.
+        """
+        if self._cache_table:
+            block_start = 0
+            while True:
+                res_df = self.read_rows(block_start, block_size, **kwargs)
+                if len(res_df) == 0:
+                    return
+                yield res_df
+                block_start += len(res_df)
+
+        for res_df in self._iterate_rows_internal(block_size, **kwargs):
+            yield self._process_and_validate_input_table(res_df, **kwargs)
+
+    def _iterate_rows_internal(self, block_size=None, **kwargs):
+        """Function to do the source-specific reading of consecutive blocks of rows.
+        The base implementation calls _read_rows_internal for each block; subclasses
+        reading sequential files override it to read the file in a single pass.
+        """
+        block_start = 0
+        while True:
+            res_df = self._read_rows_internal(block_start, block_size, **kwargs)
+            if len(res_df) == 0:
+                return
+            yield res_df
+            block_start += len(res_df)
+            if block_size is None:
+                return
+
     @abc.abstractmethod
     def _read_rows_internal(self, block_start=0, block_size=None, **kwargs):
         """Function to do the actual source-specific reading."""
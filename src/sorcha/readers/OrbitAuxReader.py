@@ -3,6 +3,7 @@ import sys
 import numpy as np
 
 from sorcha.readers.CSVReader import CSVDataReader
+from sorcha.readers.ParquetReader import ParquetDataReader
 
 
 class OrbitAuxReader(CSVDataReader):
@@ -66,6 +67,23 @@ class OrbitAuxReader(CSVDataReader):
         # Do standard CSV file processing
         super()._process_and_validate_input_table(input_table, **kwargs)
 
+        return self._validate_orbits(input_table)
+
+    @staticmethod
+    def _validate_orbits(input_table):
+        """Checks the orbit format and the orbital elements of an orbits table.
+        Shared by the readers of the orbit files of every format.
+
+        Parameters
+        -----------
+        input_table : pandas dataframe
+            A loaded table.
+
+        Returns
+        -----------
+        input_table : pandas dataframe
+            Returns the input dataframe.
+        """
         if len(input_table) == 0:
             return input_table
 
@@ -205,3 +223,52 @@ class OrbitAuxReader(CSVDataReader):
             )
 
         return input_table
+
+
+class ParquetOrbitAuxReader(ParquetDataReader):
+    """A class to read in the auxiliary orbit data files stored as Parquet files."""
+
+    def __init__(self, filename, **kwargs):
+        """A class for reading the object data from a Parquet file.
+
+        Parameters
+        -----------
+        filename : string
+            location/name of the data file.
+
+        **kwargs : dictionary, optional
+            Extra arguments
+        """
+        super().__init__(filename, **kwargs)
+
+    def get_reader_info(self):
+        """Return a string identifying the current reader name
+        and input information (for logging and output).
+
+        Returns
+        --------
+        : string
+            The reader information.
+        """
+        return f"ParquetOrbitAuxReader:{self.filename}"
+
+    def _process_and_validate_input_table(self, input_table, **kwargs):
+        """Perform any input-specific processing and validation on the input table.
+        Modifies the input dataframe in place.
+
+        Parameters
+        -----------
+        input_table : pandas dataframe
+            A loaded table.
+
+        **kwargs : dictionary, optional
+
+        Returns
+        -----------
+        res_df : pandas dataframe
+            Returns the input dataframe modified in-place.
+        """
+        # Do standard Parquet file processing
+        super()._process_and_validate_input_table(input_table, **kwargs)
+
+        return OrbitAuxReader._validate_orbits(input_table)
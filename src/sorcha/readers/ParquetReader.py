@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from sorcha.readers.ObjectDataReader import ObjectDataReader
+
+
+class ParquetDataReader(ObjectDataReader):
+    """A class to read in object data files stored as Parquet files.
+
+    Only the row groups holding the requested rows are decoded, the reads of given
+    object IDs are pushed down to Arrow as a filter on ObjID (which skips the row
+    groups whose statistics exclude them), and the columns can be restricted to a
+    subset of the file.
+    """
+
+    def __init__(self, filename, columns=None, **kwargs):
+        """A class for reading the object data from a Parquet file.
+
+        Parameters
+        -----------
+        filename : string
+            location/name of the data file.
+
+        columns : list of strings, optional
+            The columns to read. ObjID is always read.
+            Use columns=None to read all the columns. Default = None
+
+        **kwargs : dictionary, optional
+            Extra arguments
+        """
+        super().__init__(**kwargs)
+        self.filename = filename
+
+        self.columns = None
+        if columns is not None:
+            self.columns = ["ObjID"] + [column for column in columns if column != "ObjID"]
+
+        # The Parquet file, and the first row of each of its row groups. Only
+        # populated on the first read.
+        self._parquet_file = None
+        self._row_group_starts = None
+
+        # A table holding just the object ID for each row. Only populated
+        # if we try to read data for specific object IDs.
+        self.obj_id_table = None
+
+    def get_reader_info(self):
+        """Return a string identifying the current reader name
+        and input information (for logging and output).
+
+        Returns
+        --------
+        name : string
+            The reader information.
+        """
+        return f"ParquetDataReader:{self.filename}"
+
+    def _get_parquet_file(self):
+        """Opens the Parquet file and reads the row counts of its row groups.
+
+        Returns
+        -----------
+        parquet_file : pyarrow.parquet.ParquetFile
+            The opened file.
+        """
+        if self._parquet_file is None:
+            self._parquet_file = pq.ParquetFile(self.filename)
+            metadata = self._parquet_file.metadata
+            n_rows = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+            self._row_group_starts = np.concatenate([[0], np.cumsum(n_rows, dtype=np.int64)])
+        return self._parquet_file
+
+    def _read_rows_internal(self, block_start=0, block_size=None, **kwargs):
+        """Reads in a set number of rows from the input.
+
+        Parameters
+        -----------
+        block_start : integer, optional
+            The 0-indexed row number from which
+            to start reading the data. For example in a CSV file
+            block_start=2 would skip the first two lines after the header
+            and return data starting on row=2. Default=0
+
+        block_size : integer, optional
+            the number of rows to read in.
+            Use block_size=None to read in all available data.
+            Default = None
+
+        **kwargs : dictionary, optional
+            Extra arguments
+
+        Returns
+        -----------
+        res_df  : pandas dataframe
+            Dataframe of the object data.
+        """
+        parquet_file = self._get_parquet_file()
+        starts = self._row_group_starts
+        block_end = starts[-1] if block_size is None else min(block_start + block_size, starts[-1])
+        block_start = min(block_start, block_end)
+
+        # Only decode the row groups overlapping the block.
+        first = np.searchsorted(starts, block_start, side="right") - 1
+        last = np.searchsorted(starts, block_end, side="left")
+        table = parquet_file.read_row_groups(range(first, max(last, first)), columns=self.columns)
+        offset = block_start - starts[first] if first < len(starts) - 1 else 0
+        res_df = table.slice(offset, block_end - block_start).to_pandas()
+        res_df.index = pd.RangeIndex(block_start, block_start + len(res_df))
+        return res_df
+
+    def _iterate_rows_internal(self, block_size=None, **kwargs):
+        """Reads the whole file in consecutive blocks of rows, decoding each
+        row group once.
+
+        Parameters
+        -----------
+        block_size : integer, optional
+            the number of rows in each block.
+            Use block_size=None to read in all available data in one block.
+            Default = None
+
+        **kwargs : dictionary, optional
+            Extra arguments
+
+        Yields
+        -----------
+        res_df  : pandas dataframe
+            Dataframe of the object data of the block.
+        """
+        if block_size is None:
+            yield self._read_rows_internal()
+            return
+
+        block_start = 0
+        for batch in self._get_parquet_file().iter_batches(batch_size=block_size, columns=self.columns):
+            res_df = batch.to_pandas()
+            res_df.index = pd.RangeIndex(block_start, block_start + len(res_df))
+            block_start += len(res_df)
+            yield res_df
+
+    def _build_id_map(self):
+        """Builds a table of just the object IDs"""
+        if self.obj_id_table is not None:
+            return
+        self.obj_id_table = pq.read_table(self.filename, columns=["ObjID"]).to_pandas()
+        self.obj_id_table = self._validate_object_id_column(self.obj_id_table)
+
+    def _read_objects_internal(self, obj_ids, **kwargs):
+        """Read in a chunk of data for given object IDs.
+
+        Parameters
+        -----------
+        obj_ids : list
+            A list of object IDs to use.
+
+        **kwargs : dictionary, optional
+            Extra arguments
+
+        Returns
+        -----------
+        res_df : Pandas dataframe
+            The dataframe for the object data.
+        """
+        dataset = ds.dataset(self.filename, format="parquet")
+
+        # The object IDs are strings in Sorcha, so they are cast to the type
+        # of the ObjID column of the file to be compared with it.
+        obj_id_type = dataset.schema.field("ObjID").type
+        obj_ids = pa.array(np.asarray(obj_ids, dtype=str)).cast(obj_id_type)
+
+        table = dataset.to_table(columns=self.columns, filter=pc.field("ObjID").isin(obj_ids))
+        return table.to_pandas()
+
+    def _process_and_validate_input_table(self, input_table, **kwargs):
+        """Perform any input-specific processing and validation on the input table.
+        Modifies the input dataframe in place.
+
+        Notes
+        ------
+        The base implementation includes filtering that is common to most
+        input types. Subclasses should call super.process_and_validate()
+        to ensure that the ancestor’s validation is also applied.
+
+        Parameters
+        -----------
+        input_table : pandas dataframe
+            A loaded table.
+
+        **kwargs : dictionary, optional
+            Extra arguments
+
+        Returns
+        -----------
+        input_table : pandas dataframe
+            Returns the input dataframe modified in-place.
+        """
+        # Perform the parent class's validation (checking object ID column).
+        input_table = super()._process_and_validate_input_table(input_table, **kwargs)
+
+        return input_table
@@ -2,5 +2,6 @@ from . import ObjectDataReader
 from . import CSVReader
 from . import DatabaseReader
 from . import HDF5Reader
+from . import ParquetReader
 from . import EphemerisReader
 from . import OrbitAuxReader
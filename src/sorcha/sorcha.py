@@ -6,9 +6,13 @@ import numpy as np
 import argparse
 import os
 import logging
+import logging.handlers
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-from sorcha.ephemeris.simulation_driver import create_ephemeris
-from sorcha.ephemeris.simulation_setup import precompute_pointing_information
+from sorcha.ephemeris.simulation_driver import create_ephemeris, write_out_ephemeris_file, EPHEMERIS_COLUMNS
+from sorcha.ephemeris.simulation_setup import prepare_pointings
 
 from sorcha.modules.PPReadPointingDatabase import PPReadPointingDatabase
 from sorcha.modules.PPLinkingFilter import PPLinkingFilter
@@ -16,6 +20,9 @@ from sorcha.modules.PPTrailingLoss import PPTrailingLoss
 from sorcha.modules.PPBrightLimit import PPBrightLimit
 from sorcha.modules.PPCalculateApparentMagnitude import PPCalculateApparentMagnitude
 from sorcha.modules.PPApplyFOVFilter import PPApplyFOVFilter
+from sorcha.modules.PPApplyFilterMasks import PPApplyFilterMasks
+from sorcha.modules.PPCompactDtypes import PPCompactDtypes, PPExpandCompactDtypes
+from sorcha.modules.PPJoinObjectColumns import PPDeferredObjectColumns, PPJoinObjectColumns
 from sorcha.modules.PPSNRLimit import PPSNRLimit
 from sorcha.modules import PPAddUncertainties, PPRandomizeMeasurements
 from sorcha.modules import PPVignetting
@@ -25,7 +32,12 @@ from sorcha.modules.PPFaintObjectCullingFilter import PPFaintObjectCullingFilter
 
 from sorcha.modules.PPMatchPointingToObservations import PPMatchPointingToObservations
 from sorcha.modules.PPMagnitudeLimit import PPMagnitudeLimit
-from sorcha.modules.PPOutput import PPWriteOutput, PPIndexSQLDatabase
+from sorcha.modules.PPOutput import (
+    PPWriteOutput,
+    PPIndexSQLDatabase,
+    PPCloseParquetWriters,
+    PPCloseSqlite3Writers,
+)
 from sorcha.modules.PPGetMainFilterAndColourOffsets import PPGetMainFilterAndColourOffsets
 from sorcha.modules.PPFootprintFilter import Footprint
 from sorcha.modules.PPStats import stats
@@ -33,7 +45,8 @@ from sorcha.modules.PPStats import stats
 from sorcha.readers.CombinedDataReader import CombinedDataReader
 from sorcha.readers.CSVReader import CSVDataReader
 from sorcha.readers.EphemerisReader import EphemerisDataReader
-from sorcha.readers.OrbitAuxReader import OrbitAuxReader
+from sorcha.readers.OrbitAuxReader import OrbitAuxReader, ParquetOrbitAuxReader
+from sorcha.readers.ParquetReader import ParquetDataReader
 
 from sorcha.activity.activity_registration import update_activity_subclasses
 from sorcha.lightcurves.lightcurve_registration import update_lc_subclasses
@@ -80,6 +93,436 @@ def mem(df):
     return usage
 
 
+def read_chunks(reader, lenf, args, sconfigs):
+    """
+    Reads the input objects in chunks of "size_serial_chunk" objects.
+
+    Parameters
+    -----------
+    reader : CombinedDataReader
+        The reader for the orbits, physical parameters and (optionally) the ephemeris.
+    lenf : int
+        The total number of objects.
+    args : sorchaArguments object
+        Command-line arguments from Sorcha.
+    sconfigs : dataclass
+        Dataclass of configuration file arguments.
+
+    Yields
+    -----------
+    chunk_index : int
+        The index of the chunk.
+    chunk_df : pandas dataframe
+        The orbits and physical parameters of the chunk, joined to the
+        ephemeris if ephemerides_type is "external".
+    """
+    pplogger = logging.getLogger(__name__)
+    verboselog = pplogger.info if args.loglevel else lambda *a, **k: None
+
+    startChunk = 0
+    endChunk = 0
+    loopCounter = 0
+
+    while endChunk < lenf:
+        verboselog("Starting main Sorcha processing loop round {}".format(loopCounter))
+        endChunk = startChunk + sconfigs.input.size_serial_chunk
+        verboselog("Working on objects {}-{}".format(startChunk, endChunk))
+
+        if sconfigs.input.ephemerides_type.casefold() == "external":
+            verboselog("Reading in chunk of orbits and associated ephemeris from an external file")
+            chunk_df = reader.read_block(block_size=sconfigs.input.size_serial_chunk)
+        else:
+            verboselog("Ingest chunk of orbits")
+            chunk_df = reader.read_aux_block(block_size=sconfigs.input.size_serial_chunk)
+
+        yield loopCounter, chunk_df
+
+        startChunk = startChunk + sconfigs.input.size_serial_chunk
+        loopCounter = loopCounter + 1
+
+
+def process_chunk(chunk_index, chunk_df, filterpointing, footprint, args, sconfigs, pointings=None):
+    """
+    Generates the ephemeris (if needed) for one chunk of objects and applies the
+    post-processing filters to it.
+
+    Parameters
+    -----------
+    chunk_index : int
+        The index of the chunk. Used to select the random number streams of the chunk.
+    chunk_df : pandas dataframe
+        The orbits and physical parameters of the chunk, joined to the
+        ephemeris if ephemerides_type is "external".
+    filterpointing : pandas dataframe
+        The pointing database.
+    footprint : Footprint or None
+        The camera footprint, if the footprint camera model is used.
+    args : sorchaArguments object
+        Command-line arguments from Sorcha.
+    sconfigs : dataclass
+        Dataclass of configuration file arguments.
+    pointings : PointingArrays, optional
+        The pointing database as numpy arrays, used for ephemeris generation.
+        Default = None (converted from filterpointing for this chunk)
+
+    Returns
+    -----------
+    observations : pandas dataframe or None
+        The observations that survived post-processing. None if the chunk was skipped.
+    ephemeris_df : pandas dataframe or None
+        The ephemeris generated for the chunk, if the user asked for it to be written out.
+    """
+    pplogger = logging.getLogger(__name__)
+    verboselog = pplogger.info if args.loglevel else lambda *a, **k: None
+
+    # Each chunk draws from its own random number streams so that the results
+    # do not depend on whether the chunks are processed serially or in parallel.
+    rngs = args._rngs.getChunkRNGs(chunk_index)
+    ephemeris_df = None
+    deferred_columns = []
+
+    # Processing begins, all processing is done for chunks
+    if sconfigs.input.ephemerides_type.casefold() == "external":
+        observations = chunk_df
+    else:
+        orbits_df = chunk_df
+
+        if not sconfigs.expert.brute_force:
+            verboselog("Cutting all objects too faint to be observed")
+            verboselog(
+                "Number of rows BEFORE removing faint objects in faint object culling filter: "
+                + str(len(orbits_df.index))
+            )
+            orbits_df = PPFaintObjectCullingFilter(
+                orbits_df,
+                filterpointing,
+                sconfigs.filters.mainfilter,
+                sconfigs.filters.observing_filters,
+                sconfigs.lightcurve.lc_model,
+                sconfigs.activity.comet_activity,
+            )
+            verboselog(
+                "Number of rows After removing faint objects in faint object culling filter: "
+                + str(len(orbits_df.index))
+            )
+            if len(orbits_df) == 0:  # the above could feasibly nuke the entire dataframe, so...
+                pplogger.info(
+                    "WARNING: no objects in this chunk pass faint object culling filter. Skipping to next chunk..."
+                )
+                return None, None
+
+        # the orbital elements are only copied onto the observations that are
+        # written out, if they are written out at all
+        deferred_columns = PPDeferredObjectColumns(orbits_df.columns, sconfigs)
+        join_columns = None
+        if deferred_columns:
+            join_columns = [
+                column for column in orbits_df.columns if column not in deferred_columns + ["ObjID"]
+            ]
+
+        verboselog("Starting ephemeris generation")
+        observations = create_ephemeris(
+            orbits_df,
+            filterpointing,
+            args,
+            sconfigs,
+            write_ephemeris=False,
+            pointings=pointings,
+            join_columns=join_columns,
+        )
+        verboselog("Ephemeris generation completed")
+
+        # the ephemeris is handed back to the caller to be written out in chunk order
+        if args.output_ephemeris_file and args.outpath:
+            ephemeris_df = observations[list(EPHEMERIS_COLUMNS)]
+
+    verboselog("Start post processing for this chunk")
+    verboselog("Matching pointing database information to observations on rough camera footprint")
+
+    # If the ephemeris file doesn't have any observations for the objects in the chunk
+    # PPReadAllInput will return an empty dataframe. We thus log a warning.
+    if len(observations.index) == 0:
+        pplogger.info("WARNING: no ephemeris observations found for these objects. Skipping to next chunk...")
+        return None, ephemeris_df
+
+    observations = PPMatchPointingToObservations(observations, filterpointing)
+
+    if sconfigs.expert.compact_dtypes:
+        verboselog("Converting observation columns to compact types...")
+        observations = PPCompactDtypes(observations)
+
+    verboselog("Calculating apparent magnitudes...")
+    observations = PPCalculateApparentMagnitude(
+        observations,
+        sconfigs.phasecurves.phase_function,
+        sconfigs.filters.mainfilter,
+        sconfigs.filters.othercolours,
+        sconfigs.filters.observing_filters,
+        sconfigs.activity.comet_activity,
+        lightcurve_choice=sconfigs.lightcurve.lc_model,
+        verbose=args.loglevel,
+    )
+
+    if sconfigs.expert.trailing_losses_on:
+        verboselog("Calculating trailing losses...")
+        dmagDetect = PPTrailingLoss(observations, "circularPSF")
+        observations["PSFMagTrue"] = dmagDetect + observations["trailedSourceMagTrue"]
+    else:
+        observations["PSFMagTrue"] = observations["trailedSourceMagTrue"]
+
+    if sconfigs.expert.vignetting_on:
+        verboselog("Calculating effects of vignetting on limiting magnitude...")
+        observations["fiveSigmaDepth_mag"] = PPVignetting.vignettingEffects(observations)
+    else:
+        verboselog(
+            "Vignetting turned OFF in config file. 5-sigma depth of field will be used for subsequent calculations."
+        )
+        observations["fiveSigmaDepth_mag"] = observations["fieldFiveSigmaDepth_mag"]
+
+    # Note that the below code creates trailedSourceMag and PSFMag
+    # as columns in the observations dataframe.
+    # These are the columns that should be used moving forward for filters etc.
+    # Do NOT use trailedSourceMagTrue or PSFMagTrue, these are the unrandomised magnitudes.
+    verboselog("Calculating astrometric and photometric uncertainties...")
+    observations = PPAddUncertainties.addUncertainties(observations, sconfigs, rngs, verbose=args.loglevel)
+
+    if sconfigs.expert.randomization_on:
+        verboselog(
+            "Number of rows BEFORE randomizing astrometry and photometry: " + str(len(observations.index))
+        )
+        observations = PPRandomizeMeasurements.randomizeAstrometryAndPhotometry(
+            observations, sconfigs, rngs, verbose=args.loglevel
+        )
+        verboselog(
+            "Number of rows AFTER randomizing astrometry and photometry: " + str(len(observations.index))
+        )
+    else:
+        verboselog(
+            "Randomization turned off in config file. No astrometric or photometric randomization performed."
+        )
+        verboselog("NOTE: new columns RATrue_deg and DecTrue_deg are EQUAL to columns RA_deg and Dec_deg.")
+        verboselog(
+            "NOTE: columns trailedSourceMagTrue and PSFMagTrue are EQUAL to columns trailedSourceMag and PSFMag."
+        )
+        observations["RATrue_deg"] = observations["RA_deg"].copy()
+        observations["DecTrue_deg"] = observations["Dec_deg"].copy()
+        observations["trailedSourceMag"] = observations["trailedSourceMagTrue"].copy()
+        observations["PSFMag"] = observations["PSFMagTrue"].copy()
+
+    if sconfigs.expert.compact_dtypes:
+        # the magnitudes and uncertainties added since the previous conversion
+        observations = PPCompactDtypes(observations)
+
+    if sconfigs.expert.columnar_filtering:
+        # the filters only update a mask of the observations that are kept, and
+        # the observations that survive are copied once
+        observations = PPApplyFilterMasks(
+            observations, sconfigs, rngs, footprint=footprint, verbose=args.loglevel
+        )
+    else:
+        if sconfigs.fov.camera_model != "none" and len(observations.index) > 0:
+            verboselog("Applying field-of-view filters...")
+            verboselog("Number of rows BEFORE applying FOV filters: " + str(len(observations.index)))
+            observations = PPApplyFOVFilter(
+                observations, sconfigs, rngs, footprint=footprint, verbose=args.loglevel
+            )
+            verboselog("Number of rows AFTER applying FOV filters: " + str(len(observations.index)))
+
+        if sconfigs.expert.snr_limit_on and len(observations.index) > 0:
+            verboselog(
+                "Dropping observations with signal to noise ratio less than {}...".format(
+                    sconfigs.expert.snr_limit
+                )
+            )
+            verboselog("Number of rows BEFORE applying SNR limit filter: " + str(len(observations.index)))
+            observations = PPSNRLimit(observations, sconfigs.expert.snr_limit)
+            verboselog("Number of rows AFTER applying SNR limit filter: " + str(len(observations.index)))
+
+        if sconfigs.expert.mag_limit_on and len(observations.index) > 0:
+            verboselog("Dropping detections fainter than user-defined magnitude limit... ")
+            verboselog("Number of rows BEFORE applying mag limit filter: " + str(len(observations.index)))
+            observations = PPMagnitudeLimit(observations, sconfigs.expert.mag_limit)
+            verboselog("Number of rows AFTER applying mag limit filter: " + str(len(observations.index)))
+
+        if sconfigs.fadingfunction.fading_function_on and len(observations.index) > 0:
+            verboselog("Applying detection efficiency fading function...")
+            verboselog("Number of rows BEFORE applying fading function: " + str(len(observations.index)))
+            observations = PPFadingFunctionFilter(
+                observations,
+                sconfigs.fadingfunction.fading_function_peak_efficiency,
+                sconfigs.fadingfunction.fading_function_width,
+                rngs,
+                verbose=args.loglevel,
+            )
+            verboselog("Number of rows AFTER applying fading function: " + str(len(observations.index)))
+
+        if sconfigs.saturation.bright_limit_on and len(observations.index) > 0:
+            verboselog("Dropping observations that are too bright...")
+            verboselog("Number of rows BEFORE applying bright limit filter " + str(len(observations.index)))
+            observations = PPBrightLimit(
+                observations, sconfigs.filters.observing_filters, sconfigs.saturation.bright_limit
+            )
+            verboselog("Number of rows AFTER applying bright limit filter " + str(len(observations.index)))
+
+    if sconfigs.linkingfilter.ssp_linking_on and len(observations.index) > 0:
+        verboselog("Applying SSP linking filter...")
+        verboselog("Number of rows BEFORE applying SSP linking filter: " + str(len(observations.index)))
+        observations = PPLinkingFilter(
+            observations,
+            sconfigs.linkingfilter.ssp_detection_efficiency,
+            sconfigs.linkingfilter.ssp_number_observations,
+            sconfigs.linkingfilter.ssp_number_tracklets,
+            sconfigs.linkingfilter.ssp_track_window,
+            sconfigs.linkingfilter.ssp_separation_threshold,
+            sconfigs.linkingfilter.ssp_maximum_time,
+            sconfigs.linkingfilter.ssp_night_start_utc,
+            drop_unlinked=sconfigs.linkingfilter.drop_unlinked,
+        )
+        observations.reset_index(drop=True, inplace=True)
+        verboselog("Number of rows AFTER applying SSP linking filter: " + str(len(observations.index)))
+
+    if deferred_columns:
+        # only the deferred columns that are written out are looked up
+        output_columns = sconfigs.output.output_columns
+        output_columns = output_columns if isinstance(output_columns, list) else []
+        observations = PPJoinObjectColumns(
+            observations, orbits_df, [column for column in deferred_columns if column in output_columns]
+        )
+
+    if sconfigs.expert.compact_dtypes:
+        observations = PPExpandCompactDtypes(observations)
+
+    return observations, ephemeris_df
+
+
+# State shared by all the chunks handled in a worker process. Set once per worker
+# by _init_chunk_worker so the pointing database is not sent with every chunk.
+_chunk_worker_state = {}
+
+
+def _init_chunk_worker(filterpointing, footprint, args, sconfigs, pointings, log_queue=None, log_level=None):
+    """
+    Stores the state shared by all chunks in a worker process, and sends the log
+    records of the worker to the main process, which writes them to the log files.
+    Started processes (the spawn and forkserver start methods) do not inherit the
+    log handlers of the main process, and forked processes would write to the log
+    files concurrently with it.
+
+    Parameters
+    -----------
+    filterpointing : pandas dataframe
+        The pointing database.
+    footprint : Footprint or None
+        The camera footprint, if the footprint camera model is used.
+    args : sorchaArguments object
+        Command-line arguments from Sorcha.
+    sconfigs : dataclass
+        Dataclass of configuration file arguments.
+    pointings : PointingArrays or None
+        The pointing database as numpy arrays, used for ephemeris generation.
+    log_queue : multiprocessing.Queue, optional
+        The queue the log records are sent to. Default = None (logging is left as it is)
+    log_level : int, optional
+        The level of the root logger of the main process. Default = None
+
+    Returns
+    -----------
+    None.
+    """
+    if log_queue is not None:
+        root_logger = logging.getLogger()
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        if log_level is not None:
+            root_logger.setLevel(log_level)
+
+    _chunk_worker_state.update(
+        filterpointing=filterpointing, footprint=footprint, args=args, sconfigs=sconfigs, pointings=pointings
+    )
+
+
+def _process_chunk_in_worker(chunk_index, chunk_df):
+    """
+    Runs process_chunk in a worker process using the state stored by _init_chunk_worker.
+
+    Parameters
+    -----------
+    chunk_index : int
+        The index of the chunk.
+    chunk_df : pandas dataframe
+        The input data of the chunk.
+
+    Returns
+    -----------
+    : tuple
+        The output of process_chunk.
+    """
+    return process_chunk(chunk_index, chunk_df, **_chunk_worker_state)
+
+
+def process_chunks_in_parallel(
+    chunks, filterpointing, footprint, args, sconfigs, pointings=None, mp_context=None
+):
+    """
+    Processes chunks in a pool of args.workers processes. Each worker builds its
+    own ASSIST ephemeris and SPICE state. Results are yielded in chunk order.
+    The log records of the workers are written by the handlers of the root logger
+    of the main process, whatever the start method of the processes.
+
+    Parameters
+    -----------
+    chunks : iterable
+        (chunk_index, chunk_df) pairs, as yielded by read_chunks.
+    filterpointing : pandas dataframe
+        The pointing database.
+    footprint : Footprint or None
+        The camera footprint, if the footprint camera model is used.
+    args : sorchaArguments object
+        Command-line arguments from Sorcha.
+    sconfigs : dataclass
+        Dataclass of configuration file arguments.
+    pointings : PointingArrays, optional
+        The pointing database as numpy arrays, used for ephemeris generation. Default = None
+    mp_context : multiprocessing context, optional
+        The context used to start the worker processes.
+        Default = None (the default start method of the platform)
+
+    Yields
+    -----------
+    : tuple
+        The output of process_chunk for each chunk, in chunk order.
+    """
+    # only a couple of chunks per worker are held in memory at any time
+    max_pending = 2 * args.workers
+
+    root_logger = logging.getLogger()
+    log_queue = (mp_context or multiprocessing).Queue()
+    log_listener = logging.handlers.QueueListener(
+        log_queue, *root_logger.handlers, respect_handler_level=True
+    )
+    log_listener.start()
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            mp_context=mp_context,
+            initializer=_init_chunk_worker,
+            initargs=(filterpointing, footprint, args, sconfigs, pointings, log_queue, root_logger.level),
+        ) as executor:
+            pending = deque()
+            for chunk_index, chunk_df in chunks:
+                pending.append(executor.submit(_process_chunk_in_worker, chunk_index, chunk_df))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+    finally:
+        # the records still in the queue are written out before the listener stops
+        log_listener.stop()
+
+
 def runLSSTSimulation(args, sconfigs):
     """
     Runs the post processing survey simulator functions that apply a series of
@@ -106,7 +549,7 @@ def runLSSTSimulation(args, sconfigs):
     pplogger.info("Post-processing begun.")
 
     try:
-        args.validate_arguments()
+        args.validate_arguments(sconfigs.input.ephemerides_type)
     except Exception as err:
         pplogger.error(err)
         sys.exit(err)
@@ -133,41 +576,52 @@ def runLSSTSimulation(args, sconfigs):
     )
 
     # if we are going to compute the ephemerides, then we should pre-compute all
-    # of the needed values derived from the pointing information.
-
+    # of the needed values derived from the pointing information. The pointing
+    # information, and the healpix pixels covered by each pointing, are converted
+    # to numpy arrays once and shared by all chunks.
+    pointings = None
     if sconfigs.input.ephemerides_type.casefold() != "external":
         verboselog("Pre-computing pointing information for ephemeris generation")
-        filterpointing = precompute_pointing_information(filterpointing, args, sconfigs)
+        filterpointing, pointings = prepare_pointings(filterpointing, args, sconfigs)
 
     # Set up the data readers.
     ephem_type = sconfigs.input.ephemerides_type
     ephem_primary = False
-    reader = CombinedDataReader(ephem_primary=ephem_primary, verbose=True)
+    reader = CombinedDataReader(
+        ephem_primary=ephem_primary, ephem_sorted=sconfigs.input.eph_sorted, verbose=True
+    )
 
     # TODO: Once more ephemerides_types are added this should be wrapped in a EphemerisDataReader
     # That does the selection and checks. We are holding off adding this level of indirection until there
     # is a second ephemerides_type.
 
-    if ephem_type.casefold() not in ["ar", "external"]:  # pragma: no cover
+    if ephem_type.casefold() not in ["ar", "external", "cheb"]:  # pragma: no cover
         pplogger.error(f"PPReadAllInput: Unsupported value for ephemerides_type {ephem_type}")
         sys.exit(f"PPReadAllInput: Unsupported value for ephemerides_type {ephem_type}")
     if ephem_type.casefold() == "external":
-        reader.add_ephem_reader(EphemerisDataReader(args.input_ephemeris_file, sconfigs.input.eph_format))
+        reader.add_ephem_reader(
+            EphemerisDataReader(
+                args.input_ephemeris_file, sconfigs.input.eph_format, use_index=sconfigs.input.csv_index
+            )
+        )
 
-    reader.add_aux_data_reader(OrbitAuxReader(args.orbinfile, sconfigs.input.aux_format))
-    reader.add_aux_data_reader(CSVDataReader(args.paramsinput, sconfigs.input.aux_format))
+    if sconfigs.input.aux_format == "parquet":
+        orbit_reader_class, aux_reader_class = ParquetOrbitAuxReader, ParquetDataReader
+        aux_kwargs = {}
+    else:
+        orbit_reader_class, aux_reader_class = OrbitAuxReader, CSVDataReader
+        aux_kwargs = {"sep": sconfigs.input.aux_format, "use_index": sconfigs.input.csv_index}
+
+    reader.add_aux_data_reader(orbit_reader_class(args.orbinfile, **aux_kwargs))
+    reader.add_aux_data_reader(aux_reader_class(args.paramsinput, **aux_kwargs))
     if sconfigs.activity.comet_activity is not None or sconfigs.lightcurve.lc_model is not None:
-        reader.add_aux_data_reader(CSVDataReader(args.complex_parameters, sconfigs.input.aux_format))
+        reader.add_aux_data_reader(aux_reader_class(args.complex_parameters, **aux_kwargs))
 
     # Check to make sure the ObjIDs in all of the aux_data_readers are a match.
     reader.check_aux_object_ids()
 
     # In case of a large input file, the data is read in chunks. The
     # "size_serial_chunk" parameter in the config file assigns the chunk size.
-    startChunk = 0
-    endChunk = 0
-    loopCounter = 0
-
     # Get number of objects in total.
     lenf = len(reader.aux_data_readers[0].obj_id_table)
 
@@ -176,205 +630,47 @@ def runLSSTSimulation(args, sconfigs):
         verboselog("Creating sensor footprint object for filtering")
         footprint = Footprint(sconfigs.fov.footprint_path)
 
-    while endChunk < lenf:
-        verboselog("Starting main Sorcha processing loop round {}".format(loopCounter))
-        endChunk = startChunk + sconfigs.input.size_serial_chunk
-        verboselog("Working on objects {}-{}".format(startChunk, endChunk))
+    chunks = read_chunks(reader, lenf, args, sconfigs)
 
-        # Processing begins, all processing is done for chunks
-        if sconfigs.input.ephemerides_type.casefold() == "external":
-            verboselog("Reading in chunk of orbits and associated ephemeris from an external file")
-            observations = reader.read_block(block_size=sconfigs.input.size_serial_chunk)
-        else:
-            verboselog("Ingest chunk of orbits")
-            orbits_df = reader.read_aux_block(block_size=sconfigs.input.size_serial_chunk)
-
-            if not sconfigs.expert.brute_force:
-                verboselog("Cutting all objects too faint to be observed")
-                verboselog(
-                    "Number of rows BEFORE removing faint objects in faint object culling filter: "
-                    + str(len(orbits_df.index))
-                )
-                orbits_df = PPFaintObjectCullingFilter(
-                    orbits_df,
-                    filterpointing,
-                    sconfigs.filters.mainfilter,
-                    sconfigs.filters.observing_filters,
-                    sconfigs.lightcurve.lc_model,
-                    sconfigs.activity.comet_activity,
-                )
-                verboselog(
-                    "Number of rows After removing faint objects in faint object culling filter: "
-                    + str(len(orbits_df.index))
-                )
-                if len(orbits_df) == 0:  # the above could feasibly nuke the entire dataframe, so...
-                    pplogger.info(
-                        "WARNING: no objects in this chunk pass faint object culling filter. Skipping to next chunk..."
-                    )
-                    startChunk = startChunk + sconfigs.input.size_serial_chunk
-                    loopCounter = loopCounter + 1
-                    continue
-
-            verboselog("Starting ephemeris generation")
-            observations = create_ephemeris(orbits_df, filterpointing, args, sconfigs)
-            verboselog("Ephemeris generation completed")
-
-        verboselog("Start post processing for this chunk")
-        verboselog("Matching pointing database information to observations on rough camera footprint")
-
-        # If the ephemeris file doesn't have any observations for the objects in the chunk
-        # PPReadAllInput will return an empty dataframe. We thus log a warning.
-        if len(observations.index) == 0:
-            pplogger.info(
-                "WARNING: no ephemeris observations found for these objects. Skipping to next chunk..."
-            )
-            startChunk = startChunk + sconfigs.input.size_serial_chunk
-            loopCounter = loopCounter + 1
-            continue
-
-        observations = PPMatchPointingToObservations(observations, filterpointing)
-
-        verboselog("Calculating apparent magnitudes...")
-        observations = PPCalculateApparentMagnitude(
-            observations,
-            sconfigs.phasecurves.phase_function,
-            sconfigs.filters.mainfilter,
-            sconfigs.filters.othercolours,
-            sconfigs.filters.observing_filters,
-            sconfigs.activity.comet_activity,
-            lightcurve_choice=sconfigs.lightcurve.lc_model,
-            verbose=args.loglevel,
-        )
-
-        if sconfigs.expert.trailing_losses_on:
-            verboselog("Calculating trailing losses...")
-            dmagDetect = PPTrailingLoss(observations, "circularPSF")
-            observations["PSFMagTrue"] = dmagDetect + observations["trailedSourceMagTrue"]
-        else:
-            observations["PSFMagTrue"] = observations["trailedSourceMagTrue"]
-
-        if sconfigs.expert.vignetting_on:
-            verboselog("Calculating effects of vignetting on limiting magnitude...")
-            observations["fiveSigmaDepth_mag"] = PPVignetting.vignettingEffects(observations)
-        else:
-            verboselog(
-                "Vignetting turned OFF in config file. 5-sigma depth of field will be used for subsequent calculations."
-            )
-            observations["fiveSigmaDepth_mag"] = observations["fieldFiveSigmaDepth_mag"]
-
-        # Note that the below code creates trailedSourceMag and PSFMag
-        # as columns in the observations dataframe.
-        # These are the columns that should be used moving forward for filters etc.
-        # Do NOT use trailedSourceMagTrue or PSFMagTrue, these are the unrandomised magnitudes.
-        verboselog("Calculating astrometric and photometric uncertainties...")
-        observations = PPAddUncertainties.addUncertainties(
-            observations, sconfigs, args._rngs, verbose=args.loglevel
+    if args.workers > 1:
+        pplogger.info(f"Processing chunks with {args.workers} worker processes.")
+        results = process_chunks_in_parallel(chunks, filterpointing, footprint, args, sconfigs, pointings)
+    else:
+        results = (
+            process_chunk(chunk_index, chunk_df, filterpointing, footprint, args, sconfigs, pointings)
+            for chunk_index, chunk_df in chunks
         )
 
-        if sconfigs.expert.randomization_on:
-            verboselog(
-                "Number of rows BEFORE randomizing astrometry and photometry: " + str(len(observations.index))
-            )
-            observations = PPRandomizeMeasurements.randomizeAstrometryAndPhotometry(
-                observations, sconfigs, args._rngs, verbose=args.loglevel
-            )
-            verboselog(
-                "Number of rows AFTER randomizing astrometry and photometry: " + str(len(observations.index))
-            )
-        else:
-            verboselog(
-                "Randomization turned off in config file. No astrometric or photometric randomization performed."
-            )
-            verboselog(
-                "NOTE: new columns RATrue_deg and DecTrue_deg are EQUAL to columns RA_deg and Dec_deg."
-            )
-            verboselog(
-                "NOTE: columns trailedSourceMagTrue and PSFMagTrue are EQUAL to columns trailedSourceMag and PSFMag."
-            )
-            observations["RATrue_deg"] = observations["RA_deg"].copy()
-            observations["DecTrue_deg"] = observations["Dec_deg"].copy()
-            observations["trailedSourceMag"] = observations["trailedSourceMagTrue"].copy()
-            observations["PSFMag"] = observations["PSFMagTrue"].copy()
-
-        if sconfigs.fov.camera_model != "none" and len(observations.index) > 0:
-            verboselog("Applying field-of-view filters...")
-            verboselog("Number of rows BEFORE applying FOV filters: " + str(len(observations.index)))
-            observations = PPApplyFOVFilter(
-                observations, sconfigs, args._rngs, footprint=footprint, verbose=args.loglevel
-            )
-            verboselog("Number of rows AFTER applying FOV filters: " + str(len(observations.index)))
-
-        if sconfigs.expert.snr_limit_on and len(observations.index) > 0:
-            verboselog(
-                "Dropping observations with signal to noise ratio less than {}...".format(
-                    sconfigs.expert.snr_limit
+    try:
+        # The main process is the only writer: results arrive in chunk order no matter
+        # how many workers produced them, so the output matches a serial run.
+        for observations, ephemeris_df in results:
+            if ephemeris_df is not None:
+                verboselog("Writing out ephemeris results to file.")
+                write_out_ephemeris_file(
+                    ephemeris_df, os.path.join(args.outpath, args.output_ephemeris_file), args, sconfigs
                 )
-            )
-            verboselog("Number of rows BEFORE applying SNR limit filter: " + str(len(observations.index)))
-            observations = PPSNRLimit(observations, sconfigs.expert.snr_limit)
-            verboselog("Number of rows AFTER applying SNR limit filter: " + str(len(observations.index)))
-
-        if sconfigs.expert.mag_limit_on and len(observations.index) > 0:
-            verboselog("Dropping detections fainter than user-defined magnitude limit... ")
-            verboselog("Number of rows BEFORE applying mag limit filter: " + str(len(observations.index)))
-            observations = PPMagnitudeLimit(observations, sconfigs.expert.mag_limit)
-            verboselog("Number of rows AFTER applying mag limit filter: " + str(len(observations.index)))
-
-        if sconfigs.fadingfunction.fading_function_on and len(observations.index) > 0:
-            verboselog("Applying detection efficiency fading function...")
-            verboselog("Number of rows BEFORE applying fading function: " + str(len(observations.index)))
-            observations = PPFadingFunctionFilter(
-                observations,
-                sconfigs.fadingfunction.fading_function_peak_efficiency,
-                sconfigs.fadingfunction.fading_function_width,
-                args._rngs,
-                verbose=args.loglevel,
-            )
-            verboselog("Number of rows AFTER applying fading function: " + str(len(observations.index)))
-
-        if sconfigs.saturation.bright_limit_on and len(observations.index) > 0:
-            verboselog("Dropping observations that are too bright...")
-            verboselog("Number of rows BEFORE applying bright limit filter " + str(len(observations.index)))
-            observations = PPBrightLimit(
-                observations, sconfigs.filters.observing_filters, sconfigs.saturation.bright_limit
-            )
-            verboselog("Number of rows AFTER applying bright limit filter " + str(len(observations.index)))
-
-        if sconfigs.linkingfilter.ssp_linking_on and len(observations.index) > 0:
-            verboselog("Applying SSP linking filter...")
-            verboselog("Number of rows BEFORE applying SSP linking filter: " + str(len(observations.index)))
-            observations = PPLinkingFilter(
-                observations,
-                sconfigs.linkingfilter.ssp_detection_efficiency,
-                sconfigs.linkingfilter.ssp_number_observations,
-                sconfigs.linkingfilter.ssp_number_tracklets,
-                sconfigs.linkingfilter.ssp_track_window,
-                sconfigs.linkingfilter.ssp_separation_threshold,
-                sconfigs.linkingfilter.ssp_maximum_time,
-                sconfigs.linkingfilter.ssp_night_start_utc,
-                drop_unlinked=sconfigs.linkingfilter.drop_unlinked,
-            )
-            observations.reset_index(drop=True, inplace=True)
-            verboselog("Number of rows AFTER applying SSP linking filter: " + str(len(observations.index)))
-
-        # write output if chunk not empty
-        if len(observations.index) > 0:
-            pplogger.info("Post processing completed for this chunk")
-            pplogger.info("Outputting results for this chunk")
-            PPWriteOutput(args, sconfigs, observations, verbose=args.loglevel)
-            if args.stats is not None:
-                stats(observations, args.stats, args.outpath, sconfigs)
-        else:
-            verboselog("No observations left in chunk. No output will be written for this chunk.")
-
-        startChunk = startChunk + sconfigs.input.size_serial_chunk
-        loopCounter = loopCounter + 1
-        # end for
 
-    if sconfigs.output.output_format == "sqlite3" and os.path.isfile(
-        os.path.join(args.outpath, args.outfilestem + ".db")
-    ):
-        pplogger.info("Indexing output SQLite database...")
-        PPIndexSQLDatabase(os.path.join(args.outpath, args.outfilestem + ".db"))
+            # write output if chunk not empty
+            if observations is not None and len(observations.index) > 0:
+                pplogger.info("Post processing completed for this chunk")
+                pplogger.info("Outputting results for this chunk")
+                PPWriteOutput(args, sconfigs, observations, verbose=args.loglevel)
+                if args.stats is not None:
+                    stats(observations, args.stats, args.outpath, sconfigs)
+            elif observations is not None:
+                verboselog("No observations left in chunk. No output will be written for this chunk.")
+
+        if sconfigs.output.output_format == "sqlite3" and os.path.isfile(
+            os.path.join(args.outpath, args.outfilestem + ".db")
+        ):
+            pplogger.info("Indexing output SQLite database...")
+            PPIndexSQLDatabase(os.path.join(args.outpath, args.outfilestem + ".db"))
+    finally:
+        # the Parquet output and ephemeris files are finalized once all the chunks are
+        # written, or when the run stops early, so that they are still readable
+        PPCloseParquetWriters()
+        # a SQLite database left open by a run that stopped early is closed unindexed
+        PPCloseSqlite3Writers()
 
     pplogger.info("Sorcha process is completed.")
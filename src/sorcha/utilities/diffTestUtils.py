@@ -107,7 +107,7 @@ VERIFICATION_TRUTH = {
 }
 
 
-def override_seed_and_run(outpath, arg_set="baseline"):
+def override_seed_and_run(outpath, arg_set="baseline", workers=1):
     """Run the full Rubin sim on the demo data and a fixed seed.
 
     WARNING: Never use a fixed seed for scientific analysis. This is
@@ -123,6 +123,10 @@ def override_seed_and_run(outpath, arg_set="baseline"):
         "baseline"" run does not ephemeris generation. "with_ephemeeris" is a full end to end run
         of all main components of sorcha.
         Default = "baseline"
+
+    workers : int, optional
+        Number of worker processes used to process the chunks.
+        Default = 1
     """
 
     if arg_set == "baseline":
@@ -143,6 +147,7 @@ def override_seed_and_run(outpath, arg_set="baseline"):
     cmd_args_dict["outpath"] = outpath
 
     args = sorchaArguments(cmd_args_dict)
+    args.workers = workers
 
     # Override the random number generator seed.
     # WARNING: This is only acceptable in a test and should never be used for
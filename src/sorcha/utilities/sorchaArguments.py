@@ -37,6 +37,9 @@ class sorchaArguments:
     linking: bool = True
     """Turns on or off the rejection of unlinked sources"""
 
+    workers: int = 1
+    """number of worker processes used to process chunks in parallel"""
+
     _rngs = None
     """A collection of per-module random number generators"""
 
@@ -73,6 +76,7 @@ class sorchaArguments:
         self.ar_data_file_path = args.get("ar_data_path")
         self.loglevel = args["loglevel"]
         self.stats = args["stats"]
+        self.workers = args.get("workers", 1)
 
         self.surveyname = args["surveyname"]
 
@@ -85,14 +89,32 @@ class sorchaArguments:
         seed = args.get("seed", int.from_bytes(urandom(4), "big"))
         self._rngs = PerModuleRNG(seed, self.pplogger)
 
-    def validate_arguments(self):
+    def validate_arguments(self, ephemerides_type=None):
+        """
+        Checks that the files and directories supplied on the command line exist.
+
+        Parameters
+        -----------
+        ephemerides_type : string, optional
+            The ephemerides type of the config file. The ephemerides read with
+            -er/--ephem_read are a directory if it is "cheb", and a file otherwise.
+            Default is None.
+
+        Returns
+        ----------
+        None
+
+        """
         if not path.isfile(self.paramsinput):
             raise ValueError("File does not exist at path supplied for -p/--params argument.")
 
         if not path.isfile(self.orbinfile):
             raise ValueError("File does not exist at path supplied for -ob/--orbit argument.")
 
-        if self.input_ephemeris_file and not path.isfile(self.input_ephemeris_file):
+        if self.input_ephemeris_file and ephemerides_type == "cheb":
+            if not path.isdir(self.input_ephemeris_file):
+                raise ValueError("Directory does not exist at path supplied for -er/--ephem_read argument.")
+        elif self.input_ephemeris_file and not path.isfile(self.input_ephemeris_file):
             raise ValueError("File does not exist at path supplied for -er/--ephem_read argument.")
 
         if not path.isfile(self.configfile):
@@ -103,3 +125,6 @@ class sorchaArguments:
 
         if self.ar_data_file_path and not path.isdir(self.ar_data_file_path):
             raise ValueError("Directory does not exist at path supplied for -ar/--ar_data_path argument.")
+
+        if self.workers < 1:
+            raise ValueError("The number of worker processes supplied for -w/--workers must be at least 1.")
@@ -87,6 +87,7 @@ def sorchaCommandLineParser(args):
     cmd_args_dict["outfilestem"] = args.t
     cmd_args_dict["loglevel"] = args.l
     cmd_args_dict["stats"] = args.st
+    cmd_args_dict["workers"] = args.w
 
     if cmd_args_dict["stats"] is not None:
         warn_or_remove_file(
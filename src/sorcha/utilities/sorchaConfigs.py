@@ -28,6 +28,12 @@ class inputConfigs:
     pointing_sql_query: str = None
     """SQL query for extracting data from pointing database."""
 
+    eph_sorted: bool = False
+    """The external ephemeris file is grouped by ObjID in the order of the orbits file, and is read in a single pass."""
+
+    csv_index: bool = False
+    """Read the CSV and whitespace input files with byte-offset indexes of their rows, saved next to them (.sidx)."""
+
     def __post_init__(self):
         """Automagically validates the input configs after initialisation."""
         self._validate_input_configs()
@@ -52,10 +58,12 @@ class inputConfigs:
         check_key_exists(self.pointing_sql_query, "pointing_sql_query")
 
         # some additional checks to make sure they all make sense!
-        check_value_in_list(self.ephemerides_type, ["ar", "external"], "ephemerides_type")
-        check_value_in_list(self.eph_format, ["csv", "whitespace", "hdf5"], "eph_format")
-        check_value_in_list(self.aux_format, ["comma", "whitespace", "csv"], "aux_format")
+        check_value_in_list(self.ephemerides_type, ["ar", "external", "cheb"], "ephemerides_type")
+        check_value_in_list(self.eph_format, ["csv", "whitespace", "hdf5", "parquet"], "eph_format")
+        check_value_in_list(self.aux_format, ["comma", "whitespace", "csv", "parquet"], "aux_format")
         self.size_serial_chunk = cast_as_int(self.size_serial_chunk, "size_serial_chunk")
+        self.eph_sorted = cast_as_bool_or_set_default(self.eph_sorted, "eph_sorted", False)
+        self.csv_index = cast_as_bool_or_set_default(self.csv_index, "csv_index", False)
 
 
 @dataclass
@@ -80,6 +88,15 @@ class simulationConfigs:
     ar_n_sub_intervals: int = 101
     """Number of sub-intervals for the Lagrange ephemerides interpolation (default: 101)"""
 
+    ar_pointing_cache: str = None
+    """directory in which the precomputed pointing information is cached between runs (default: no cache)"""
+
+    ar_prepropagation_segment: float = None
+    """length (days) of the Chebyshev segments the orbits are pre-propagated into (default: no pre-propagation)"""
+
+    ar_prepropagation_tolerance: float = None
+    """position tolerance (au) of the pre-propagated orbits, from which their segments and degree are sized (default: 1e-9)"""
+
     _ephemerides_type: str = None
     """Simulation used for ephemeris input."""
 
@@ -101,8 +118,8 @@ class simulationConfigs:
         """
         # make sure all the mandatory keys have been populated.
         check_key_exists(self._ephemerides_type, "_ephemerides_type")
-        check_value_in_list(self._ephemerides_type, ["ar", "external"], "_ephemerides_type")
-        if self._ephemerides_type == "ar":
+        check_value_in_list(self._ephemerides_type, ["ar", "external", "cheb"], "_ephemerides_type")
+        if self._ephemerides_type in ["ar", "cheb"]:
             check_key_exists(self.ar_ang_fov, "ar_ang_fov")
             check_key_exists(self.ar_fov_buffer, "ar_fov_buffer")
             check_key_exists(self.ar_picket, "ar_picket")
@@ -115,6 +132,34 @@ class simulationConfigs:
             self.ar_picket = cast_as_int(self.ar_picket, "ar_picket")
             self.ar_healpix_order = cast_as_int(self.ar_healpix_order, "ar_healpix_order")
             self.ar_n_sub_intervals = cast_as_int(self.ar_n_sub_intervals, "ar_n_sub_intervals")
+            if self.ar_prepropagation_segment is not None:
+                self.ar_prepropagation_segment = cast_as_float(
+                    self.ar_prepropagation_segment, "ar_prepropagation_segment"
+                )
+                if self.ar_prepropagation_segment <= 0:
+                    logging.error("ERROR: ar_prepropagation_segment must be positive.")
+                    sys.exit("ERROR: ar_prepropagation_segment must be positive.")
+                if self.ar_prepropagation_tolerance is None:
+                    self.ar_prepropagation_tolerance = 1e-9
+                self.ar_prepropagation_tolerance = cast_as_float(
+                    self.ar_prepropagation_tolerance, "ar_prepropagation_tolerance"
+                )
+                if self.ar_prepropagation_tolerance <= 0:
+                    logging.error("ERROR: ar_prepropagation_tolerance must be positive.")
+                    sys.exit("ERROR: ar_prepropagation_tolerance must be positive.")
+            else:
+                check_key_doesnt_exist(
+                    self.ar_prepropagation_tolerance,
+                    "ar_prepropagation_tolerance",
+                    "but ar_prepropagation_segment is not",
+                )
+            if self._ephemerides_type == "cheb":
+                # the orbits are read from a store of pre-propagated orbits
+                check_key_doesnt_exist(
+                    self.ar_prepropagation_segment,
+                    "ar_prepropagation_segment",
+                    "but ephemerides type is cheb",
+                )
         elif self._ephemerides_type == "external":
             # makes sure when these are not needed that they are not populated
             check_key_doesnt_exist(self.ar_ang_fov, "ar_ang_fov", "but ephemerides type is external")
@@ -124,6 +169,19 @@ class simulationConfigs:
             check_key_doesnt_exist(
                 self.ar_healpix_order, "ar_healpix_order", "but ephemerides type is external"
             )
+            check_key_doesnt_exist(
+                self.ar_pointing_cache, "ar_pointing_cache", "but ephemerides type is external"
+            )
+            check_key_doesnt_exist(
+                self.ar_prepropagation_segment,
+                "ar_prepropagation_segment",
+                "but ephemerides type is external",
+            )
+            check_key_doesnt_exist(
+                self.ar_prepropagation_tolerance,
+                "ar_prepropagation_tolerance",
+                "but ephemerides type is external",
+            )
 
 
 @dataclass
@@ -585,6 +643,9 @@ class outputConfigs:
     magnitude_decimals: int = None
     """magnitude decimal places"""
 
+    parquet_compression: str = "snappy"
+    """compression codec of the Parquet output files"""
+
     def __post_init__(self):
         """Automagically validates the output configs after initialisation."""
         self._validate_output_configs()
@@ -606,7 +667,12 @@ class outputConfigs:
         check_key_exists(self.output_columns, "output_columns")
 
         # some additional checks to make sure they all make sense!
-        check_value_in_list(self.output_format, ["csv", "sqlite3", "hdf5"], "output_format")
+        check_value_in_list(self.output_format, ["csv", "sqlite3", "hdf5", "parquet"], "output_format")
+        check_value_in_list(
+            self.parquet_compression,
+            ["snappy", "zstd", "gzip", "brotli", "lz4", "none"],
+            "parquet_compression",
+        )
 
         if "," in self.output_columns:  # assume list of column names: turn into a list and strip whitespace
             self.output_columns = [colname.strip(" ") for colname in self.output_columns.split(",")]
@@ -735,6 +801,12 @@ class expertConfigs:
     brute_force: bool = None
     """brute-force ephemeris generation on all objects without running a first-pass"""
 
+    columnar_filtering: bool = None
+    """flag for applying the post-processing filters as a mask, copying the observations once"""
+
+    compact_dtypes: bool = None
+    """flag for storing the observations with categorical and float32 columns to save memory"""
+
     def __post_init__(self):
         """Automagically validates the expert configs after initialisation."""
         self._validate_expert_configs()
@@ -784,6 +856,10 @@ class expertConfigs:
         self.randomization_on = cast_as_bool_or_set_default(self.randomization_on, "randomization_on", True)
         self.vignetting_on = cast_as_bool_or_set_default(self.vignetting_on, "vignetting_on", True)
         self.brute_force = cast_as_bool_or_set_default(self.brute_force, "brute_force", True)
+        self.columnar_filtering = cast_as_bool_or_set_default(
+            self.columnar_filtering, "columnar_filtering", False
+        )
+        self.compact_dtypes = cast_as_bool_or_set_default(self.compact_dtypes, "compact_dtypes", False)
 
 
 @dataclass
@@ -1344,7 +1420,11 @@ def PrintConfigsToLog(sconfigs, cmd_args):
         pplogger.info("No cometary activity selected.")
 
     pplogger.info("Format of ephemerides file is: " + sconfigs.input.eph_format)
+    if sconfigs.input.ephemerides_type == "external" and sconfigs.input.eph_sorted:
+        pplogger.info("The ephemerides file is grouped by object in the order of the orbits file.")
     pplogger.info("Format of auxiliary files is: " + sconfigs.input.aux_format)
+    if sconfigs.input.csv_index:
+        pplogger.info("CSV and whitespace input files are read with row indexes (.sidx files).")
 
     pplogger.info("Pointing database path is: " + cmd_args.pointing_database)
     pplogger.info("Pointing database required query is: " + sconfigs.input.pointing_sql_query)
@@ -1438,6 +1518,16 @@ def PrintConfigsToLog(sconfigs, cmd_args):
     else:
         pplogger.info("The detection efficiency fading function is OFF.")
 
+    if sconfigs.expert.columnar_filtering:
+        pplogger.info(
+            "Columnar filtering is ON. The filters are applied as a mask and the surviving observations are copied once."
+        )
+
+    if sconfigs.expert.compact_dtypes:
+        pplogger.info(
+            "Compact column types are ON. Object IDs, filters and orbit formats are stored as categoricals, and rates, magnitudes and uncertainties as float32."
+        )
+
     if sconfigs.linkingfilter.ssp_linking_on:
         pplogger.info("Solar System Processing linking filter is turned ON.")
         pplogger.info("For SSP linking...")
@@ -1509,8 +1599,11 @@ def PrintConfigsToLog(sconfigs, cmd_args):
         + str(sconfigs.auxiliary.jpl_small_bodies)
     )
     pplogger.info("...the meta kernal file is : " + str(sconfigs.auxiliary.meta_kernel))
-    if sconfigs.input.ephemerides_type == "ar":
-        pplogger.info("ASSIST+REBOUND Simulation is turned ON.")
+    if sconfigs.input.ephemerides_type in ["ar", "cheb"]:
+        if sconfigs.input.ephemerides_type == "ar":
+            pplogger.info("ASSIST+REBOUND Simulation is turned ON.")
+        else:
+            pplogger.info("ASSIST+REBOUND orbits are read from a Chebyshev ephemeris store.")
         pplogger.info("For ASSIST+REBOUND...")
         pplogger.info("...the field's angular FOV is: " + str(sconfigs.simulation.ar_ang_fov))
         pplogger.info("...the buffer around the FOV is: " + str(sconfigs.simulation.ar_fov_buffer))
@@ -1518,6 +1611,17 @@ def PrintConfigsToLog(sconfigs, cmd_args):
         pplogger.info("...the observatory code is: " + str(sconfigs.simulation.ar_obs_code))
         pplogger.info("...the healpix order is: " + str(sconfigs.simulation.ar_healpix_order))
         pplogger.info("...the number of sub-intervals is: " + str(sconfigs.simulation.ar_n_sub_intervals))
+        if sconfigs.simulation.ar_pointing_cache:
+            pplogger.info("...the pointing cache directory is: " + str(sconfigs.simulation.ar_pointing_cache))
+        if sconfigs.simulation.ar_prepropagation_segment:
+            pplogger.info(
+                "...the orbits are pre-propagated in segments of (days): "
+                + str(sconfigs.simulation.ar_prepropagation_segment)
+            )
+            pplogger.info(
+                "...the tolerance of the pre-propagated orbits is (au): "
+                + str(sconfigs.simulation.ar_prepropagation_tolerance)
+            )
     else:
         pplogger.info("ASSIST+REBOUND Simulation is turned OFF.")
 
@@ -1531,6 +1635,8 @@ def PrintConfigsToLog(sconfigs, cmd_args):
         "Output files will be saved in path: " + cmd_args.outpath + " with filestem " + cmd_args.outfilestem
     )
     pplogger.info("Output files will be saved as format: " + sconfigs.output.output_format)
+    if sconfigs.output.output_format == "parquet" or sconfigs.input.eph_format == "parquet":
+        pplogger.info("Parquet files will be compressed with: " + sconfigs.output.parquet_compression)
     if sconfigs.output.position_decimals:
         pplogger.info(
             "In the output, positions will be rounded to "
@@ -5,14 +5,22 @@ import numpy as np
 class PerModuleRNG:
     """A collection of per-module random number generators."""
 
-    def __init__(self, base_seed, pplogger=None):
+    def __init__(self, base_seed, pplogger=None, chunk_index=0):
         """Parameters
         --------------
 
         base_seed : int
             The base seed for a random number generator
+
+        pplogger : logging.Logger, optional
+            The logger used to record the seeds. Default = None
+
+        chunk_index : int, optional
+            The index of the chunk of objects these generators are used for.
+            Chunk 0 uses the same seeds as an unchunked run. Default = 0
         """
         self._base_seed = base_seed
+        self._chunk_index = chunk_index
         self._rngs = {}
 
         self.pplogger = None
@@ -39,7 +47,8 @@ class PerModuleRNG:
         if module_name in self._rngs:
             return self._rngs[module_name]
 
-        hashed_name = hashlib.md5(module_name.encode())
+        seed_name = module_name if self._chunk_index == 0 else f"{module_name}_chunk{self._chunk_index}"
+        hashed_name = hashlib.md5(seed_name.encode())
         seed_offset = int(hashed_name.hexdigest(), base=16)
         module_seed = (self._base_seed + seed_offset) % (2**31)
         new_rng = np.random.default_rng(module_seed)
@@ -49,3 +58,24 @@ class PerModuleRNG:
             self.pplogger.info(f"the rng seed for the {module_name} module is {module_seed}")
 
         return new_rng
+
+    def getChunkRNGs(self, chunk_index):
+        """
+        Return a fresh collection of per-module random number generators for
+        one chunk of objects. The seeds depend only on the base seed, the module
+        name and the chunk index, so a chunk draws the same random numbers
+        whether it is processed serially or by a worker process.
+
+        Parameters
+        -----------
+        chunk_index : int
+            The index of the chunk of objects being processed.
+
+        Returns
+        ----------
+        rngs : PerModuleRNG
+            The per-module random number generators for this chunk.
+        """
+        chunk_rngs = PerModuleRNG(self._base_seed, chunk_index=chunk_index)
+        chunk_rngs.pplogger = self.pplogger
+        return chunk_rngs
@@ -0,0 +1,180 @@
+from sorcha_cmdline.sorchaargumentparser import SorchaArgumentParser
+
+#
+# sorcha ephemeris build
+#
+
+
+def cmd_ephemeris_build(args):  # pragma: no cover
+    #
+    # NOTE: DO NOT MOVE THESE IMPORTS TO THE TOP LEVEL OF THE MODULE !!!
+    #
+    #       Importing sorcha from the function and not at the top-level of the module
+    #       allows us to exit quickly and print the help/error message (in case there
+    #       was a mistake on the command line). Importing sorcha can take 5 seconds or
+    #       more, and making the user wait that long just to print out an erro message
+    #       is poor user experience.
+    #
+    from sorcha.ephemeris.chebyshev_store import build_chebyshev_store
+    from sorcha.readers.OrbitAuxReader import OrbitAuxReader, ParquetOrbitAuxReader
+    from sorcha.utilities.fileAccessUtils import FindFileOrExit, FindDirectoryOrExit
+    from sorcha.utilities.sorchaArguments import sorchaArguments
+    from sorcha.utilities.sorchaConfigs import sorchaConfigs
+    from sorcha.utilities.sorchaGetLogger import sorchaGetLogger
+    import os
+    import sys
+
+    args.output = os.path.abspath(args.output)
+    _ = FindFileOrExit(args.config, "-c, --config")
+    _ = FindFileOrExit(args.orbits, "--ob, --orbits")
+    _ = FindDirectoryOrExit(os.path.dirname(args.output), "-o, --output")
+    if args.ar_data_path:
+        _ = FindDirectoryOrExit(args.ar_data_path, "--ar, --ar-data-path")
+
+    if os.path.exists(args.output) and not os.path.isdir(args.output):
+        sys.exit(f"ERROR: {args.output} exists and is not a directory. Choose another -o, --output.")
+    elif os.path.exists(args.output) and not args.force:
+        print(
+            "Chebyshev ephemeris store already found at {}. Re-run with --force argument to overwrite it.".format(
+                args.output
+            )
+        )
+        return
+
+    pplogger = sorchaGetLogger(os.path.dirname(args.output), os.path.basename(args.output))
+    pplogger.info("Sorcha ephemeris build start")
+
+    sconfigs = sorchaConfigs(args.config, args.survey)
+
+    sargs = sorchaArguments()
+    sargs.orbinfile = args.orbits
+    sargs.ar_data_file_path = args.ar_data_path
+
+    if sconfigs.input.aux_format == "parquet":
+        orbits_reader = ParquetOrbitAuxReader(args.orbits)
+    else:
+        orbits_reader = OrbitAuxReader(
+            args.orbits, sconfigs.input.aux_format, use_index=sconfigs.input.csv_index
+        )
+
+    build_chebyshev_store(
+        orbits_reader,
+        sargs,
+        sconfigs,
+        args.start,
+        args.end,
+        args.output,
+        segment_length=args.segment_length,
+        degree=args.degree,
+        tolerance=args.tolerance,
+        overwrite=args.force,
+    )
+    pplogger.info(f"Chebyshev ephemeris store written to {args.output}")
+
+
+#
+# sorcha ephemeris
+#
+
+
+def main():
+    # Create the top-level parser
+    parser = SorchaArgumentParser(prog="sorcha ephemeris", description="Sorcha ephemeris utility")
+    subparsers = parser.add_subparsers(
+        title="commands", description="Available commands", help="Command to execute", dest="command"
+    )
+
+    # Add the `build` subcommand
+    ephemeris_build_parser = subparsers.add_parser(
+        "build",
+        help="Integrate a population of orbits once and store their Chebyshev ephemerides, to be reused by runs with ephemerides_type = cheb.",
+    )
+    ephemeris_build_parser.set_defaults(func=cmd_ephemeris_build)
+
+    ephemeris_build_parser.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        required=True,
+        help="Input configuration file name. The orbit format, chunk size and auxiliary files are read from it.",
+    )
+    ephemeris_build_parser.add_argument(
+        "--ob",
+        "--orbits",
+        type=str,
+        dest="orbits",
+        required=True,
+        help="Orbit catalog file name",
+    )
+    ephemeris_build_parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        required=True,
+        help="Directory of the Chebyshev ephemeris store to create.",
+    )
+    ephemeris_build_parser.add_argument(
+        "--start",
+        type=float,
+        required=True,
+        help="Start of the time window covered by the store (MJD TDB). Should precede the first pointing by at least 2 * ar_picket + 1 days.",
+    )
+    ephemeris_build_parser.add_argument(
+        "--end",
+        type=float,
+        required=True,
+        help="End of the time window covered by the store (MJD TDB). Should follow the last pointing by at least 2 * ar_picket + 1 days.",
+    )
+    ephemeris_build_parser.add_argument(
+        "--segment-length",
+        type=float,
+        default=8.0,
+        help="Length (days) of the segments the orbits are sampled on. Default 8.",
+    )
+    ephemeris_build_parser.add_argument(
+        "--degree",
+        type=int,
+        default=14,
+        help="Degree of the Chebyshev polynomials the orbits are sampled with. Default 14.",
+    )
+    ephemeris_build_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1e-9,
+        help="Position tolerance (au) from which the segment length and degree stored for each chunk of objects are sized. Default 1e-9 (about 150 m).",
+    )
+    ephemeris_build_parser.add_argument(
+        "--ar",
+        "--ar-data-path",
+        type=str,
+        dest="ar_data_path",
+        default=None,
+        help="Directory path where Assist+Rebound data files where stored when running bootstrap_sorcha_data_files from the command line.",
+    )
+    ephemeris_build_parser.add_argument(
+        "-s",
+        "--survey",
+        type=str,
+        default="rubin_sim",
+        help="Survey to simulate. Default rubin_sim.",
+    )
+    ephemeris_build_parser.add_argument(
+        "-f",
+        "--force",
+        default=False,
+        action="store_true",
+        help="Force overwrite existing Chebyshev ephemeris store, once the new one is written. Default is False.",
+    )
+
+    # Parse the command-line arguments
+    args = parser.parse_args()
+
+    # Call the appropriate function based on the subcommand
+    if hasattr(args, "func"):
+        args.func(args)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
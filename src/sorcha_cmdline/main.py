@@ -35,6 +35,7 @@ def main():
         "   init      Initialize a new simulation\n"
         "   run       Run a simulation\n"
         "   outputs   Manipulate/package sorcha outputs\n"
+        "   ephemeris Build reusable ephemerides of a population of orbits\n"
         "   demo      Set up a demo simulation\n"
         "   bootstrap Download datafiles required to run sorcha\n"
         "   cite      Outputs the citation to a file\n"
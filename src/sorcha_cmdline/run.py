@@ -58,7 +58,7 @@ def main():
     optional.add_argument(
         "--er",
         "--ephem-read",
-        help="Previously generated ephemeris simulation file name, required if ephemerides_type in config file is 'external'.",
+        help="Previously generated ephemeris simulation file name, required if ephemerides_type in config file is 'external', or Chebyshev ephemeris store built by `sorcha ephemeris build`, required if it is 'cheb'.",
         type=str,
         dest="er",
         required=False,
@@ -120,6 +120,15 @@ def main():
         default=None,
     )
 
+    optional.add_argument(
+        "-w",
+        "--workers",
+        help="Number of worker processes used to process chunks of objects in parallel.",
+        type=int,
+        dest="w",
+        default=1,
+    )
+
     args = parser.parse_args()
 
     return execute(args)
@@ -167,6 +176,14 @@ def execute(args):
         pplogger.error("ERROR: A+R simulation not enabled and no ephemerides file provided")
         sys.exit("ERROR: A+R simulation not enabled and no ephemerides file provided")
 
+    if sconfigs.input.ephemerides_type == "cheb" and cmd_args["input_ephemeris_file"] is None:
+        pplogger.error("ERROR: ephemerides type is cheb and no Chebyshev ephemeris store provided")
+        sys.exit("ERROR: ephemerides type is cheb and no Chebyshev ephemeris store provided")
+
+    if sconfigs.input.ephemerides_type == "cheb" and not os.path.isdir(cmd_args["input_ephemeris_file"]):
+        pplogger.error("ERROR: ephemerides type is cheb and the Chebyshev ephemeris store is not a directory")
+        sys.exit("ERROR: ephemerides type is cheb and the Chebyshev ephemeris store is not a directory")
+
     if sconfigs.lightcurve.lc_model and cmd_args["complex_physical_parameters"] is None:
         pplogger.error("ERROR: No complex physical parameter file provided for light curve model")
         sys.exit("ERROR: No complex physical parameter file provided for light curve model")
@@ -185,7 +202,7 @@ def execute(args):
             pplogger.error(err)
             sys.exit(err)
         try:
-            args.validate_arguments()
+            args.validate_arguments(sconfigs.input.ephemerides_type)
         except Exception as err:
             pplogger.error(err)
             sys.exit(err)
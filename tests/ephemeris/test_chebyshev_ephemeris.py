@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from sorcha.ephemeris.chebyshev_ephemeris import ChebyshevEphemeris, chebyshev_basis, chebyshev_nodes
+from sorcha.ephemeris.simulation_geometry import get_particle_states_at, integrate_light_time_batch
+
+from test_simulation_geometry import ORBITS, make_simulation
+
+
+def make_sim_dict(orbits):
+    sim, ex = make_simulation(orbits)
+    return {f"o{i}": {"sim": sim, "ex": ex, "index": i + 1} for i in range(len(orbits))}
+
+
+def test_chebyshev_basis():
+    x = np.linspace(-1, 1, 7)
+    t, dt = chebyshev_basis(x, 5)
+
+    for j in range(6):
+        coeffs = np.zeros(j + 1)
+        coeffs[j] = 1
+        np.testing.assert_allclose(t[:, j], np.polynomial.chebyshev.chebval(x, coeffs), atol=1e-14)
+        np.testing.assert_allclose(
+            dt[:, j], np.polynomial.chebyshev.chebval(x, np.polynomial.chebyshev.chebder(coeffs)), atol=1e-13
+        )
+
+    assert np.all(np.diff(chebyshev_nodes(5)) > 0)
+
+
+def test_chebyshev_ephemeris():
+    orbit_ephemeris = ChebyshevEphemeris.from_simulations(make_sim_dict(ORBITS), 100.0, 200.0, tolerance=None)
+
+    assert orbit_ephemeris.t_start == 100.0
+    assert orbit_ephemeris.t_end >= 200.0
+    assert list(orbit_ephemeris.designations) == [f"o{i}" for i in range(len(ORBITS))]
+    assert orbit_ephemeris.truncation_error().max() < 1e-10
+
+    objects = np.arange(len(ORBITS))
+    for t in [100.0, 123.456, 171.2, 199.99]:
+        sim, ex = make_simulation(ORBITS)
+        r, v = get_particle_states_at(sim, ex, t, objects + 1)
+        r_cheb, v_cheb = orbit_ephemeris.get_states(objects, t)
+
+        # ~1 m and ~1 mm/s
+        np.testing.assert_allclose(r_cheb, r, rtol=0, atol=1e-11)
+        np.testing.assert_allclose(v_cheb, v, rtol=0, atol=1e-9)
+
+    with pytest.raises(ValueError):
+        orbit_ephemeris.get_states(objects, 99.0)
+
+
+def test_chebyshev_light_time():
+    r_obs = np.array([0.9, 0.4, 0.0])
+    t = 123.4
+    orbit_ephemeris = ChebyshevEphemeris.from_simulations(make_sim_dict(ORBITS), 100.0, 200.0, tolerance=None)
+
+    objects = np.array([3, 0, 2])
+    rho, rho_mag, lt, r_ast, v_ast = orbit_ephemeris.integrate_light_time(objects, t, r_obs, lt0=0.01)
+
+    desigs = [f"o{i}" for i in objects]
+    expected = integrate_light_time_batch(make_sim_dict(ORBITS), desigs, t, r_obs, lt0=0.01)
+    np.testing.assert_allclose(rho, expected[0], rtol=0, atol=1e-11)
+    np.testing.assert_allclose(lt, expected[2], rtol=1e-9)
+    np.testing.assert_allclose(v_ast, expected[4], rtol=0, atol=1e-9)
+
+
+def test_chebyshev_tolerance():
+    full = ChebyshevEphemeris.from_simulations(make_sim_dict(ORBITS), 100.0, 1000.0, tolerance=None)
+    orbit_ephemeris = ChebyshevEphemeris.from_simulations(
+        make_sim_dict(ORBITS), 100.0, 1000.0, tolerance=1e-9
+    )
+
+    # the segments are lengthened and the degree lowered, within the tolerance
+    assert orbit_ephemeris.t_end >= 1000.0
+    assert orbit_ephemeris.segment_length > full.segment_length
+    assert orbit_ephemeris.degree < full.degree
+    assert orbit_ephemeris.nbytes < full.nbytes / 4
+
+    objects = np.arange(len(ORBITS))
+    for t in np.linspace(100.0, 1000.0, 37):
+        r, v = full.get_states(objects, t)
+        r_tol, v_tol = orbit_ephemeris.get_states(objects, t)
+        np.testing.assert_allclose(r_tol, r, rtol=0, atol=1e-9)
+        np.testing.assert_allclose(v_tol, v, rtol=0, atol=1e-9)
+
+    # resampling onto the same segments and degree changes nothing
+    same = full.resampled(full.t_start, full.segment_length, full.coeffs.shape[1], full.degree)
+    np.testing.assert_allclose(same.coeffs, full.coeffs, rtol=0, atol=1e-13)
@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+from sorcha.ephemeris.chebyshev_ephemeris import ChebyshevEphemeris
+from sorcha.ephemeris.chebyshev_store import ChebyshevEphemerisStore, write_chebyshev_store
+
+from test_simulation_geometry import ORBITS, make_simulation
+
+
+def make_chunk(orbits, names, t_start=100.0, t_end=200.0, tolerance=None):
+    sim, ex = make_simulation(orbits)
+    sim_dict = {name: {"sim": sim, "ex": ex, "index": i + 1} for i, name in enumerate(names)}
+    return ChebyshevEphemeris.from_simulations(
+        sim_dict, t_start, t_end, segment_length=8.0, degree=10, tolerance=tolerance
+    )
+
+
+def test_chebyshev_store(tmp_path):
+    jd_ref = 2451545.0
+    chunks = [make_chunk(ORBITS[:2], ["b", "d"]), make_chunk(ORBITS[2:], ["c", "a"])]
+    store_path = tmp_path / "store"
+    write_chebyshev_store(store_path, chunks, jd_ref, {"orbits": "orbits.csv"})
+
+    store = ChebyshevEphemerisStore(store_path)
+    assert len(store) == 4
+    assert store.jd_start == 100.0 + jd_ref
+    assert [chunk["degree"] for chunk in store.chunks] == [10, 10]
+    assert store.metadata["orbits"] == "orbits.csv"
+
+    # read a subset of the objects, in another order, over part of the window and in
+    # the time frame of another reference time
+    names = ["a", "d", "c"]
+    expected = {"b": (chunks[0], 0), "d": (chunks[0], 1), "c": (chunks[1], 0), "a": (chunks[1], 1)}
+    orbit_ephemeris = store.read(names, jd_ref + 10.0, jd_ref + 130.0, jd_ref + 150.0)
+    assert list(orbit_ephemeris.designations) == names
+    assert orbit_ephemeris.coeffs.shape[1] < chunks[0].coeffs.shape[1]
+    assert orbit_ephemeris.t_start <= 120.0 and orbit_ephemeris.t_end >= 140.0
+
+    for t in [120.0, 131.3, 140.0]:
+        r, v = orbit_ephemeris.get_states(np.arange(3), t)
+        for i, name in enumerate(names):
+            chunk, index = expected[name]
+            r_chunk, v_chunk = chunk.get_states([index], t + 10.0)
+            np.testing.assert_allclose(r[i], r_chunk[0], rtol=0, atol=1e-15)
+            np.testing.assert_allclose(v[i], v_chunk[0], rtol=0, atol=1e-15)
+
+    with pytest.raises(ValueError):
+        store.read(["a", "e"], jd_ref)
+
+    with pytest.raises(ValueError):
+        store.read(["a"], jd_ref, jd_ref + 90.0, jd_ref + 150.0)
+
+
+def test_chebyshev_store_layouts(tmp_path):
+    jd_ref = 2451545.0
+
+    # the distant objects are stored in longer segments, of lower degree
+    chunks = [
+        make_chunk(ORBITS[:1], ["a"], t_end=400.0, tolerance=1e-9),
+        make_chunk(ORBITS[3:], ["b"], t_end=400.0, tolerance=1e-9),
+    ]
+    assert chunks[0].segment_length < chunks[1].segment_length
+    assert chunks[0].degree > chunks[1].degree
+    store_path = tmp_path / "store"
+    write_chebyshev_store(store_path, chunks, jd_ref)
+
+    store = ChebyshevEphemerisStore(store_path)
+    assert store.jd_end == chunks[0].t_end + jd_ref
+
+    # the objects of both chunks are read with the segments and degree of the first
+    orbit_ephemeris = store.read(["b", "a"], jd_ref, jd_ref + 150.0, jd_ref + 250.0)
+    assert orbit_ephemeris.segment_length == chunks[0].segment_length
+    assert orbit_ephemeris.degree == chunks[0].degree
+    for t in [150.0, 201.7, 250.0]:
+        r, v = orbit_ephemeris.get_states([0, 1], t)
+        for i, chunk in enumerate([chunks[1], chunks[0]]):
+            r_chunk, v_chunk = chunk.get_states([0], t)
+            np.testing.assert_allclose(r[i], r_chunk[0], rtol=0, atol=1e-13)
+            np.testing.assert_allclose(v[i], v_chunk[0], rtol=0, atol=1e-13)
+
+
+def test_chebyshev_store_errors(tmp_path):
+    jd_ref = 2451545.0
+
+    with pytest.raises(ValueError):
+        write_chebyshev_store(
+            tmp_path / "duplicates",
+            [make_chunk(ORBITS[:2], ["a", "b"]), make_chunk(ORBITS[2:], ["b", "c"])],
+            jd_ref,
+        )
+
+    with pytest.raises(ValueError):
+        write_chebyshev_store(
+            tmp_path / "windows",
+            [make_chunk(ORBITS[:2], ["a", "b"]), make_chunk(ORBITS[2:], ["c", "d"], t_start=101.0)],
+            jd_ref,
+        )
+
+    # nothing is left behind
+    assert list(tmp_path.iterdir()) == []
+
+    # nor when the chunks stop coming, for example on a keyboard interrupt
+    def interrupted_chunks():
+        yield make_chunk(ORBITS[:2], ["a", "b"])
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        write_chebyshev_store(tmp_path / "interrupted", interrupted_chunks(), jd_ref)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chebyshev_store_overwrite(tmp_path):
+    jd_ref = 2451545.0
+    store_path = tmp_path / "store"
+    write_chebyshev_store(store_path, [make_chunk(ORBITS[:2], ["a", "b"])], jd_ref)
+
+    # an existing store is not replaced unless asked to
+    with pytest.raises(ValueError):
+        write_chebyshev_store(store_path, [make_chunk(ORBITS[2:], ["c", "d"])], jd_ref)
+
+    # nor when the new one is not completed
+    def interrupted_chunks():
+        yield make_chunk(ORBITS[2:], ["c", "d"])
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        write_chebyshev_store(store_path, interrupted_chunks(), jd_ref, overwrite=True)
+
+    assert list(tmp_path.iterdir()) == [store_path]
+    assert ChebyshevEphemerisStore(store_path).index_designations.tolist() == ["a", "b"]
+
+    write_chebyshev_store(store_path, [make_chunk(ORBITS[2:], ["c", "d"])], jd_ref, overwrite=True)
+    assert list(tmp_path.iterdir()) == [store_path]
+    assert ChebyshevEphemerisStore(store_path).index_designations.tolist() == ["c", "d"]
+
+    # a file is never taken for a store
+    file_path = tmp_path / "file"
+    file_path.write_text("")
+    with pytest.raises(ValueError):
+        write_chebyshev_store(file_path, [make_chunk(ORBITS[:2], ["a", "b"])], jd_ref, overwrite=True)
@@ -11,7 +11,7 @@ from sorcha.ephemeris.simulation_setup import (
     furnish_spiceypy,
 )
 
-from sorcha.ephemeris.pixel_dict import PixelDict
+from sorcha.ephemeris.pixel_dict import PixelDict, csr_gather
 from sorcha.ephemeris.simulation_parsing import Observatory
 from sorcha.ephemeris.simulation_geometry import ecliptic_to_equatorial, vec2ra_dec
 from sorcha.ephemeris.simulation_constants import SPEED_OF_LIGHT, AU_KM
@@ -117,10 +117,10 @@ def test_pixeldict(tmp_path):
     reference /= np.linalg.norm(reference)
 
     # now let's query our object
-    unit_vec = pixdict.interpolate_unit_vectors(pixdict.sim_dict.keys(), 54800.0 + 2400000.5)
+    unit_vec = pixdict.interpolate_unit_vectors(np.arange(len(pixdict.designations)), 54800.0 + 2400000.5)
 
     # note this also means that the predicted RA/Dec are equal
-    assert np.isclose(np.linalg.norm(reference - unit_vec["6"]), 0)
+    assert np.isclose(np.linalg.norm(reference - unit_vec[list(pixdict.designations).index("6")]), 0)
 
     pixdict.compute_pixel_traversed()
 
@@ -129,7 +129,7 @@ def test_pixeldict(tmp_path):
 
     # check if lists are subsets of each other
     crossed = []
-    for i in pixdict.pixel_dict:
+    for i in pixdict.pixels:
         assert i in pixels
         crossed.append(i)
     for i in pixels:
@@ -138,7 +138,7 @@ def test_pixeldict(tmp_path):
     # use proper ra/dec to try and recover the object
     obj = pixdict.get_designations(54800.0 + 2400000.5, 39.81424, -0.18774, 2)
 
-    assert "6" in obj
+    assert "6" in pixdict.designations[obj]
 
     # finally, let's test the Lagrange interpolation
     # with a really simple construction:
@@ -159,3 +159,13 @@ def test_pixeldict(tmp_path):
 
     assert Lp[0, 0] == 0
     assert Lp[1, 0] == 0
+
+
+def test_csr_gather():
+    # rows: [0, 1], [], [2], [3, 4, 5]
+    offsets = np.array([0, 2, 2, 3, 6])
+    values = np.array([10, 11, 12, 13, 14, 15])
+
+    assert csr_gather(offsets, values, np.array([3, 0])).tolist() == [13, 14, 15, 10, 11]
+    assert csr_gather(offsets, values, np.array([1, 2])).tolist() == [12]
+    assert csr_gather(offsets, values, np.array([], dtype=int)).tolist() == []
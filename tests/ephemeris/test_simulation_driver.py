@@ -1,7 +1,15 @@
 import pytest
 import numpy as np
 import pandas as pd
-from sorcha.ephemeris.simulation_driver import calculate_rates_and_geometry, EphemerisGeometryParameters
+from sorcha.ephemeris.simulation_setup import create_pointing_arrays
+from sorcha.ephemeris.simulation_driver import (
+    calculate_rates_and_geometry,
+    calculate_rates_and_geometry_batch,
+    get_residual_vectors,
+    EphemerisGeometryParameters,
+    EphemerisColumns,
+    EPHEMERIS_COLUMNS,
+)
 
 
 def test_calculate_rates_and_geometry():
@@ -77,3 +85,64 @@ def test_calculate_rates_and_geometry():
     )
 
     assert np.allclose(output_tuple[1:], expected_tuple[1:])
+
+    # the batched version gives the same values for every object of the pointing
+    other_params = EphemerisGeometryParameters()
+    other_params.obj_id = "S100cuR2b"
+    other_params.mjd_tai = ephem_geom_params.mjd_tai
+    other_params.rho = np.asarray([1.13883859, -1.69558594, -0.84141702])
+    other_params.rho_mag = np.linalg.norm(other_params.rho)
+    other_params.rho_hat = other_params.rho / other_params.rho_mag
+    other_params.r_ast = np.asarray([2.12134111, -1.5666382, -0.78530195])
+    other_params.v_ast = np.asarray([0.00508846, 0.00685226, 0.00387886])
+
+    batch_params = EphemerisGeometryParameters()
+    batch_params.obj_id = [ephem_geom_params.obj_id, other_params.obj_id]
+    batch_params.mjd_tai = ephem_geom_params.mjd_tai
+    for name in ["rho", "rho_mag", "rho_hat", "r_ast", "v_ast"]:
+        setattr(batch_params, name, np.array([getattr(ephem_geom_params, name), getattr(other_params, name)]))
+
+    pointings = create_pointing_arrays(pointing_df.assign(observationMidpointMJD_TAI=60218.98462644687))
+    batch_output = calculate_rates_and_geometry_batch(pointings, 0, batch_params)
+    other_tuple = calculate_rates_and_geometry(single_pointing, other_params)
+
+    assert len(batch_output) == len(expected_tuple)
+    assert list(batch_output[0]) == ["S100cuR2a", "S100cuR2b"]
+    assert np.allclose([column[0] for column in batch_output[1:]], expected_tuple[1:])
+    assert np.allclose([column[1] for column in batch_output[1:]], other_tuple[1:])
+
+
+def test_get_residual_vectors():
+    vectors = np.array([[0.55586947, -0.71594276, -0.42241579], [0.6, 0.0, 0.8], [0.0, -1.0, 0.0]])
+
+    A, D = get_residual_vectors(vectors)
+
+    for i, v in enumerate(vectors):
+        A_i, D_i = get_residual_vectors(v)
+        assert np.allclose(A[i], A_i)
+        assert np.allclose(D[i], D_i)
+
+        # (A, D, v) is an orthonormal basis
+        basis = np.array([A_i, D_i, v])
+        assert np.allclose(basis @ basis.T, np.eye(3))
+
+
+def test_ephemeris_columns():
+    ephemeris_columns = EphemerisColumns(capacity=2)
+
+    rows = [(f"obj{i}", 100 + i) + tuple(float(i * 100 + j) for j in range(21)) for i in range(5)]
+    ephemeris_columns.append_rows(tuple(np.array(column) for column in zip(*rows[:1])))
+    ephemeris_columns.append_rows(tuple(np.array(column) for column in zip(*rows[1:])))
+
+    ephemeris_df = ephemeris_columns.to_dataframe()
+
+    assert ephemeris_df.columns.tolist() == list(EPHEMERIS_COLUMNS)
+    assert len(ephemeris_df) == 5
+    assert ephemeris_df["ObjID"].tolist() == ["obj0", "obj1", "obj2", "obj3", "obj4"]
+    assert ephemeris_df["FieldID"].dtype == np.int64
+    assert ephemeris_df["FieldID"].tolist() == [100, 101, 102, 103, 104]
+    assert np.array_equal(ephemeris_df.iloc[:, 2:].to_numpy(), np.array([row[2:] for row in rows]))
+
+    empty_df = EphemerisColumns().to_dataframe()
+    assert empty_df.columns.tolist() == list(EPHEMERIS_COLUMNS)
+    assert len(empty_df) == 0
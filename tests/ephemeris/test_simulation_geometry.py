@@ -0,0 +1,210 @@
+import numpy as np
+import pytest
+import rebound
+import spiceypy as spice
+from types import SimpleNamespace
+
+from sorcha.ephemeris.simulation_geometry import (
+    ObservatoryEphemeris,
+    earth_rotation_angle,
+    get_hp_neighbors,
+    get_hp_neighbors_many,
+    get_particle_states,
+    get_particle_states_at,
+    integrate_light_time,
+    integrate_light_time_batch,
+    integrate_light_time_particles,
+)
+
+
+class TwoBodyExtras:
+    # Stands in for the ASSIST extras: moves a plain REBOUND simulation to the requested time.
+    def __init__(self, sim):
+        self.sim = sim
+
+    def integrate_or_interpolate(self, t):
+        self.sim.integrate(t, exact_finish_time=1)
+
+
+def make_simulation(orbits):
+    sim = rebound.Simulation()
+    sim.G = 0.01720209895**2
+    sim.add(m=1.0)
+    sim.N_active = 1
+    sim.ri_ias15.adaptive_mode = 1
+    for a, e, inc, M in orbits:
+        sim.add(primary=sim.particles[0], a=a, e=e, inc=inc, M=M)
+    return sim, TwoBodyExtras(sim)
+
+
+ORBITS = [(1.2, 0.3, 0.1, 0.5), (2.7, 0.1, 0.2, 2.0), (3.1, 0.05, 0.05, 4.0), (44.0, 0.1, 0.3, 1.0)]
+
+
+def test_get_particle_states():
+    times = 100.0 - np.array([0.0, 0.004, 0.13, 0.25])
+    indices = np.arange(1, len(ORBITS) + 1)
+
+    sim, ex = make_simulation(ORBITS)
+    r, v = get_particle_states(sim, ex, times, indices)
+
+    for i, t in enumerate(times):
+        sim_i, ex_i = make_simulation(ORBITS)
+        r_i, v_i = get_particle_states_at(sim_i, ex_i, t, [indices[i]])
+        np.testing.assert_allclose(r[i], r_i[0], rtol=0, atol=1e-13)
+        np.testing.assert_allclose(v[i], v_i[0], rtol=0, atol=1e-13)
+
+
+def test_get_particle_states_at_direct_read():
+    # many more particles than those read, so they are read one by one
+    orbits = [ORBITS[i % len(ORBITS)] for i in range(600)]
+    indices = np.array([599, 3, 17])
+
+    sim, ex = make_simulation(orbits)
+    r, v = get_particle_states_at(sim, ex, 100.0, indices)
+
+    r_all = np.empty((sim.N, 3))
+    v_all = np.empty((sim.N, 3))
+    sim.serialize_particle_data(xyz=r_all, vxvyvz=v_all)
+    np.testing.assert_array_equal(r, r_all[indices])
+    np.testing.assert_array_equal(v, v_all[indices])
+
+
+def test_integrate_light_time_particles_edges():
+    r_obs = np.array([0.9, 0.4, 0.0])
+    indices = np.arange(1, len(ORBITS) + 1)
+
+    class CountingExtras(TwoBodyExtras):
+        def __init__(self, sim):
+            super().__init__(sim)
+            self.times = []
+
+        def integrate_or_interpolate(self, t):
+            self.times.append(t)
+            super().integrate_or_interpolate(t)
+
+    sim, _ = make_simulation(ORBITS)
+    ex = CountingExtras(sim)
+    rho, rho_mag, lt, r_ast, v_ast = integrate_light_time_particles(sim, ex, 123.4, r_obs, indices, lt0=0.01)
+
+    # the edges of the intervals are shared between the iterations, and integrated once
+    assert len(ex.times) == len(set(ex.times))
+
+    for i, index in enumerate(indices):
+        sim_i, ex_i = make_simulation(ORBITS)
+        expected = integrate_light_time(sim_i, ex_i, 123.4, r_obs, lt0=0.01, index=index)
+        np.testing.assert_allclose(rho[i], expected[0], rtol=0, atol=1e-12)
+        np.testing.assert_allclose(lt[i], expected[2], rtol=1e-12)
+
+
+def test_integrate_light_time_batch():
+    r_obs = np.array([0.9, 0.4, 0.0])
+    t = 123.4
+
+    # two simulations, as generate_simulations builds for two different epochs
+    sim_a, ex_a = make_simulation(ORBITS[:2])
+    sim_b, ex_b = make_simulation(ORBITS[2:])
+    sim_dict = {
+        "a0": {"sim": sim_a, "ex": ex_a, "index": 1},
+        "a1": {"sim": sim_a, "ex": ex_a, "index": 2},
+        "b0": {"sim": sim_b, "ex": ex_b, "index": 1},
+        "b1": {"sim": sim_b, "ex": ex_b, "index": 2},
+    }
+    desigs = ["b1", "a0", "b0", "a1"]
+
+    rho, rho_mag, lt, r_ast, v_ast = integrate_light_time_batch(sim_dict, desigs, t, r_obs, lt0=0.01)
+
+    for i, k in enumerate(desigs):
+        orbit = ORBITS[2 * (k[0] == "b") + int(k[1])]
+        sim, ex = make_simulation([orbit])
+        expected = integrate_light_time(sim, ex, t, r_obs, lt0=0.01, index=1)
+
+        np.testing.assert_allclose(rho[i], expected[0], rtol=0, atol=1e-12)
+        np.testing.assert_allclose(rho_mag[i], expected[1], rtol=1e-12)
+        np.testing.assert_allclose(lt[i], expected[2], rtol=1e-12)
+        np.testing.assert_allclose(r_ast[i], expected[3], rtol=0, atol=1e-12)
+        np.testing.assert_allclose(v_ast[i], expected[4], rtol=0, atol=1e-12)
+
+
+def test_get_hp_neighbors_many():
+    ra = np.array([0.0, 39.8, 180.0, 310.5])
+    dec = np.array([-89.0, -0.2, 45.0, 12.0])
+
+    pixels, offsets = get_hp_neighbors_many(ra, dec, 2.1, nside=64, nested=True)
+
+    assert len(offsets) == len(ra) + 1
+    for i in range(len(ra)):
+        expected = get_hp_neighbors(ra[i], dec[i], 2.1, nside=64, nested=True)
+        np.testing.assert_array_equal(pixels[offsets[i] : offsets[i + 1]], expected)
+
+
+def rotation(axis, angle):
+    c, s = np.cos(angle), np.sin(angle)
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    rot = np.eye(3)
+    rot[i, i], rot[i, j], rot[j, i], rot[j, j] = c, -s, s, c
+    return rot
+
+
+class SyntheticEarth:
+    # Stands in for the SPICE Earth ephemeris and orientation: a circular orbit with a monthly
+    # wobble, and a rotation with precession, nutation and polar motion terms.
+    def spkezr(self, target, et, frame, abcorr, observer):
+        t = et / 86400
+        n, n_moon = 2 * np.pi / 365.25, 2 * np.pi / 27.32
+        pos = [
+            1.496e8 * np.cos(n * t) + 4671 * np.cos(n_moon * t),
+            1.496e8 * np.sin(n * t) + 4671 * np.sin(n_moon * t),
+            0,
+        ]
+        vel = [
+            -1.496e8 * n * np.sin(n * t) - 4671 * n_moon * np.sin(n_moon * t),
+            1.496e8 * n * np.cos(n * t) + 4671 * n_moon * np.cos(n_moon * t),
+            0,
+        ]
+        return np.concatenate([pos, np.array(vel) / 86400]), 0.0
+
+    def pxform(self, frame_from, frame_to, et):
+        t = et / 86400
+        return (
+            rotation(0, 0.409 + 1e-7 * t + 4e-8 * np.sin(2 * np.pi * t / 13.66))
+            @ rotation(2, earth_rotation_angle(et - 69.0))
+            @ rotation(0, 1.5e-6 * np.sin(2 * np.pi * t / 433))
+            @ rotation(1, 1e-6 * np.cos(2 * np.pi * t / 433))
+        )
+
+    def sxform(self, frame_from, frame_to, et):
+        d = 30.0
+        m = self.pxform(frame_from, frame_to, et)
+        dm = (
+            8 * (self.pxform(frame_from, frame_to, et + d) - self.pxform(frame_from, frame_to, et - d))
+            - (self.pxform(frame_from, frame_to, et + 2 * d) - self.pxform(frame_from, frame_to, et - 2 * d))
+        ) / (12 * d)
+        xform = np.zeros((6, 6))
+        xform[0:3, 0:3], xform[3:6, 3:6], xform[3:6, 0:3] = m, m, dm
+        return xform
+
+
+def test_observatory_ephemeris(monkeypatch):
+    earth = SyntheticEarth()
+    monkeypatch.setattr(spice, "spkezr", earth.spkezr)
+    monkeypatch.setattr(spice, "sxform", earth.sxform)
+    observatories = SimpleNamespace(ObservatoryXYZ={"X05": (0.86, -0.35, -0.37)})
+
+    et_start = 7.5e8
+    observatory_ephemeris = ObservatoryEphemeris(observatories, "X05", et_start, et_start + 10 * 86400)
+
+    et = et_start + np.random.default_rng(2024).uniform(0, 10 * 86400, 200)
+    pos, vel = observatory_ephemeris.barycentricObservatoryRates(et)
+
+    obs_vec = np.array(observatories.ObservatoryXYZ["X05"]) * 6378.137
+    for i, et_i in enumerate(et):
+        state, _ = earth.spkezr("EARTH", et_i, "J2000", "NONE", "SSB")
+        xform = earth.sxform("ITRF93", "J2000", et_i)
+        # documented bound: a few cm in position
+        np.testing.assert_allclose(pos[i], state[0:3] + xform[0:3, 0:3] @ obs_vec, rtol=0, atol=5e-5)
+        np.testing.assert_allclose(vel[i], state[3:6] + xform[3:6, 0:3] @ obs_vec, rtol=0, atol=1e-8)
+
+    np.testing.assert_array_equal(observatory_ephemeris.barycentricObservatory(et[0], "X05"), pos[0])
+
+    with pytest.raises(ValueError):
+        observatory_ephemeris.barycentricObservatory(et_start - 1.0)
@@ -28,3 +28,31 @@ def test_observatory_for_moving_observatories():
     obs = observatory.ObservatoryXYZ
 
     assert obs["250"] == (None, None, None)
+
+
+def test_mjd_tai_to_jd_tdb():
+    import spiceypy as spice
+
+    # the TDB - TT model of the leapseconds kernel, put directly in the SPICE kernel pool
+    spice.kclear()
+    spice.pdpool("DELTET/DELTA_T_A", [32.184])
+    spice.pdpool("DELTET/K", [1.657e-3])
+    spice.pdpool("DELTET/EB", [1.671e-2])
+    spice.pdpool("DELTET/M", [6.239996, 1.99096871e-7])
+    spice.pdpool("DELTET/DELTA_AT", [10, -867931158.816])
+
+    mjd_tai = np.array([53005.0, 59853.98348, 60218.98462644687, 61000.123456789, 63652.5])
+    jd_tdb = sp.mjd_tai_to_jd_tdb(mjd_tai)
+
+    for mjd, jd in zip(mjd_tai, jd_tdb):
+        tt = (mjd - 51544.5) * 86400 + 32.184
+        expected = spice.j2000() + spice.unitim(tt, "TDT", "TDB") / 86400
+        assert np.abs(jd - expected) * 86400 < 1e-6
+
+        epoch_str = "JD %.10f TDT" % (mjd + 2400000.5 + 32.184 / 86400)
+        expected = spice.j2000() + spice.str2et(epoch_str) / 86400
+        assert np.abs(jd - expected) * 86400 < 1e-4
+
+        assert sp.mjd_tai_to_epoch(mjd) == jd
+
+    spice.kclear()
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+
+from sorcha.ephemeris.simulation_geometry import ObservatoryEphemeris
+from sorcha.ephemeris.simulation_setup import (
+    PointingArrays,
+    load_pointing_cache,
+    pointing_cache_key,
+    save_pointing_cache,
+)
+from sorcha.utilities.sorchaConfigs import auxiliaryConfigs
+
+
+def make_configs(query="SELECT * FROM observations"):
+    return SimpleNamespace(
+        input=SimpleNamespace(pointing_sql_query=query),
+        filters=SimpleNamespace(observing_filters=["r", "g"]),
+        simulation=SimpleNamespace(ar_obs_code="X05", ar_ang_fov=2.06, ar_healpix_order=6, ar_picket=1),
+        auxiliary=auxiliaryConfigs(),
+    )
+
+
+def test_pointing_cache_key(tmp_path):
+    db = tmp_path / "pointings.db"
+    db.write_bytes(b"some pointings")
+    args = SimpleNamespace(pointing_database=str(db), ar_data_file_path=str(tmp_path))
+
+    key = pointing_cache_key(args, make_configs())
+
+    assert key == pointing_cache_key(args, make_configs())
+    assert key != pointing_cache_key(args, make_configs("SELECT * FROM observations LIMIT 10"))
+
+    db.write_bytes(b"other pointings")
+    assert key != pointing_cache_key(args, make_configs())
+
+
+def test_pointing_cache_key_data_files(tmp_path):
+    import os
+
+    db = tmp_path / "pointings.db"
+    db.write_bytes(b"some pointings")
+    first_path, second_path = tmp_path / "first", tmp_path / "second"
+    first_path.mkdir()
+    second_path.mkdir()
+    configs = make_configs()
+
+    args = SimpleNamespace(pointing_database=str(db), ar_data_file_path=str(first_path))
+    key = pointing_cache_key(args, configs)
+
+    # the same file names in another data directory are other kernels
+    other_args = SimpleNamespace(pointing_database=str(db), ar_data_file_path=str(second_path))
+    assert key != pointing_cache_key(other_args, configs)
+
+    # a kernel appearing or being replaced changes the key
+    kernel = first_path / configs.auxiliary.ordered_kernel_files[0]
+    kernel.write_bytes(b"kernel")
+    with_kernel = pointing_cache_key(args, configs)
+    assert key != with_kernel
+
+    os.utime(kernel, ns=(0, 0))
+    assert with_kernel != pointing_cache_key(args, configs)
+
+
+def test_pointing_cache(tmp_path):
+    n = 5
+    rng = np.random.default_rng(2024)
+    pointings = PointingArrays(
+        field_id=np.arange(n, dtype=np.int64),
+        jd_tdb=rng.uniform(2460000, 2460100, n),
+        visit_vector=rng.normal(size=(n, 3)),
+        r_obs=rng.normal(size=(n, 3)),
+        v_obs=rng.normal(size=(n, 3)),
+        r_sun=rng.normal(size=(n, 3)),
+        v_sun=rng.normal(size=(n, 3)),
+        disc_pixels=np.arange(12, dtype=np.int64),
+        disc_offsets=np.array([0, 2, 4, 7, 9, 12], dtype=np.int64),
+    )
+    tables = {
+        "obs_vec": rng.normal(size=3),
+        "et": np.arange(4) * 10800.0,
+        "earth_pos": rng.normal(size=(4, 3)),
+        "earth_vel": rng.normal(size=(4, 3)),
+        "slow_rot": rng.normal(size=(4, 3, 3)),
+        "slow_rot_rate": rng.normal(size=(4, 3, 3)),
+    }
+    pointings.observatory = ObservatoryEphemeris.from_tables("X05", tables)
+    pointings_df = pd.DataFrame(
+        {
+            "FieldID": np.arange(n),
+            "observationMidpointMJD_TAI": rng.uniform(60000, 60100, n),
+            "fieldRA_deg": rng.uniform(0, 360, n),
+            "fieldDec_deg": rng.uniform(-90, 90, n),
+        }
+    )
+
+    assert load_pointing_cache(pointings_df, str(tmp_path), "abc") is None
+
+    save_pointing_cache(pointings, str(tmp_path), "abc")
+    cached = load_pointing_cache(pointings_df, str(tmp_path), "abc", "X05")
+
+    np.testing.assert_array_equal(cached.jd_tdb, pointings.jd_tdb)
+    np.testing.assert_array_equal(cached.r_sun, pointings.r_sun)
+    np.testing.assert_array_equal(cached.get_disc_pixels(2), [4, 5, 6])
+    np.testing.assert_array_equal(cached.ra, pointings_df["fieldRA_deg"])
+    np.testing.assert_array_equal(pointings_df["fieldJD_TDB"], pointings.jd_tdb)
+    np.testing.assert_array_equal(pointings_df["v_obs_y"], pointings.v_obs[:, 1])
+    np.testing.assert_array_equal(
+        cached.observatory.barycentricObservatory([100.0, 20000.0], "X05"),
+        pointings.observatory.barycentricObservatory([100.0, 20000.0], "X05"),
+    )
+
+    # a cache written for other pointings is not used
+    assert load_pointing_cache(pointings_df.iloc[1:], str(tmp_path), "abc") is None
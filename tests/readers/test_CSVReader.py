@@ -90,6 +90,24 @@ def test_CSVDataReader_ephem(use_cache):
     assert_equal("S000021", ephem_data.iloc[0].values[0])
 
 
+@pytest.mark.parametrize("use_cache", [True, False])
+@pytest.mark.parametrize(
+    "filename, sep", [("ephemtestoutput.csv", "csv"), ("PPReadAllInput_params.txt", "whitespace")]
+)
+def test_CSVDataReader_iterate_rows(use_cache, filename, sep):
+    """Test that reading a file in consecutive blocks gives the same rows as reading it at once."""
+    csv_reader = CSVDataReader(get_test_filepath(filename), sep, cache_table=use_cache)
+    all_rows = csv_reader.read_rows()
+
+    blocks = list(csv_reader.iterate_rows(4))
+    assert [len(block) for block in blocks[:-1]] == [4] * (len(blocks) - 1)
+    assert_frame_equal(pd.concat(blocks, ignore_index=True), all_rows.reset_index(drop=True))
+
+    blocks = list(csv_reader.iterate_rows())
+    assert len(blocks) == 1
+    assert_frame_equal(blocks[0].reset_index(drop=True), all_rows.reset_index(drop=True))
+
+
 def test_CSVDataReader_ephemeris_header():
     """Test that we can read in the ephemeris data from a CSV when the header is NOT at row 0."""
     csv_reader = CSVDataReader(get_test_filepath("ephemtestoutput_comment.csv"), "csv")
@@ -421,3 +439,44 @@ def test_CSVDataReader_blank_lines():
         reader2 = CSVDataReader(file_name, sep="csv", cache_table=False)
         with pytest.raises(SystemExit):
             _ = reader2.read_objects(["1", "2"])
+
+
+@pytest.mark.parametrize(
+    "filename, sep", [("ephemtestoutput_comment.csv", "csv"), ("PPReadAllInput_params.txt", "whitespace")]
+)
+def test_CSVDataReader_index(tmp_path, filename, sep):
+    """Test that reading with the byte-offset index gives the same rows as parsing the file."""
+    file_name = str(tmp_path / filename)
+    with open(get_test_filepath(filename)) as f_in, open(file_name, "w") as f_out:
+        f_out.write(f_in.read())
+
+    reader = CSVDataReader(file_name, sep)
+    index_reader = CSVDataReader(file_name, sep, use_index=True)
+
+    for block_start, block_size in [(0, None), (0, 3), (2, 4), (7, 5), (100, 2)]:
+        assert_frame_equal(
+            index_reader.read_rows(block_start, block_size), reader.read_rows(block_start, block_size)
+        )
+    assert os.path.isfile(file_name + ".sidx")
+
+    all_rows = reader.read_rows()
+    obj_ids = all_rows["ObjID"].unique()
+    for ids in [obj_ids[:1], obj_ids[::2], obj_ids[-2:]]:
+        expected = all_rows[all_rows["ObjID"].isin(ids)].reset_index(drop=True)
+        assert_frame_equal(index_reader.read_objects(ids), expected)
+    assert len(index_reader.read_objects(["not_an_object"])) == 0
+
+    # The index is read back from disk.
+    index_reader2 = CSVDataReader(file_name, sep, use_index=True)
+    index_reader2._build_index = None
+    assert_frame_equal(index_reader2.read_rows(1, 2), reader.read_rows(1, 2))
+
+    # The index is rebuilt when the file changes.
+    n_rows = len(reader.read_rows())
+    with open(file_name, "a") as f_out:
+        f_out.write(
+            "extra_object" + (", 1" if sep == "csv" else " 1") * (len(reader.read_rows().columns) - 1)
+        )
+    index_reader3 = CSVDataReader(file_name, sep, use_index=True)
+    assert index_reader3.read_objects(["extra_object"])["ObjID"].tolist() == ["extra_object"]
+    assert len(index_reader3.read_rows()) == n_rows + 1
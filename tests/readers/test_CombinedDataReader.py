@@ -1,3 +1,4 @@
+import pandas as pd
 import pytest
 from numpy.testing import assert_equal
 
@@ -151,6 +152,54 @@ def test_CombinedDataReader_ephem():
     assert err.type == SystemExit
 
 
+@pytest.mark.parametrize("block_size", [1, 3, 5, 20])
+def test_CombinedDataReader_sorted_ephem(block_size):
+    def make_reader(ephem_sorted):
+        reader = CombinedDataReader(ephem_sorted=ephem_sorted)
+        reader.add_ephem_reader(EphemerisDataReader(get_test_filepath("PPReadAllInput_ephem.txt"), "csv"))
+        reader.add_aux_data_reader(
+            OrbitAuxReader(get_test_filepath("PPReadAllInput_orbits.des"), "whitespace")
+        )
+        reader.add_aux_data_reader(
+            CSVDataReader(get_test_filepath("PPReadAllInput_params.txt"), "whitespace")
+        )
+        return reader
+
+    # The ephemeris file is grouped by object in the order of the orbits file, so
+    # streaming it gives the same blocks as searching it for the objects of each block.
+    reader = make_reader(False)
+    sorted_reader = make_reader(True)
+    n_rows = 0
+    while True:
+        res_df = reader.read_block(block_size=block_size)
+        sorted_df = sorted_reader.read_block(block_size=block_size)
+        if res_df is None:
+            assert sorted_df is None
+            break
+
+        # (the empty blocks of the two readers differ in the types of their columns)
+        pd.testing.assert_frame_equal(sorted_df, res_df.reset_index(drop=True), check_dtype=len(res_df) > 0)
+        n_rows += len(sorted_df)
+    assert n_rows == 668
+
+
+def test_CombinedDataReader_sorted_ephem_fail(tmp_path):
+    # Reverse the order of the objects in the ephemeris file.
+    ephem_df = EphemerisDataReader(get_test_filepath("PPReadAllInput_ephem.txt"), "csv").read_rows()
+    ephem_df = ephem_df.iloc[::-1]
+    ephem_df.to_csv(tmp_path / "ephem.csv", index=False)
+
+    reader = CombinedDataReader(ephem_sorted=True)
+    reader.add_ephem_reader(EphemerisDataReader(str(tmp_path / "ephem.csv"), "csv"))
+    reader.add_aux_data_reader(OrbitAuxReader(get_test_filepath("PPReadAllInput_orbits.des"), "whitespace"))
+    reader.add_aux_data_reader(CSVDataReader(get_test_filepath("PPReadAllInput_params.txt"), "whitespace"))
+
+    with pytest.raises(SystemExit) as e1:
+        while reader.read_block(block_size=5) is not None:
+            pass
+    assert "are not grouped by object" in e1.value.code
+
+
 def test_CombinedDataReader_fail():
     # No ephemeris reader
     reader1 = CombinedDataReader()
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from numpy.testing import assert_equal
+from pandas.testing import assert_frame_equal
+
+from sorcha.readers.CSVReader import CSVDataReader
+from sorcha.readers.EphemerisReader import EphemerisDataReader
+from sorcha.readers.OrbitAuxReader import OrbitAuxReader, ParquetOrbitAuxReader
+from sorcha.readers.ParquetReader import ParquetDataReader
+from sorcha.utilities.dataUtilitiesForTests import get_test_filepath
+
+
+def write_parquet(tmp_path, filename, sep="csv", row_group_size=2):
+    """Converts a test file to a Parquet file with small row groups."""
+    table = CSVDataReader(get_test_filepath(filename), sep).read_rows()
+    parquet_filename = str(tmp_path / (filename.split("/")[-1].split(".")[0] + ".parquet"))
+    pq.write_table(
+        pa.Table.from_pandas(table, preserve_index=False), parquet_filename, row_group_size=row_group_size
+    )
+    return table, parquet_filename
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_ParquetDataReader_read_rows(tmp_path, use_cache):
+    expected, filename = write_parquet(tmp_path, "ephemtestoutput.csv")
+    reader = ParquetDataReader(filename, cache_table=use_cache)
+    assert reader.get_reader_info() == "ParquetDataReader:" + filename
+
+    assert_frame_equal(reader.read_rows(), expected)
+
+    # blocks within a row group, across row groups and past the end of the file
+    for block_start, block_size in [(3, 1), (3, 4), (4, 2), (7, 5), (9, 3), (12, None)]:
+        ephem_data = reader.read_rows(block_start, block_size)
+        assert_frame_equal(
+            ephem_data, expected.iloc[block_start:][:block_size], check_dtype=len(ephem_data) > 0
+        )
+
+
+@pytest.mark.parametrize("block_size", [None, 1, 4, 9, 20])
+def test_ParquetDataReader_iterate_rows(tmp_path, block_size):
+    expected, filename = write_parquet(tmp_path, "ephemtestoutput.csv")
+    reader = ParquetDataReader(filename)
+
+    blocks = list(reader.iterate_rows(block_size))
+    assert all(len(block) <= (block_size or len(expected)) for block in blocks)
+    assert_frame_equal(pd.concat(blocks), expected)
+
+
+def test_ParquetDataReader_read_objects(tmp_path):
+    expected, filename = write_parquet(tmp_path, "ephemtestoutput.csv")
+    reader = ParquetDataReader(filename)
+
+    ephem_data = reader.read_objects(["S000015", "S000044"])
+    expected_objects = expected[expected["ObjID"].isin(["S000015", "S000044"])].reset_index(drop=True)
+    assert_frame_equal(ephem_data, expected_objects)
+
+    assert len(reader.read_objects(["S999999"])) == 0
+
+    reader._build_id_map()
+    assert list(reader.obj_id_table["ObjID"]) == list(expected["ObjID"])
+
+
+def test_ParquetDataReader_integer_ids(tmp_path):
+    # the ObjIDs of a Parquet file keep their type, and are matched to the string IDs used by Sorcha
+    table = pd.DataFrame({"ObjID": [5, 7, 11, 13], "H_r": [15.0, 16.0, 17.0, 18.0]})
+    filename = str(tmp_path / "params.parquet")
+    table.to_parquet(filename, index=False, row_group_size=2)
+
+    reader = ParquetDataReader(filename)
+    params = reader.read_objects(["7", "13"])
+    assert list(params["ObjID"]) == ["7", "13"]
+    assert_equal(params["H_r"].values, [16.0, 18.0])
+
+
+def test_ParquetDataReader_columns(tmp_path):
+    expected, filename = write_parquet(tmp_path, "ephemtestoutput.csv")
+    reader = ParquetDataReader(filename, columns=["RA_deg", "Dec_deg"])
+
+    columns = ["ObjID", "RA_deg", "Dec_deg"]
+    assert_frame_equal(reader.read_rows(2, 3), expected[columns].iloc[2:5])
+    assert_frame_equal(pd.concat(reader.iterate_rows(4)), expected[columns])
+    assert_equal(list(reader.read_objects(["S000015"]).columns), columns)
+
+
+def test_EphemerisDataReader_parquet(tmp_path):
+    expected, filename = write_parquet(tmp_path, "ephemtestoutput.csv")
+    reader = EphemerisDataReader(filename, "parquet")
+    assert reader.get_reader_info() == "EphemerisDataReader|ParquetDataReader:" + filename
+    assert len(reader.read_rows()) == len(expected)
+
+
+def test_ParquetOrbitAuxReader(tmp_path):
+    expected, filename = write_parquet(tmp_path, "testorb.csv")
+    reader = ParquetOrbitAuxReader(filename)
+    assert reader.get_reader_info() == "ParquetOrbitAuxReader:" + filename
+    assert_frame_equal(
+        reader.read_rows(), OrbitAuxReader(get_test_filepath("testorb.csv"), "csv").read_rows()
+    )
+
+    # the orbits are validated as for the other formats
+    _, filename = write_parquet(tmp_path, "orbit_test_files/orbit_com_wrong_cols.csv")
+    with pytest.raises(SystemExit):
+        ParquetOrbitAuxReader(filename).read_rows()
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from numpy.testing import assert_equal, assert_almost_equal
+from numpy.testing import assert_equal, assert_almost_equal, assert_allclose
 
 from sorcha.utilities.sorchaModuleRNG import PerModuleRNG
 from sorcha.utilities.dataUtilitiesForTests import get_test_filepath
@@ -45,6 +45,24 @@ def test_PPGetSeparation():
     return
 
 
+def test_PPGetSeparation_astropy():
+    from astropy.coordinates import SkyCoord
+    from sorcha.modules.PPApplyFOVFilter import PPGetSeparation
+
+    rng = np.random.default_rng(2021)
+    obj_RA, cen_RA = rng.uniform(0, 360, (2, 1000))
+    obj_Dec, cen_Dec = rng.uniform(-90, 90, (2, 1000))
+    # including separations of a few milliarcseconds
+    cen_RA[:10], cen_Dec[:10] = obj_RA[:10] + 1e-6, obj_Dec[:10] - 1e-6
+
+    expected = (
+        SkyCoord(ra=obj_RA, dec=obj_Dec, unit="deg")
+        .separation(SkyCoord(ra=cen_RA, dec=cen_Dec, unit="deg"))
+        .degree
+    )
+    assert_allclose(PPGetSeparation(obj_RA, obj_Dec, cen_RA, cen_Dec), expected, rtol=1e-12, atol=1e-12)
+
+
 def test_PPApplyFOVFilters():
     from sorcha.modules.PPApplyFOVFilter import PPApplyFOVFilter
     from sorcha.modules.PPFootprintFilter import Footprint
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+from types import SimpleNamespace
+from pandas.testing import assert_frame_equal
+
+from sorcha.modules.PPApplyFOVFilter import PPApplyFOVFilter
+from sorcha.modules.PPApplyFilterMasks import PPApplyFilterMasks
+from sorcha.modules.PPBrightLimit import PPBrightLimit
+from sorcha.modules.PPFadingFunctionFilter import PPFadingFunctionFilter
+from sorcha.modules.PPFootprintFilter import Footprint
+from sorcha.modules.PPSNRLimit import PPSNRLimit
+from sorcha.utilities.dataUtilitiesForTests import get_test_filepath
+from sorcha.utilities.sorchaConfigs import fovConfigs
+from sorcha.utilities.sorchaModuleRNG import PerModuleRNG
+
+
+def make_configs(fov):
+    return SimpleNamespace(
+        fov=fovConfigs(**fov),
+        expert=SimpleNamespace(snr_limit_on=True, snr_limit=5.0, mag_limit_on=False),
+        fadingfunction=SimpleNamespace(
+            fading_function_on=True, fading_function_peak_efficiency=1.0, fading_function_width=0.3
+        ),
+        saturation=SimpleNamespace(bright_limit_on=True, bright_limit=[16.5, 17.0, 17.0, 16.5]),
+        filters=SimpleNamespace(observing_filters=["g", "r", "i", "z"]),
+    )
+
+
+@pytest.mark.parametrize(
+    "fov",
+    [
+        {"camera_model": "circle", "circle_radius": 1.8, "fill_factor": 0.9},
+        {
+            "camera_model": "footprint",
+            "footprint_path": get_test_filepath("detectors_corners.csv"),
+            "footprint_edge_threshold": 2,
+        },
+        {"camera_model": "none"},
+    ],
+)
+def test_PPApplyFilterMasks(fov):
+    # the masked filters keep the same observations as the filters applied one after the other
+    observations = pd.read_csv(get_test_filepath("test_input_fullobs.csv")).drop(columns="detectorID")
+    sconfigs = make_configs(fov)
+    footprint = Footprint(sconfigs.fov.footprint_path) if fov["camera_model"] == "footprint" else None
+
+    rngs = PerModuleRNG(2021)
+    expected = observations.copy()
+    if fov["camera_model"] != "none":
+        expected = PPApplyFOVFilter(expected, sconfigs, rngs, footprint=footprint)
+    expected = PPSNRLimit(expected, sconfigs.expert.snr_limit)
+    expected = PPFadingFunctionFilter(expected, 1.0, 0.3, rngs)
+    expected = PPBrightLimit(expected, sconfigs.filters.observing_filters, sconfigs.saturation.bright_limit)
+
+    result = PPApplyFilterMasks(observations, sconfigs, PerModuleRNG(2021), footprint=footprint)
+
+    assert 0 < len(result) < len(observations)
+    assert_frame_equal(result, expected)
+
+
+def test_PPApplyFilterMasks_footprint_only():
+    # with no filter that resets the index, the observations keep their row labels
+    observations = pd.read_csv(get_test_filepath("test_input_fullobs.csv")).drop(columns="detectorID")
+    sconfigs = make_configs(
+        {
+            "camera_model": "footprint",
+            "footprint_path": get_test_filepath("detectors_corners.csv"),
+            "footprint_edge_threshold": 2,
+        }
+    )
+    sconfigs.expert.snr_limit_on = False
+    sconfigs.fadingfunction.fading_function_on = False
+    sconfigs.saturation.bright_limit_on = False
+    footprint = Footprint(sconfigs.fov.footprint_path)
+
+    expected = PPApplyFOVFilter(observations.copy(), sconfigs, PerModuleRNG(2021), footprint=footprint)
+    result = PPApplyFilterMasks(observations, sconfigs, PerModuleRNG(2021), footprint=footprint)
+
+    assert 0 < len(result) < len(observations)
+    assert result.index[-1] > len(result) - 1
+    assert_frame_equal(result, expected)
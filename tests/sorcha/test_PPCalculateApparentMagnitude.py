@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+import pytest
 from numpy.testing import assert_almost_equal, assert_equal
 from sorcha.modules.PPCalculateApparentMagnitudeInFilter import PPCalculateApparentMagnitudeInFilter
 
@@ -170,6 +171,25 @@ def test_PPApplyColourOffsets():
     assert_equal(func_test_2["GS"].values, [0.151, 0.155, 0.153, 0.154, 0.121, 0.125, 0.124, 0.123])
 
 
+def test_PPSelectFilterColumns():
+    from sorcha.modules.PPApplyColourOffsets import PPSelectFilterColumns
+
+    test_obs = pd.DataFrame(
+        {
+            "optFilter": pd.Categorical(["r", "g", "i", "g", "r"]),
+            "G1r": [0.1, 0.2, 0.3, 0.4, 0.5],
+            "G1g": [1.1, 1.2, 1.3, 1.4, 1.5],
+            "G1i": [2.1, 2.2, 2.3, 2.4, 2.5],
+        }
+    )
+
+    values = PPSelectFilterColumns(test_obs, ["g", "r", "i"], ["G1g", "G1r", "G1i"])
+    assert_equal(values, [0.1, 1.2, 2.3, 1.4, 0.5])
+
+    with pytest.raises(KeyError):
+        PPSelectFilterColumns(test_obs, ["g", "r"], ["G1g", "G1r"])
+
+
 def test_PPCalculateApparentMagnitude():
     from sorcha.modules.PPCalculateApparentMagnitude import PPCalculateApparentMagnitude
 
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from numpy.testing import assert_allclose
+from pandas.testing import assert_frame_equal
+
+from sorcha.modules.PPCompactDtypes import PPCompactDtypes, PPExpandCompactDtypes
+from sorcha.utilities.dataUtilitiesForTests import get_test_filepath
+
+
+def test_PPCompactDtypes():
+    observations = pd.read_csv(get_test_filepath("test_input_fullobs.csv"))
+    observations["ObjID"] = observations["ObjID"].astype("string")
+    original = observations.copy()
+
+    observations = PPCompactDtypes(observations)
+
+    for column in ["ObjID", "optFilter", "FORMAT"]:
+        assert observations[column].dtype == "category"
+        assert list(observations[column]) == list(original[column])
+
+    for column in ["trailedSourceMag", "PSFMagSigma", "RARateCosDec_deg_day", "SNR"]:
+        assert observations[column].dtype == np.float32
+        assert_allclose(observations[column], original[column], rtol=1e-6)
+
+    # positions and times are not converted
+    for column in ["RA_deg", "Dec_deg", "fieldMJD_TAI"]:
+        assert observations[column].dtype == np.float64
+
+    assert observations.memory_usage(deep=True).sum() < original.memory_usage(deep=True).sum()
+
+    # converting again only converts new columns
+    observations["PSFMagTrue"] = original["PSFMagTrue"]
+    observations = PPCompactDtypes(observations)
+    assert observations["PSFMagTrue"].dtype == np.float32
+
+
+def test_PPExpandCompactDtypes():
+    observations = pd.read_csv(get_test_filepath("test_input_fullobs.csv"))
+    observations["ObjID"] = observations["ObjID"].astype("string")
+    original = observations.copy()
+
+    observations = PPExpandCompactDtypes(PPCompactDtypes(observations))
+
+    assert_frame_equal(observations[["ObjID", "FORMAT"]], original[["ObjID", "FORMAT"]])
+    assert observations["optFilter"].dtype == "category"
@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+import pytest
 from numpy.testing import assert_equal, assert_almost_equal
 
 from sorcha.utilities.dataUtilitiesForTests import get_test_filepath
@@ -235,6 +236,43 @@ def test_applyFootprint():
     )
 
 
+@pytest.mark.parametrize("edge_thresh", [None, 2.0])
+def test_applyFootprint_grid(edge_thresh):
+    from sorcha.modules.PPFootprintFilter import Footprint, radec_to_focal_plane
+
+    # the detections found through the grid are those found by testing every detector
+    rng = np.random.default_rng(2024)
+    n = 20000
+    fieldRA, fieldDec = rng.uniform(0, 360, n), rng.uniform(-80, 80, n)
+    observations = pd.DataFrame(
+        {
+            "RA_deg": fieldRA + rng.uniform(-2.2, 2.2, n) / np.cos(np.radians(fieldDec)),
+            "Dec_deg": fieldDec + rng.uniform(-2.2, 2.2, n),
+            "fieldRA_deg": fieldRA,
+            "fieldDec_deg": fieldDec,
+            "fieldRotSkyPos_deg": rng.uniform(0, 360, n),
+        }
+    )
+
+    footprintf = Footprint()
+    onSensor, detectorIDs = footprintf.applyFootprint(observations, edge_thresh=edge_thresh)
+
+    points = np.array(
+        radec_to_focal_plane(
+            *np.radians(
+                observations[
+                    ["RA_deg", "Dec_deg", "fieldRA_deg", "fieldDec_deg", "fieldRotSkyPos_deg"]
+                ].values.T
+            )
+        )
+    )
+    expected = [detector.ison(points, edge_thresh=edge_thresh) for detector in footprintf.detectors]
+
+    assert len(onSensor) > n / 3
+    assert_equal(onSensor, np.concatenate(expected))
+    assert_equal(detectorIDs, np.repeat(np.arange(footprintf.N), [len(e) for e in expected]))
+
+
 def test_distToSegment():
     from sorcha.modules.PPFootprintFilter import distToSegment
 
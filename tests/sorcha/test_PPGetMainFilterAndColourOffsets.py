@@ -45,3 +45,16 @@ def test_PPGetMainFilterAndColourOffsets():
         err.value.args[0]
         == "ERROR: PPGetMainFilterAndColourOffsets: colour offset columns in physical parameters file do not match with observing filters specified in config file."
     )
+
+
+def test_PPGetMainFilterAndColourOffsets_parquet(tmp_path):
+    from sorcha.modules.PPGetMainFilterAndColourOffsets import PPGetMainFilterAndColourOffsets
+    from sorcha.readers.CSVReader import CSVDataReader
+
+    colour_fn = str(tmp_path / "testcolour.parquet")
+    CSVDataReader(get_test_filepath("testcolour.txt"), "whitespace").read_rows().to_parquet(colour_fn)
+
+    mainfilter, othercolours = PPGetMainFilterAndColourOffsets(colour_fn, ["r", "g", "i", "z"], "parquet")
+
+    assert mainfilter == "r"
+    assert othercolours == ["g-r", "i-r", "z-r"]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from pandas.testing import assert_frame_equal
+
+from sorcha.modules.PPJoinObjectColumns import PPDeferredObjectColumns, PPJoinObjectColumns
+from sorcha.readers.CSVReader import CSVDataReader
+from sorcha.readers.OrbitAuxReader import OrbitAuxReader
+from sorcha.utilities.dataUtilitiesForTests import get_test_filepath
+
+
+def make_configs(output_columns):
+    return SimpleNamespace(
+        output=SimpleNamespace(output_columns=output_columns),
+        lightcurve=SimpleNamespace(lc_model=None),
+        activity=SimpleNamespace(comet_activity=None),
+    )
+
+
+def test_PPDeferredObjectColumns():
+    columns = ["ObjID", "FORMAT", "q", "e", "inc", "node", "argPeri", "t_p_MJD_TDB", "epochMJD_TDB", "H_r"]
+    orbit_columns = ["FORMAT", "q", "e", "inc", "node", "argPeri", "t_p_MJD_TDB", "epochMJD_TDB"]
+
+    assert PPDeferredObjectColumns(columns, make_configs("basic")) == orbit_columns
+    assert PPDeferredObjectColumns(columns, make_configs(["ObjID", "q", "e"])) == orbit_columns
+    assert PPDeferredObjectColumns(columns, make_configs("all")) == []
+
+
+def test_PPJoinObjectColumns():
+    orbits = OrbitAuxReader(get_test_filepath("testorb.des"), "whitespace").read_rows()
+    params = CSVDataReader(get_test_filepath("testcolour.txt"), "whitespace").read_rows()
+    objects_df = orbits.merge(params, on="ObjID")
+
+    # a few observations of each object, in no particular order
+    rng = np.random.default_rng(2021)
+    ephemeris_df = pd.DataFrame(
+        {"ObjID": rng.choice(objects_df["ObjID"], 20), "fieldMJD_TAI": np.arange(20.0)}
+    )
+    expected = ephemeris_df.join(objects_df.set_index("ObjID"), on="ObjID")
+
+    # join the physical parameters only, and look up the orbital elements afterwards
+    deferred_columns = PPDeferredObjectColumns(objects_df.columns, make_configs("basic"))
+    join_columns = [column for column in objects_df.columns if column not in deferred_columns + ["ObjID"]]
+    observations = ephemeris_df.join(
+        objects_df.set_index("ObjID")[join_columns].assign(object_index=np.arange(len(objects_df))),
+        on="ObjID",
+    )
+    assert "e" not in observations.columns
+
+    observations = PPJoinObjectColumns(observations, objects_df, deferred_columns)
+    assert_frame_equal(observations[expected.columns], expected)
+    assert "object_index" not in observations.columns
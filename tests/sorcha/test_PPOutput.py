@@ -26,7 +26,7 @@ def test_PPOutWriteCSV(tmp_path):
 
 
 def test_PPOutWriteSqlite3(tmp_path):
-    from sorcha.modules.PPOutput import PPOutWriteSqlite3
+    from sorcha.modules.PPOutput import PPOutWriteSqlite3, PPIndexSQLDatabase
 
     PPOutWriteSqlite3(observations, os.path.join(tmp_path, "test_sql_out.db"))
 
@@ -36,9 +36,66 @@ def test_PPOutWriteSqlite3(tmp_path):
     col_names = list(map(lambda x: x[0], cur.description))
 
     test_in = pd.DataFrame(cur.fetchall(), columns=col_names)
+    cnx.close()
 
     pd.testing.assert_frame_equal(observations, test_in)
 
+    PPIndexSQLDatabase(os.path.join(tmp_path, "test_sql_out.db"))
+
+
+def test_PPOutWriteSqlite3_chunks(tmp_path):
+    from sorcha.modules.PPOutput import PPOutWriteSqlite3, PPIndexSQLDatabase
+
+    outf = os.path.join(tmp_path, "test_sql_chunks.db")
+    chunks = pd.DataFrame(
+        {
+            "ObjID": ["a", "b", "c", "d"],
+            "fieldMJD_TAI": [61000.5, 61001.5, np.nan, 61003.5],
+            "FieldID": [1, 2, 3, 4],
+            "optFilter": ["r", None, "g", "i"],
+        }
+    )
+
+    # the chunks are appended to the table created for the first one
+    PPOutWriteSqlite3(chunks.iloc[:3], outf)
+    PPOutWriteSqlite3(chunks.iloc[3:], outf)
+    PPIndexSQLDatabase(outf)
+
+    cnx = sqlite3.connect(outf)
+    columns = cnx.execute("PRAGMA table_info('sorcha_results')").fetchall()
+    assert [(column[1], column[2]) for column in columns] == [
+        ("ObjID", "TEXT"),
+        ("fieldMJD_TAI", "REAL"),
+        ("FieldID", "INTEGER"),
+        ("optFilter", "TEXT"),
+    ]
+    assert cnx.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+    test_in = pd.read_sql("select * from sorcha_results", cnx)
+    pd.testing.assert_frame_equal(chunks, test_in)
+
+
+def test_PPCloseSqlite3Writers(tmp_path):
+    from sorcha.modules import PPOutput
+    from sorcha.modules.PPOutput import PPOutWriteSqlite3, PPCloseSqlite3Writers
+
+    outf = os.path.join(tmp_path, "test_sql_aborted.db")
+    chunk = pd.DataFrame({"ObjID": ["a", "b"], "fieldMJD_TAI": [61000.5, 61001.5]})
+
+    # a run stopping after its first chunk leaves the rows written so far, unindexed,
+    # with no WAL file and no writer kept for a later run
+    PPOutWriteSqlite3(chunk, outf)
+    PPCloseSqlite3Writers()
+
+    assert outf not in PPOutput._sqlite3_writers
+    assert not os.path.exists(outf + "-wal")
+
+    cnx = sqlite3.connect(outf)
+    assert cnx.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert cnx.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall() == []
+    pd.testing.assert_frame_equal(chunk, pd.read_sql("select * from sorcha_results", cnx))
+    cnx.close()
+
 
 def test_PPOutWriteHDF5(tmp_path):
     from sorcha.modules.PPOutput import PPOutWriteHDF5
@@ -50,6 +107,63 @@ def test_PPOutWriteHDF5(tmp_path):
     pd.testing.assert_frame_equal(observations, test_in)
 
 
+def test_PPOutWriteParquet(tmp_path):
+    import pyarrow.parquet as pq
+    from sorcha.modules.PPOutput import PPOutWriteParquet, PPCloseParquetWriters
+
+    chunks = pd.read_csv(get_test_filepath("test_input_fullobs.csv"), nrows=5)
+    outf = os.path.join(tmp_path, "test_parquet_out.parquet")
+
+    # each chunk is a row group of the same file
+    PPOutWriteParquet(chunks.iloc[:2], outf)
+    PPOutWriteParquet(chunks.iloc[2:], outf, compression="zstd")
+    PPCloseParquetWriters()
+
+    parquet_file = pq.ParquetFile(outf)
+    assert parquet_file.metadata.num_row_groups == 2
+    assert parquet_file.metadata.row_group(0).num_rows == 2
+    assert parquet_file.metadata.row_group(0).column(0).compression == "SNAPPY"
+
+    test_in = pd.read_parquet(outf)
+    pd.testing.assert_frame_equal(chunks, test_in, check_dtype=False)
+
+    # ObjID and optFilter are the only dictionary-encoded columns
+    encodings = {
+        column.path_in_schema: column.encodings
+        for column in map(parquet_file.metadata.row_group(0).column, range(len(chunks.columns)))
+    }
+    assert "RLE_DICTIONARY" in encodings["ObjID"]
+    assert "RLE_DICTIONARY" in encodings["optFilter"]
+    assert "RLE_DICTIONARY" not in encodings["fieldMJD_TAI"]
+
+
+def test_PPOutWriteParquet_failed_write(tmp_path, monkeypatch):
+    import pyarrow.parquet as pq
+    from sorcha.modules import PPOutput
+    from sorcha.modules.PPOutput import PPOutWriteParquet, PPCloseParquetWriters
+
+    chunks = pd.read_csv(get_test_filepath("test_input_fullobs.csv"), nrows=5)
+    outf = os.path.join(tmp_path, "test_parquet_failed.parquet")
+
+    def failing_write_table(self, table, row_group_size=None):
+        raise OSError("disk full")
+
+    write_table = pq.ParquetWriter.write_table
+    monkeypatch.setattr(pq.ParquetWriter, "write_table", failing_write_table)
+    with pytest.raises(OSError):
+        PPOutWriteParquet(chunks.iloc[:2], outf)
+
+    # the writer of the failed file is dropped, so the next write starts a new file
+    assert outf not in PPOutput._parquet_writers
+
+    monkeypatch.setattr(pq.ParquetWriter, "write_table", write_table)
+    PPOutWriteParquet(chunks, outf)
+    PPCloseParquetWriters(outf)
+
+    assert outf not in PPOutput._parquet_writers
+    pd.testing.assert_frame_equal(chunks, pd.read_parquet(outf), check_dtype=False)
+
+
 def test_PPWriteOutput_csv(tmp_path):
     args.outpath = tmp_path
     args.outfilestem = "PPOutput_test_out"
@@ -141,6 +255,27 @@ def test_PPWriteOutput_sql(tmp_path):
     assert index_list == ["optFilter", "fieldMJD_TAI", "ObjID"]
 
 
+def test_PPWriteOutput_parquet(tmp_path):
+    from sorcha.modules.PPOutput import PPCloseParquetWriters
+
+    args.outpath = tmp_path
+    args.outfilestem = "PPOutput_test_out"
+    config_file_location = get_demo_filepath("sorcha_config_demo.ini")
+    configs = sorchaConfigs(config_file_location, "rubin_sim")
+    configs.linkingfilter.ssp_linking_on = False
+    configs.linkingfilter.drop_unlinked = True
+    configs.output.output_format = "parquet"
+
+    PPWriteOutput(args, configs, observations.copy(), 10)
+    PPWriteOutput(args, configs, observations.copy(), 10)
+    PPCloseParquetWriters()
+
+    parquet_test_in = pd.read_parquet(os.path.join(tmp_path, "PPOutput_test_out.parquet"))
+    assert len(parquet_test_in) == 2
+    assert parquet_test_in.loc[1, "ObjID"] == "S1000000a"
+    assert parquet_test_in.loc[1, "optFilter"] == "r"
+
+
 def test_PPWriteOutput_all(tmp_path):
     # additional test to ensure that "all" output option and no rounding works
     config_file_location = get_demo_filepath("sorcha_config_demo.ini")
@@ -29,3 +29,18 @@ def test_demo_chunking():
         unchunked_sorted = unchunked_data.sort_values(["ObjID", "fieldMJD_TAI"]).reset_index(drop=True)
 
         pd.testing.assert_frame_equal(chunked_sorted, unchunked_sorted)
+
+
+def test_demo_chunking_workers():
+    """This tests that processing the chunks with a pool of worker processes
+    gives exactly the same output, in the same order, as processing them serially.
+    """
+
+    with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir:
+        override_seed_and_run(serial_dir, arg_set="chunked")
+        override_seed_and_run(parallel_dir, arg_set="chunked", workers=2)
+
+        serial_data = pd.read_csv(os.path.join(serial_dir, "out_end2end_chunked.csv"))
+        parallel_data = pd.read_csv(os.path.join(parallel_dir, "out_end2end_chunked.csv"))
+
+        pd.testing.assert_frame_equal(serial_data, parallel_data)
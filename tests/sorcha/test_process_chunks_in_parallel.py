@@ -0,0 +1,95 @@
+import logging
+import multiprocessing
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from sorcha.modules.PPFootprintFilter import Footprint
+from sorcha.modules.PPReadPointingDatabase import PPReadPointingDatabase
+from sorcha.readers.CombinedDataReader import CombinedDataReader
+from sorcha.readers.CSVReader import CSVDataReader
+from sorcha.readers.EphemerisReader import EphemerisDataReader
+from sorcha.readers.OrbitAuxReader import OrbitAuxReader
+from sorcha.sorcha import process_chunk, process_chunks_in_parallel
+from sorcha.utilities.dataUtilitiesForTests import get_test_filepath
+from sorcha.utilities.sorchaConfigs import sorchaConfigs
+from sorcha.utilities.sorchaModuleRNG import PerModuleRNG
+
+
+class ListHandler(logging.Handler):
+    """Keeps the messages of the log records it handles."""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def read_test_chunks(block_size=2):
+    reader = CombinedDataReader()
+    reader.add_ephem_reader(EphemerisDataReader(get_test_filepath("PPReadAllInput_ephem.txt"), "csv"))
+    reader.add_aux_data_reader(CSVDataReader(get_test_filepath("PPReadAllInput_params.txt"), "whitespace"))
+    reader.add_aux_data_reader(OrbitAuxReader(get_test_filepath("PPReadAllInput_orbits.des"), "whitespace"))
+
+    chunks = []
+    chunk_df = reader.read_block(block_size=block_size)
+    while chunk_df is not None:
+        chunks.append((len(chunks), chunk_df))
+        chunk_df = reader.read_block(block_size=block_size)
+    return chunks
+
+
+@pytest.mark.parametrize("start_method", ["spawn", "fork"])
+def test_process_chunks_in_parallel(start_method):
+    if start_method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{start_method} start method not available")
+
+    sconfigs = sorchaConfigs(get_test_filepath("PPConfig_test_unchunked.ini"), "rubin_sim")
+    sconfigs.filters.mainfilter = "r"
+    sconfigs.filters.othercolours = ["g-r", "i-r", "z-r"]
+    filterpointing = PPReadPointingDatabase(
+        get_test_filepath("baseline_10klines_2.0.db"),
+        sconfigs.filters.observing_filters,
+        sconfigs.input.pointing_sql_query,
+        "rubin_sim",
+    )
+    footprint = Footprint(sconfigs.fov.footprint_path)
+    args = SimpleNamespace(
+        _rngs=PerModuleRNG(2021), loglevel=True, workers=2, output_ephemeris_file=None, outpath=None
+    )
+    chunks = read_test_chunks()
+
+    expected = [
+        process_chunk(chunk_index, chunk_df, filterpointing, footprint, args, sconfigs)[0]
+        for chunk_index, chunk_df in chunks
+    ]
+
+    root_logger = logging.getLogger()
+    handler = ListHandler()
+    root_logger.addHandler(handler)
+    level = root_logger.level
+    root_logger.setLevel(logging.INFO)
+    try:
+        results = list(
+            process_chunks_in_parallel(
+                chunks,
+                filterpointing,
+                footprint,
+                args,
+                sconfigs,
+                mp_context=multiprocessing.get_context(start_method),
+            )
+        )
+    finally:
+        root_logger.removeHandler(handler)
+        root_logger.setLevel(level)
+
+    assert len(results) == len(chunks)
+    for (observations, _), expected_observations in zip(results, expected):
+        pd.testing.assert_frame_equal(observations, expected_observations)
+
+    # the log records of the workers reach the handlers of the main process, once each
+    assert handler.messages.count("Start post processing for this chunk") == len(chunks)
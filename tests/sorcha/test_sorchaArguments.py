@@ -1,3 +1,4 @@
+import os
 import pytest
 
 from sorcha.utilities.sorchaArguments import sorchaArguments
@@ -48,9 +49,27 @@ def test_validate_arguments():
 
         args.validate_arguments()
 
+    # a Chebyshev ephemeris store is a directory, and any other ephemerides a file
+    args.input_ephemeris_file = os.path.dirname(get_demo_filepath("example_ephem_output.txt"))
+
+    with pytest.raises(ValueError):
+        args.validate_arguments()
+
+    with pytest.raises(ValueError):
+        args.input_ephemeris_file = get_demo_filepath("example_ephem_output.txt")
+
+        args.validate_arguments("cheb")
+
     args.input_ephemeris_file = get_demo_filepath("example_ephem_output.txt")
 
     with pytest.raises(ValueError):
         args.configfile = get_demo_filepath("NOPE.txt")
 
         args.validate_arguments()
+
+    args.configfile = get_test_filepath("PPConfig_goldens_test.ini")
+
+    with pytest.raises(ValueError):
+        args.workers = 0
+
+        args.validate_arguments()
@@ -27,6 +27,8 @@ correct_inputs = {
     "size_serial_chunk": 5000,
     "aux_format": "whitespace",
     "pointing_sql_query": "SELECT observationId, observationStartMJD as observationStartMJD_TAI, visitTime, visitExposureTime, filter, seeingFwhmGeom as seeingFwhmGeom_arcsec, seeingFwhmEff as seeingFwhmEff_arcsec, fiveSigmaDepth as fieldFiveSigmaDepth_mag , fieldRA as fieldRA_deg, fieldDec as fieldDec_deg, rotSkyPos as fieldRotSkyPos_deg FROM observations order by observationId",
+    "eph_sorted": False,
+    "csv_index": False,
 }
 correct_simulation = {
     "_ephemerides_type": "ar",
@@ -36,6 +38,9 @@ correct_simulation = {
     "ar_obs_code": "X05",
     "ar_healpix_order": 6,
     "ar_n_sub_intervals": 101,
+    "ar_pointing_cache": None,
+    "ar_prepropagation_segment": None,
+    "ar_prepropagation_tolerance": None,
 }
 
 correct_filters_read = {"observing_filters": "r,g,i,z,u,y", "survey_name": "rubin_sim"}
@@ -89,6 +94,7 @@ correct_output = {
     "output_columns": "basic",
     "position_decimals": None,
     "magnitude_decimals": None,
+    "parquet_compression": "snappy",
 }
 
 correct_lc_model = {"lc_model": None}
@@ -105,6 +111,8 @@ correct_expert = {
     "randomization_on": True,
     "vignetting_on": True,
     "brute_force": True,
+    "columnar_filtering": False,
+    "compact_dtypes": False,
 }
 
 correct_auxciliary_URLs = {
@@ -214,9 +222,9 @@ def test_inputConfigs_mandatory(key_name):
 @pytest.mark.parametrize(
     "key_name, expected_list",
     [
-        ("ephemerides_type", "['ar', 'external']"),
-        ("aux_format", "['comma', 'whitespace', 'csv']"),
-        ("eph_format", "['csv', 'whitespace', 'hdf5']"),
+        ("ephemerides_type", "['ar', 'external', 'cheb']"),
+        ("aux_format", "['comma', 'whitespace', 'csv', 'parquet']"),
+        ("eph_format", "['csv', 'whitespace', 'hdf5', 'parquet']"),
     ],
 )
 def test_inputConfigs_inlist(key_name, expected_list):
@@ -328,6 +336,56 @@ def test_simulationConfigs_notrequired(key_name):
     )
 
 
+def test_simulationConfigs_prepropagation():
+    """
+    Makes sure the tolerance of the pre-propagated orbits has a default, and is only given with their segments
+    """
+
+    simulation_configs = correct_simulation.copy()
+    simulation_configs["ar_prepropagation_segment"] = "8"
+
+    test_configs = simulationConfigs(**simulation_configs)
+    assert test_configs.ar_prepropagation_segment == 8.0
+    assert test_configs.ar_prepropagation_tolerance == 1e-9
+
+    simulation_configs["ar_prepropagation_tolerance"] = "-1e-8"
+    with pytest.raises(SystemExit) as error_text:
+        test_configs = simulationConfigs(**simulation_configs)
+
+    assert error_text.value.code == "ERROR: ar_prepropagation_tolerance must be positive."
+
+    simulation_configs["ar_prepropagation_segment"] = None
+    with pytest.raises(SystemExit) as error_text:
+        test_configs = simulationConfigs(**simulation_configs)
+
+    assert (
+        error_text.value.code
+        == "ERROR: ar_prepropagation_tolerance supplied in config file but ar_prepropagation_segment is not"
+    )
+
+
+def test_simulationConfigs_cheb():
+    """
+    Makes sure the ephemerides generated from a Chebyshev ephemeris store need the same keys as ASSIST+REBOUND,
+    but not the pre-propagation of the orbits
+    """
+
+    simulation_configs = correct_simulation.copy()
+    simulation_configs["_ephemerides_type"] = "cheb"
+
+    test_configs = simulationConfigs(**simulation_configs)
+    assert test_configs.ar_ang_fov == 2.06
+
+    simulation_configs["ar_prepropagation_segment"] = 8.0
+    with pytest.raises(SystemExit) as error_text:
+        test_configs = simulationConfigs(**simulation_configs)
+
+    assert (
+        error_text.value.code
+        == "ERROR: ar_prepropagation_segment supplied in config file but ephemerides type is cheb"
+    )
+
+
 ##################################################################################################################################
 
 # filters config test
@@ -815,7 +873,7 @@ def test_outputConfigs_mandatory(key_name):
 @pytest.mark.parametrize(
     "key_name, expected_list",
     [
-        ("output_format", "['csv', 'sqlite3', 'hdf5']"),
+        ("output_format", "['csv', 'sqlite3', 'hdf5', 'parquet']"),
         ("output_columns", "['basic', 'all']"),
     ],
 )
@@ -13,3 +13,21 @@ def test_PerModuleRNG():
     assert rng1 is rng3
     assert rng1 is not rng2
     assert rng3 is not rng2
+
+
+def test_PerModuleRNG_chunks():
+    rngs = PerModuleRNG(2021)
+
+    # Chunk 0 reproduces the unchunked streams, later chunks get new ones.
+    chunk0 = rngs.getChunkRNGs(0)
+    chunk1 = rngs.getChunkRNGs(1)
+    chunk1_again = rngs.getChunkRNGs(1)
+
+    expected = PerModuleRNG(2021).getModuleRNG("module1").random(5)
+
+    assert (chunk0.getModuleRNG("module1").random(5) == expected).all()
+    assert (chunk1.getModuleRNG("module1").random(5) != expected).all()
+    assert (
+        chunk1_again.getModuleRNG("module1").random(5)
+        == rngs.getChunkRNGs(1).getModuleRNG("module1").random(5)
+    ).all()